@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pygame
+
+# Assets do jogo: o manifesto varre images/, sounds/ e music/ uma vez na
+# abertura e diz o que falta (em vez de cada play/load descobrir sozinho),
+# e o AssetLoader carrega numa thread o que so a partida usa (textura do
+# chao, quadros dos sprites, efeitos) enquanto o jogador esta no menu.
+#
+# `python assets.py --startup` mede a abertura em processos novos, sem
+# janela: import do pygame, import do main.py, primeiro quadro e primeiro
+# quadro jogavel.
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+SOUND_EXTENSIONS = (".wav", ".ogg")
+MUSIC_EXTENSIONS = (".mp3", ".ogg", ".oga")
+KINDS = {"images": IMAGE_EXTENSIONS, "sounds": SOUND_EXTENSIONS, "music": MUSIC_EXTENSIONS}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def scan(directory, extensions):
+    # nome sem extensao -> caminho
+    if not os.path.isdir(directory):
+        return {}
+    found = {}
+    for filename in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() in extensions:
+            found.setdefault(name, os.path.join(directory, filename))
+    return found
+
+
+class AssetManifest:
+    def __init__(self, root=None):
+        self.root = root or HERE
+        self.files = {kind: scan(os.path.join(self.root, kind), extensions) for kind, extensions in KINDS.items()}
+
+    def path(self, kind, name):
+        return self.files[kind].get(name)
+
+    def names(self, kind):
+        return self.files[kind]
+
+    def missing(self, required):
+        # required: tipo -> nomes; devolve "tipo/nome" do que nao existe
+        return [f"{kind}/{name}" for kind, names in required.items() for name in names
+                if name not in self.files[kind]]
+
+
+# --- Carga em segundo plano ---
+
+
+class AssetLoader:
+    # Uma thread; get() devolve o resultado, esperando se ainda nao terminou
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        self._futures = {}
+        self.load_times = {}     # nome -> s gastos na thread
+        self.blocking_loads = 0  # get() que teve de esperar
+        self.finished_at = None  # perf_counter da ultima carga
+
+    def submit(self, name, load, *args):
+        self._futures[name] = self._pool.submit(self._run, name, load, args)
+
+    def _run(self, name, load, args):
+        start = time.perf_counter()
+        try:
+            return load(*args)
+        finally:
+            self.load_times[name] = time.perf_counter() - start
+            self.finished_at = time.perf_counter()
+
+    def get(self, name):
+        future = self._futures[name]
+        if not future.done():
+            self.blocking_loads += 1
+        return future.result()
+
+    def ready(self):
+        return all(future.done() for future in self._futures.values())
+
+    def wait(self):
+        for name in self._futures:
+            self.get(name)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+def load_surface(path, size=None):
+    # Decodifica (e escala) fora da thread principal; sem convert, que pede
+    # a janela. None se o arquivo nao existe.
+    if path is None:
+        return None
+    surface = pygame.image.load(path)
+    if size is not None and surface.get_size() != tuple(size):
+        surface = pygame.transform.smoothscale(surface, size)
+    return surface
+
+
+# --- Medicao da abertura ---
+# Marcas em s desde o inicio do main.py; o processo filho do --startup
+# adiciona o que vem antes (interpretador e pygame).
+
+STARTUP_MARKS = ("import", "first_frame", "assets_ready", "first_playable")
+
+
+class StartupTimer:
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name, now=None):
+        # So a primeira ocorrencia conta
+        if name not in self.marks:
+            self.marks[name] = (now if now is not None else time.perf_counter()) - self.start
+
+    def done(self):
+        return len(self.marks) == len(STARTUP_MARKS)
+
+    def report(self):
+        return " | ".join(f"{name} {self.marks[name] * 1000:.1f} ms" for name in STARTUP_MARKS if name in self.marks)
+
+
+def _startup_child(t0, wall0, menu_seconds):
+    # Roda no processo filho: abre o main.py como o pgzrun e chega ate o
+    # primeiro quadro da partida, sem janela
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import types
+
+    from pgzero import runner
+    from pgzero.game import PGZeroGame
+    pgzero_done = time.perf_counter()
+
+    path = os.path.join(HERE, "main.py")
+    module = types.ModuleType("main")
+    module.__file__ = path
+    sys.modules["main"] = module
+    runner.prepare_mod(module)
+    game = PGZeroGame(module)
+    with open(path) as f:
+        code = compile(f.read(), path, "exec")
+    exec(code, module.__dict__)
+    game.reinit_screen()
+
+    # Quadros de menu pelo tempo que o jogador leva para escolher
+    deadline = time.perf_counter() + menu_seconds
+    while True:
+        module.update()
+        module.draw()
+        if time.perf_counter() >= deadline:
+            break
+        time.sleep(1 / 60)
+    clicked = time.perf_counter()
+    module.on_mouse_down(module.buttons["start"].center)
+    module.on_mouse_down(module.difficulty_buttons["Normal"].center)
+    module.on_mouse_down(module.button_start_game.center)
+    module.update()
+    module.draw()
+    blocking_loads = module.loader.blocking_loads
+    # Efeitos podem terminar depois do primeiro quadro jogavel
+    module.loader.wait()
+    module.draw()
+
+    timer = module.startup
+    marks = {name: timer.start + value - t0 for name, value in timer.marks.items()}
+    marks["pgzero"] = pgzero_done - t0
+    marks["clicked"] = clicked - t0
+    print(json.dumps({"wall0": wall0, "marks": marks, "blocking_loads": blocking_loads,
+                      "load_times": module.loader.load_times}))
+
+
+def measure_startup(runs, menu_seconds):
+    code = ("import time; t0 = time.perf_counter(); wall0 = time.time()\n"
+            f"import sys; sys.path.insert(0, {HERE!r})\n"
+            f"import assets; assets._startup_child(t0, wall0, {menu_seconds!r})\n")
+    results = []
+    for _ in range(runs):
+        spawned = time.time()
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["interpreter"] = result["wall0"] - spawned
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manifesto de assets e tempo de abertura do jogo")
+    parser.add_argument("--startup", type=int, default=0, metavar="N",
+                        help="mede a abertura em N processos novos (sem janela)")
+    parser.add_argument("--menu-seconds", type=float, default=0.5,
+                        help="tempo no menu antes de comecar a partida (0 = clica na hora)")
+    args = parser.parse_args()
+    if args.startup < 0 or args.menu_seconds < 0:
+        parser.error("--startup e --menu-seconds nao podem ser negativos")
+
+    manifest = AssetManifest()
+    for kind, files in manifest.files.items():
+        print(f"{kind:<7} {len(files):>3}  {', '.join(files) or '-'}")
+
+    if not args.startup:
+        return
+    results = measure_startup(args.startup, args.menu_seconds)
+    print(f"\n{args.startup} aberturas, {args.menu_seconds:g} s no menu")
+    print(f"{'marca (ms desde o inicio do Python)':<36} {'p50':>8} {'max':>8}")
+    rows = [("interpretador (antes do inicio)", [r["interpreter"] for r in results])]
+    rows += [(label, [r["marks"][name] for r in results]) for label, name in (
+        ("import pygame/pgzero", "pgzero"), ("import main.py", "import"), ("primeiro quadro", "first_frame"),
+        ("assets prontos", "assets_ready"), ("primeiro quadro jogavel", "first_playable"))]
+    rows.append(("do START ao quadro jogavel", [r["marks"]["first_playable"] - r["marks"]["clicked"] for r in results]))
+    for label, values in rows:
+        values = np.array(values) * 1000
+        print(f"{label:<36} {np.median(values):>8.1f} {values.max():>8.1f}")
+    blocked = sum(r["blocking_loads"] for r in results)
+    print(f"cargas que travaram o quadro: {blocked}")
+    names = results[0]["load_times"]
+    print("carga em segundo plano (p50): " +
+          ", ".join(f"{name} {np.median([r['load_times'][name] for r in results]) * 1000:.1f} ms" for name in names))
+
+
+if __name__ == "__main__":
+    main()
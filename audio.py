@@ -0,0 +1,113 @@
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from assets import AssetManifest
+
+# Audio sem travar o quadro: os efeitos sao decodificados uma vez (fora da
+# thread principal com load_sounds num AssetLoader), cada um no seu canal
+# reservado (um passo novo nao rouba o canal do hit), e as trilhas sao lidas
+# do disco numa thread antes da troca de nivel. Na hora de tocar,
+# mixer.music so recebe os bytes ja em memoria.
+#
+# Trilha que nao existe em music/ e ignorada de proposito (nada de try/except
+# em volta de music.play engolindo qualquer erro); o manifesto avisa uma vez
+# na abertura. Efeito ainda nao carregado simplesmente nao toca.
+
+MUSIC_VOLUME = 0.5
+# Intervalo minimo entre dois disparos do mesmo efeito (s)
+MIN_INTERVAL = {"step": 0.12}
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class AudioManager:
+    def __init__(self, manifest=None, clock=time.perf_counter, preload=True):
+        manifest = manifest or AssetManifest()
+        self.clock = clock
+        self.enabled = pygame.mixer.get_init() is not None
+        self.sound_paths = manifest.names("sounds")
+        self.tracks = manifest.names("music")
+        self.sounds = {}
+        self.channels = {}
+        self.current_track = None
+        self.last_played = {}
+        self.throttled = 0       # disparos descartados pelo MIN_INTERVAL
+        self.blocking_loads = 0  # trilhas que nao estavam pre-carregadas
+        self._pending = {}       # trilha -> Future com os bytes
+        self._stream = None      # mixer.music le deste buffer enquanto toca
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+        if self.enabled:
+            self._reserve_channels()
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
+            if preload:
+                self.load_sounds()
+
+    def _reserve_channels(self):
+        names = list(self.sound_paths)
+        if pygame.mixer.get_num_channels() < len(names):
+            pygame.mixer.set_num_channels(len(names))
+        # Canais reservados nao sao usados por Sound.play() de terceiros
+        pygame.mixer.set_reserved(len(names))
+        for index, name in enumerate(names):
+            self.channels[name] = pygame.mixer.Channel(index)
+
+    def load_sounds(self):
+        # Pode rodar em outra thread: play() so ve o efeito depois de pronto
+        if not self.enabled:
+            return 0
+        for name, path in self.sound_paths.items():
+            self.sounds[name] = pygame.mixer.Sound(path)
+        return len(self.sounds)
+
+    # --- Efeitos ---
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return False
+        now = self.clock()
+        interval = MIN_INTERVAL.get(name)
+        if interval is not None and now - self.last_played.get(name, -interval) < interval:
+            self.throttled += 1
+            return False
+        self.last_played[name] = now
+        self.channels[name].play(sound)
+        return True
+
+    # --- Musica ---
+
+    def prefetch(self, track):
+        # Le a trilha em segundo plano; chamar de novo e gratuito
+        if not self.enabled or track not in self.tracks:
+            return None
+        future = self._pending.get(track)
+        if future is None:
+            future = self._pending[track] = self._pool.submit(_read, self.tracks[track])
+        return future
+
+    def play_music(self, track):
+        if not self.enabled or track not in self.tracks:
+            return False
+        if track == self.current_track and pygame.mixer.music.get_busy():
+            return True  # mesma trilha ja tocando: nao recomeca
+        future = self.prefetch(track)
+        if not future.done():
+            self.blocking_loads += 1
+        data = future.result()
+        self._stream = io.BytesIO(data)
+        pygame.mixer.music.load(self._stream, os.path.splitext(self.tracks[track])[1][1:])
+        pygame.mixer.music.play(-1)
+        self.current_track = track
+        return True
+
+    def stop_music(self):
+        if self.enabled:
+            pygame.mixer.music.stop()
+        self.current_track = None
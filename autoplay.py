@@ -0,0 +1,213 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from balance import KEY_FOR, scripted_policy
+from engine import MAX_HP, MAX_LEVELS, MOVE_KEYS, STATE_COMBAT, STATE_GAME, STATE_GAME_OVER, STATE_VICTORY
+from snapshot import branch_game, capture, restore
+
+# Jogador automatico por MCTS (UCT) sobre os snapshots de snapshot.py. A busca
+# roda numa copia sem observadores (branch_game): cada no guarda o snapshot
+# do estado depois da acao, e expandir/simular e so restore + step.
+#
+# No mapa as acoes sao as quatro setas ou ficar parado; no combate a unica
+# acao e atacar, entao a busca decide movimento e quando entrar em combate.
+# As simulacoes seguem a politica do balance.py com uma parte de passos
+# aleatorios. O inventario nao entra na busca: inventory_keys() equipa o
+# melhor de cada tipo e vende o resto, pelas teclas, antes de buscar.
+#
+# choose() usa no maximo `budget` segundos por quadro; como o jogo e
+# deterministico para as mesmas entradas, o filho escolhido vira a raiz do
+# quadro seguinte e a busca continua de onde parou.
+
+FRAME_BUDGET = 0.008  # s por quadro (o quadro tem ~16 ms)
+ROLLOUT_DEPTH = 16
+EXPLORATION = 0.7
+RANDOM_STEP = 0.25  # fracao de passos aleatorios nas simulacoes
+KILL_EXP = 10   # exp por inimigo morto
+MAX_KILLS = 2   # mortes que ainda somam valor numa simulacao
+WAIT = None
+MAP_ACTIONS = tuple(MOVE_KEYS) + (WAIT,)
+COMBAT_ACTIONS = ("SPACE",)
+TERMINAL = (STATE_GAME_OVER, STATE_VICTORY)
+
+
+def evaluate(game, exp_base=0):
+    # Valor em [0, 1]: vitoria 1, derrota 0; no meio pesam HP, nivel, baus e
+    # as mortes desde exp_base (o nivel so passa limpando os inimigos); um
+    # termo pequeno de proximidade do alvo mais perto desempata quando nada
+    # acontece dentro da simulacao
+    if game.current_state == STATE_VICTORY:
+        return 1.0
+    if game.current_state == STATE_GAME_OVER:
+        return 0.0
+    chests = game.legendary_chests
+    opened = sum(chest["opened"] for chest in chests) / len(chests) if chests else 1.0
+    progress = (game.current_level - 1) / MAX_LEVELS
+    kills = min((game.hero.exp - exp_base) / KILL_EXP, MAX_KILLS)
+    return (0.3 * max(game.hero.hp, 0) / MAX_HP + 0.3 * progress + 0.1 * opened
+            + 0.25 * kills / MAX_KILLS + 0.05 / (1 + _target_distance(game)))
+
+
+def _target_distance(game):
+    # Distancia (Manhattan) ate o bau fechado ou inimigo mais perto
+    hero = game.hero
+    store = game.enemies
+    n = store.count
+    best = int(np.min(np.abs(store.grid_x[:n] - hero.grid_x) + np.abs(store.grid_y[:n] - hero.grid_y))) if n else 10 ** 6
+    for chest in game.legendary_chests:
+        if not chest["opened"]:
+            best = min(best, abs(chest["pos_x"] - hero.grid_x) + abs(chest["pos_y"] - hero.grid_y))
+    return best
+
+
+def legal_actions(game):
+    if game.current_state == STATE_COMBAT:
+        return COMBAT_ACTIONS
+    if game.current_state == STATE_GAME:
+        return MAP_ACTIONS
+    return ()
+
+
+def inventory_keys(game):
+    # Teclas do proximo ajuste de inventario (um item por tick), ou [] se ja
+    # esta tudo equipado. Mesma regra de balance.manage_inventory, mas pela
+    # entrada, para sair nas gravacoes
+    hero = game.hero
+    inventory = hero.inventory
+    for position in range(len(inventory)):
+        if inventory.is_equipped(position):
+            continue
+        item = inventory[position]
+        current = hero.equipment.get(item.type)
+        action = "E" if current is None or sum(item.stats) > sum(current.stats) else "D"
+        if not game.inventory_visible:
+            keys, selected = ["I"], 0
+        elif game.item_selected is None:
+            keys, selected = ["I", "I"], 0  # itens chegaram com ele aberto
+        else:
+            keys, selected = [], game.item_selected
+        step = "S" if position > selected else "W"
+        return keys + [step] * abs(position - selected) + [action]
+    return ["I"] if game.inventory_visible else []
+
+
+def _same_state(a, b):
+    # O no previsto corresponde a partida real? (o jogador pode ter mexido
+    # no meio, ou a partida foi carregada). Compara o snapshot inteiro; so o
+    # relogio dos inimigos nao basta, as colunas tambem podem divergir.
+    if (a.scalars, a.hero, a.rng, a.np_rng, a.equipment, a.boss, a.combat, a.opened, a.turns, a.combat_log) != \
+            (b.scalars, b.hero, b.rng, b.np_rng, b.equipment, b.boss, b.combat, b.opened, b.turns, b.combat_log):
+        return False
+    # Baus sem a flag "opened" do dict (a partida muda o dict depois do
+    # capture; o valor da hora esta em `opened`)
+    if [(c["pos_x"], c["pos_y"], c["items"]) for c in a.chests] != \
+            [(c["pos_x"], c["pos_y"], c["items"]) for c in b.chests]:
+        return False
+    # Inventario: listas compartilhadas quando nada mudou, entao o == sai
+    # rapido pela identidade
+    if a.inventory != b.inventory:
+        return False
+    (a_time, a_columns), (b_time, b_columns) = a.enemies, b.enemies
+    return a_time == b_time and a_columns.keys() == b_columns.keys() and \
+        all(np.array_equal(a_columns[name], b_columns[name]) for name in a_columns)
+
+
+class _Node:
+    __slots__ = ("snapshot", "untried", "children", "visits", "value")
+
+    def __init__(self, snapshot, actions, rng):
+        self.snapshot = snapshot
+        self.untried = list(actions)
+        rng.shuffle(self.untried)
+        self.children = {}
+        self.visits = 0
+        self.value = 0.0
+
+
+class MCTSPlayer:
+    def __init__(self, game, budget=FRAME_BUDGET, rollout_depth=ROLLOUT_DEPTH, exploration=EXPLORATION, seed=None):
+        self.game = game
+        self.budget = budget
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.sim = branch_game(game)
+        self.root = None
+        self.exp_base = 0
+        self.iterations = 0  # da ultima decisao
+        self.reused = 0      # decisoes que aproveitaram a arvore anterior
+
+    def choose(self):
+        # Entradas do proximo tick da partida real
+        game = self.game
+        actions = legal_actions(game)
+        if len(actions) <= 1:
+            self.root = None
+            self.iterations = 0
+            return [action for action in actions if action is not WAIT]
+        if game.current_state == STATE_GAME:
+            keys = inventory_keys(game)
+            if keys:
+                self.root = None
+                return keys
+        if self.sim.world is not game.world:
+            self.sim = branch_game(game)  # nova partida, mapa novo
+
+        snapshot = capture(game)
+        root = self.root
+        if root is not None and _same_state(root.snapshot, snapshot):
+            self.reused += 1
+        else:
+            root = _Node(snapshot, actions, self.rng)
+            self.exp_base = game.hero.exp
+        deadline = time.perf_counter() + self.budget
+        iterations = 0
+        while not root.children or time.perf_counter() < deadline:
+            self._iterate(root)
+            iterations += 1
+        self.iterations = iterations
+        best = max(root.children, key=lambda action: root.children[action].visits)
+        self.root = root.children[best]
+        return [] if best is WAIT else [best]
+
+    def _iterate(self, root):
+        sim = self.sim
+        node = root
+        path = [node]
+        # Selecao: desce pelos filhos ja expandidos (UCB1)
+        while not node.untried and node.children:
+            node = self._select(node)
+            path.append(node)
+        # Expansao: uma acao nova a partir do estado do no
+        restore(sim, node.snapshot)
+        if node.untried:
+            action = node.untried.pop()
+            sim.step([] if action is WAIT else [action])
+            child = _Node(capture(sim), legal_actions(sim), self.rng)
+            node.children[action] = child
+            path.append(child)
+        value = self._rollout(sim)
+        for visited in path:
+            visited.visits += 1
+            visited.value += value
+
+    def _select(self, node):
+        log_visits = math.log(node.visits)
+        c = self.exploration
+        return max(node.children.values(),
+                   key=lambda child: child.value / child.visits + c * math.sqrt(log_visits / child.visits))
+
+    def _rollout(self, sim):
+        rng = self.rng
+        moves = list(KEY_FOR.values())
+        for _ in range(self.rollout_depth):
+            if sim.current_state in TERMINAL:
+                break
+            if sim.current_state == STATE_GAME and rng.random() < RANDOM_STEP:
+                sim.step([rng.choice(moves)])
+            else:
+                sim.step(scripted_policy(sim))
+        return evaluate(sim, self.exp_base)
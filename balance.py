@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from engine import (
+    DIFFICULTY_LEVELS, MAX_HP, MAX_LEVELS, MOVE_KEYS,
+    STATE_COMBAT, STATE_GAME, STATE_GAME_OVER, STATE_VICTORY,
+    GameState,
+)
+from events import DROP, KILL, LEVEL, SALE
+from items import template
+
+# Partidas completas (nivel 1 ate o chefe) jogadas por uma politica fixa, em
+# lote, para cada dificuldade. Cada partida tem o proprio seed (seed base +
+# indice, os mesmos seeds em todas as dificuldades), entao o resultado nao
+# depende de quantos processos rodaram nem em que ordem.
+#
+# A politica anda pelo teclado (GameState.step) e mexe no inventario pelos
+# metodos do proprio jogo: equipa o que soma mais atributos e vende o resto.
+
+DEFAULT_RUNS = 200
+DEFAULT_MAX_TICKS = 20_000
+HEAL_BELOW = 0.4  # vai para a zona de cura abaixo de 40% do HP
+HEAL_UNTIL = 0.9  # e espera la ate 90%
+KEY_FOR = {delta: key for key, delta in MOVE_KEYS.items()}
+
+
+# --- Politica ---
+
+
+def _nearest(hero, points):
+    return min(points, key=lambda p: abs(p[0] - hero.grid_x) + abs(p[1] - hero.grid_y), default=None)
+
+
+def _walk_towards(game, target):
+    # Passo guloso por eixo; se o eixo preferido estiver bloqueado, tenta o
+    # outro
+    hero = game.hero
+    dx = (target[0] > hero.grid_x) - (target[0] < hero.grid_x)
+    dy = (target[1] > hero.grid_y) - (target[1] < hero.grid_y)
+    options = [(dx, 0), (0, dy)] if abs(target[0] - hero.grid_x) >= abs(target[1] - hero.grid_y) else [(0, dy), (dx, 0)]
+    for step in options:
+        if step != (0, 0) and game.world.is_walkable(hero.grid_x + step[0], hero.grid_y + step[1]):
+            return [KEY_FOR[step]]
+    return []
+
+
+def manage_inventory(game):
+    # Equipa o melhor item de cada tipo (soma dos atributos) e vende o resto
+    hero = game.hero
+    inventory = hero.inventory
+    for position in range(len(inventory)):
+        item = inventory[position]
+        current = hero.equipment.get(item.type)
+        if current is None or sum(item.stats) > sum(current.stats):
+            hero.equip_from_inventory(position)
+    for position in range(len(inventory) - 1, -1, -1):
+        if not inventory.is_equipped(position):
+            game.item_selected = position
+            game.sell_selected()
+    game.item_selected = None
+
+
+def scripted_policy(game):
+    # Entradas do proximo tick
+    if game.current_state == STATE_COMBAT:
+        return ["SPACE"]
+    if game.current_state != STATE_GAME:
+        return []
+    hero = game.hero
+    if hero.inventory:
+        manage_inventory(game)
+
+    zone = _nearest(hero, [(z["grid_x"], z["grid_y"]) for z in game.healing_zones])
+    on_zone = zone == (hero.grid_x, hero.grid_y)
+    if zone is not None and (hero.hp < HEAL_BELOW * MAX_HP or (on_zone and hero.hp < HEAL_UNTIL * MAX_HP)):
+        return [] if on_zone else _walk_towards(game, zone)
+
+    chest = _nearest(hero, [(c["pos_x"], c["pos_y"]) for c in game.legendary_chests if not c["opened"]])
+    if chest is not None:
+        return _walk_towards(game, chest)
+
+    store = game.enemies
+    n = store.count
+    if n:
+        distance = np.abs(store.grid_x[:n] - hero.grid_x) + np.abs(store.grid_y[:n] - hero.grid_y)
+        i = int(np.argmin(distance))
+        return _walk_towards(game, (int(store.grid_x[i]), int(store.grid_y[i])))
+    return []
+
+
+# --- Partidas ---
+
+
+def play_run(difficulty, seed, max_ticks=DEFAULT_MAX_TICKS, policy=scripted_policy):
+    game = GameState(difficulty, seed=seed)
+    record = {"difficulty": difficulty, "seed": seed, "time_to_boss": None, "kills": 0, "item_levels": Counter(),
+              "gold": 0, "sales": 0}
+
+    def observe(event, data):
+        if event == LEVEL and data["level"] == MAX_LEVELS and record["time_to_boss"] is None:
+            record["time_to_boss"] = game.tick
+        elif event == KILL:
+            record["kills"] += 1
+        elif event == SALE:
+            # Ouro so das vendas, pelo preco que o jogo pagou
+            record["gold"] += data["price"]
+            record["sales"] += 1
+        elif event == DROP:
+            record["item_levels"][template(data["template_id"]).level] += 1
+        elif event == "chest_opened":
+            record["item_levels"].update(item.level for item in data["chest"]["items"])
+
+    game.add_observer(observe)
+    game.new_game()
+    while game.tick < max_ticks and game.current_state not in (STATE_GAME_OVER, STATE_VICTORY):
+        game.step(policy(game))
+
+    record.update(
+        cleared=game.current_state == STATE_VICTORY,
+        timed_out=game.current_state not in (STATE_GAME_OVER, STATE_VICTORY),
+        level=game.current_level,
+        ticks=game.tick,
+        item_levels=dict(record["item_levels"]),
+    )
+    return record
+
+
+def run_batch(task):
+    # Executado nos processos do pool: (dificuldade, seeds, max_ticks)
+    difficulty, seeds, max_ticks = task
+    return [play_run(difficulty, seed, max_ticks) for seed in seeds]
+
+
+def run_all(difficulties, runs, seed=0, jobs=None, max_ticks=DEFAULT_MAX_TICKS):
+    jobs = jobs or os.cpu_count() or 1
+    seeds = list(range(seed, seed + runs))
+    # Alguns blocos por processo para equilibrar dificuldades mais lentas
+    size = max(1, runs // (jobs * 4))
+    tasks = [(difficulty, seeds[i:i + size], max_ticks) for difficulty in difficulties for i in range(0, runs, size)]
+    if jobs == 1:
+        batches = map(run_batch, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            batches = list(pool.map(run_batch, tasks))
+    records = {difficulty: [] for difficulty in difficulties}
+    for (difficulty, _, _), batch in zip(tasks, batches):
+        records[difficulty].extend(batch)
+    return records
+
+
+# --- Agregacao ---
+
+
+def summarize(records):
+    cleared = np.array([r["cleared"] for r in records])
+    boss = np.array([r["time_to_boss"] for r in records if r["time_to_boss"] is not None], dtype=float)
+    gold = np.array([r["gold"] for r in records], dtype=float)
+    sales = sum(r["sales"] for r in records)
+    item_levels = Counter()
+    death_levels = Counter()
+    for r in records:
+        item_levels.update({int(level): count for level, count in r["item_levels"].items()})
+        if not r["cleared"] and not r["timed_out"]:
+            death_levels[r["level"]] += 1
+    total_items = sum(item_levels.values()) or 1
+    return {
+        "runs": len(records),
+        "clear_rate": float(cleared.mean()),
+        "boss_reach_rate": boss.size / len(records),
+        "timeouts": sum(r["timed_out"] for r in records),
+        "time_to_boss_mean": float(boss.mean()) if boss.size else None,
+        "time_to_boss_p50": float(np.percentile(boss, 50)) if boss.size else None,
+        "time_to_boss_p95": float(np.percentile(boss, 95)) if boss.size else None,
+        "gold_mean": float(gold.mean()),
+        "gold_p50": float(np.percentile(gold, 50)),
+        "gold_per_sale": float(gold.sum() / sales) if sales else None,
+        "kills_mean": float(np.mean([r["kills"] for r in records])),
+        "death_levels": dict(sorted(death_levels.items())),
+        "item_levels": {level: item_levels[level] / total_items for level in sorted(item_levels)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partidas completas em lote por dificuldade (balanceamento)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="partidas por dificuldade")
+    parser.add_argument("--difficulty", nargs="*", default=list(DIFFICULTY_LEVELS))
+    parser.add_argument("--seed", type=int, default=0, help="seed da primeira partida")
+    parser.add_argument("--jobs", type=int, default=None, help="processos (padrao: todos os nucleos)")
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS, help="limite por partida")
+    parser.add_argument("--json", help="grava o resumo e as partidas neste arquivo")
+    args = parser.parse_args()
+    unknown = [name for name in args.difficulty if name not in DIFFICULTY_LEVELS]
+    if unknown:
+        parser.error(f"dificuldades desconhecidas: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    records = run_all(args.difficulty, args.runs, args.seed, args.jobs, args.max_ticks)
+    elapsed = time.perf_counter() - start
+    summaries = {difficulty: summarize(runs) for difficulty, runs in records.items()}
+
+    print(f"{'difficulty':<10} {'mult':>5} {'clear%':>7} {'boss%':>7} {'t.boss':>7} {'gold':>7} {'g/item':>6} {'kills':>6}  "
+          f"item lvl 1-5 (%)")
+    for difficulty, s in summaries.items():
+        t_boss = f"{s['time_to_boss_p50']:.0f}" if s["time_to_boss_p50"] is not None else "-"
+        levels = " ".join(f"{s['item_levels'].get(level, 0) * 100:4.1f}" for level in range(1, 6))
+        per_sale = f"{s['gold_per_sale']:.0f}" if s["gold_per_sale"] is not None else "-"
+        print(f"{difficulty:<10} {DIFFICULTY_LEVELS[difficulty]:>5.1f} {s['clear_rate'] * 100:>6.1f}% "
+              f"{s['boss_reach_rate'] * 100:>6.1f}% {t_boss:>7} {s['gold_mean']:>7.0f} {per_sale:>6} "
+              f"{s['kills_mean']:>6.1f}  {levels}")
+    total = args.runs * len(args.difficulty)
+    print(f"{total} partidas em {elapsed:.2f}s ({total / elapsed:.0f} partidas/s, {args.jobs or os.cpu_count()} processos)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": args.runs, "seed": args.seed, "max_ticks": args.max_ticks, "seconds": elapsed,
+                       "summary": summaries, "records": records}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
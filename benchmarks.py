@@ -0,0 +1,302 @@
+import os
+
+# Sem janela nem placa de som: precisa vir antes de importar pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import copy
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import types
+
+import numpy as np
+
+from engine import HEIGHT, STATE_GAME, WIDTH, GameState, generate_enemies
+from items import generate_items, generate_random_item
+from loot import LOOT
+from snapshot import capture, restore
+
+# Benchmarks dos caminhos quentes: update(), draw_game(), draw_inventory(),
+# geracao de inimigos/itens, update_boss() e snapshots de estado. Cada caso roda ate min_time
+# segundos, algumas vezes, e fica a melhor taxa. Os resultados vao para
+# JSON e --compare aponta regressoes contra uma execucao anterior.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MIN_TIME = 0.3
+DEFAULT_REPEAT = 3
+REGRESSION_THRESHOLD = 0.15  # 15% mais lento conta como regressao
+
+
+def measure(fn, min_time=DEFAULT_MIN_TIME, repeat=DEFAULT_REPEAT):
+    # Melhor taxa (chamadas/s) entre `repeat` rodadas de pelo menos min_time
+    fn()
+    best = 0.0
+    calls = 0
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        deadline = start + min_time
+        now = start
+        while now < deadline:
+            fn()
+            calls += 1
+            now = time.perf_counter()
+        best = max(best, calls / (now - start))
+    return {"ops_per_s": best, "us_per_op": 1e6 / best, "calls": calls}
+
+
+def load_main():
+    # Carrega main.py como o pgzrun faz (builtins do pgzero e tela) sem
+    # entrar no loop do jogo
+    from pgzero import runner
+    from pgzero.game import PGZeroGame
+
+    path = os.path.join(HERE, "main.py")
+    module = types.ModuleType("main")
+    module.__file__ = path
+    sys.modules["main"] = module
+    runner.prepare_mod(module)
+    with open(path) as f:
+        code = compile(f.read(), path, "exec")
+    exec(code, module.__dict__)
+    PGZeroGame(module).reinit_screen()
+    return module
+
+
+def start_playing(game, enemies=0):
+    # Partida nova em andamento com exatamente `enemies` inimigos
+    # espalhados pelo mapa
+    game.hero.reset()
+    game.new_game()
+    game.current_state = STATE_GAME
+    game.set_enemies([])
+    for i in range(enemies):
+        game.enemies.spawn(2 + i % (game.world.width - 3), 2 + (i // 7) % (game.world.height - 3), 40, 7, 2, 1)
+    return game
+
+
+def playing_state(seed=1, enemies=0):
+    return start_playing(GameState(seed=seed), enemies)
+
+
+# --- Casos ---
+
+
+def bench_update(results, options):
+    for enemies in (10, 100, 1000, 10_000):
+        game = playing_state(enemies=enemies)
+        game.hero.hp = 10 ** 9
+
+        def tick():
+            game.update()
+            # Colisao vira combate; o benchmark mede so o passo de mapa
+            game.current_state = STATE_GAME
+        results[f"update/enemies={enemies}"] = measure(tick, options.min_time, options.repeat)
+
+
+def bench_draw_game(results, options, main):
+    for enemies in (10, 100, 500):
+        start_playing(main.game, enemies)
+        results[f"draw_game/enemies={enemies}"] = measure(main.draw_game, options.min_time, options.repeat)
+
+
+def bench_draw_inventory(results, options, main):
+    rng = np.random.default_rng(1)
+    for items in (10, 1000, 100_000):
+        game = start_playing(main.game)
+        game.hero.inventory.extend(generate_items(items, rng))
+        game.hero.equip_from_inventory(items // 2)
+        game.inventory_visible = True
+        game.item_selected = items // 2
+        game.start_visible = max(0, items // 2 - 2)
+        results[f"draw_inventory/items={items}"] = measure(main.draw_inventory, options.min_time, options.repeat)
+
+
+def bench_generation(results, options):
+    rng = random.Random(1)
+    game = playing_state()
+    results["generate_enemies"] = measure(
+        lambda: generate_enemies(2, 1.0, rng=rng, world=game.world), options.min_time, options.repeat)
+    results["generate_enemies/boss"] = measure(
+        lambda: generate_enemies(3, 1.0, boss=True, rng=rng, world=game.world), options.min_time, options.repeat)
+    results["generate_random_item"] = measure(lambda: generate_random_item(rng), options.min_time, options.repeat)
+    np_rng = np.random.default_rng(1)
+    batch = measure(lambda: generate_items(10_000, np_rng), options.min_time, options.repeat)
+    batch["items_per_s"] = batch["ops_per_s"] * 10_000
+    results["generate_items/batch=10000"] = batch
+    results["loot_roll"] = measure(lambda: LOOT.roll(3, 9.0, rng), options.min_time, options.repeat)
+    batch = measure(lambda: LOOT.roll_ids(10_000, 3, 9.0, np_rng), options.min_time, options.repeat)
+    batch["items_per_s"] = batch["ops_per_s"] * 10_000
+    results["loot_roll_ids/batch=10000"] = batch
+    for chests in (3, 300):
+        results[f"loot_roll_chests/chests={chests}"] = measure(
+            lambda: LOOT.roll_chests(chests, 3, 9.0, np_rng), options.min_time, options.repeat)
+
+
+def bench_update_boss(results, options):
+    for enemies in (0, 100, 1000, 10_000):
+        # Chefe + `enemies` inimigos; com poucos, o chefe invoca ate 6
+        game = playing_state()
+        game.set_enemies(*generate_enemies(3, 1.0, boss=True, rng=game.rng, world=game.world))
+        for i in range(enemies):
+            game.enemies.spawn(2 + i % 15, 2 + (i // 7) % 10, 40, 7, 2, 1)
+        boss = game.boss_enemy
+        population = len(game.enemies)
+
+        def summon():
+            # Recarga no fim a cada chamada, para medir a invocacao e nao so
+            # o contador; a invocacao sai de novo para a populacao nao mudar
+            boss.summon_cooldown = 1
+            game.update_boss()
+            if len(game.enemies) > population:
+                game.remove_enemy(game.enemies[-1])
+        results[f"update_boss/enemies={enemies}"] = measure(summon, options.min_time, options.repeat)
+        assert boss.alive and len(game.enemies) == population
+
+        # O tick inteiro com o chefe no mapa: a agenda decide quando ele age
+        game.hero.hp = 10 ** 9
+
+        def tick():
+            game.update()
+            game.current_state = STATE_GAME
+        results[f"update_boss/update/enemies={enemies}"] = measure(tick, options.min_time, options.repeat)
+
+
+def bench_snapshot(results, options):
+    rng = np.random.default_rng(1)
+    for enemies, items in ((10, 10), (100, 1000), (1000, 10_000)):
+        game = playing_state(enemies=enemies)
+        game.hero.inventory.extend(generate_items(items, rng))
+        game.hero.equip_from_inventory(0)
+        snap = capture(game)
+        key = f"enemies={enemies},items={items}"
+        results[f"snapshot/capture/{key}"] = measure(lambda: capture(game), options.min_time, options.repeat)
+        results[f"snapshot/restore/{key}"] = measure(lambda: restore(game, snap), options.min_time, options.repeat)
+        # Um ramo de busca: volta ao snapshot e mexe no inventario (forca a
+        # copia do copy-on-write)
+        def branch():
+            restore(game, snap)
+            game.hero.inventory.pop()
+        results[f"snapshot/branch/{key}"] = measure(branch, options.min_time, options.repeat)
+        if enemies == 10:
+            # Referencia: o que custava copiar a partida inteira
+            results[f"snapshot/deepcopy/{key}"] = measure(lambda: copy.deepcopy(game), options.min_time, options.repeat)
+
+
+def bench_present(results, options):
+    # Escala do quadro logico para a janela; o desenho em si nao muda com o
+    # tamanho da janela
+    import pygame
+
+    from render import SCALE_MODES, LogicalCanvas
+    for size in ((1280, 960), (1920, 1080), (2560, 1440), (3840, 2160)):
+        for mode in SCALE_MODES:
+            window = pygame.Surface(size, 0, 32)
+            canvas = LogicalCanvas((WIDTH, HEIGHT), size, mode)
+            canvas.target(window).fill((40, 40, 40))
+            results[f"present/{mode}/{size[0]}x{size[1]}"] = measure(
+                lambda: canvas.present(window), options.min_time, options.repeat)
+
+
+CASES = {
+    "update": bench_update,
+    "draw_game": bench_draw_game,
+    "draw_inventory": bench_draw_inventory,
+    "generation": bench_generation,
+    "update_boss": bench_update_boss,
+    "snapshot": bench_snapshot,
+    "present": bench_present,
+}
+NEEDS_MAIN = {"draw_game", "draw_inventory"}
+
+
+# --- Execucao e comparacao ---
+
+
+def environment():
+    import pygame
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run(cases, options):
+    results = {}
+    main = load_main() if NEEDS_MAIN & set(cases) else None
+    for name in cases:
+        start = time.perf_counter()
+        if name in NEEDS_MAIN:
+            CASES[name](results, options, main)
+        else:
+            CASES[name](results, options)
+        print(f"[{name}] {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return {"environment": environment(), "min_time": options.min_time, "results": results}
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    # Lista (caso, razao nova/antiga) dos casos que ficaram mais lentos
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        ratio = result["ops_per_s"] / old["ops_per_s"]
+        if ratio < 1 - threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes do jogo (sem janela)")
+    parser.add_argument("cases", nargs="*", help=f"casos a rodar (padrao: todos): {', '.join(CASES)}")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="segundos por rodada")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--compare", help="JSON de uma execucao anterior; sai com 1 se houver regressao")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    options = parser.parse_args()
+    unknown = [name for name in options.cases if name not in CASES]
+    if unknown:
+        parser.error(f"casos desconhecidos: {', '.join(unknown)}")
+
+    report = run(options.cases or list(CASES), options)
+    baseline = None
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+
+    print(f"{'caso':<34} {'ops/s':>12} {'us/op':>10} {'vs base':>8}")
+    for name, result in report["results"].items():
+        old = baseline["results"].get(name) if baseline else None
+        ratio = f"{result['ops_per_s'] / old['ops_per_s']:>7.2f}x" if old else ""
+        print(f"{name:<34} {result['ops_per_s']:>12.1f} {result['us_per_op']:>10.2f} {ratio:>8}")
+
+    if options.json:
+        with open(options.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if baseline:
+        regressions = compare(report, baseline, options.threshold)
+        for name, ratio in regressions:
+            print(f"REGRESSAO {name}: {ratio:.2f}x da base", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
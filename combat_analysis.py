@@ -0,0 +1,251 @@
+import argparse
+import itertools
+import json
+import time
+
+import numpy as np
+
+from engine import (
+    COMBAT_TURN, DIFFICULTY_LEVELS, ENEMY_REFERENCE_SPEED, HERO_REFERENCE_SPEED, MAX_LEVELS, MAX_HP,
+    STATE_COMBAT, STATE_GAME_OVER, Enemy, GameState,
+)
+
+# Analisador Monte Carlo do combate por turnos (GameState.attack):
+#   dano do heroi   = randint(strength // 2, strength)
+#   dano do inimigo = max(1, randint(3, 30) - defense // 2)
+# O inimigo so revida se sobreviver ao golpe. A forca do inimigo nao entra
+# na formula do jogo, entao o x3 de forca do chefe nao muda o resultado;
+# so o HP (x5) importa.
+#
+# A ordem dos golpes segue a agenda do combate (GameState.turns): cada lado
+# age a cada action_interval(COMBAT_TURN, velocidade, referencia) e o
+# horario soma o intervalo a cada acao, como no jogo. Num empate age quem
+# nao agiu por ultimo (o heroi no comeco). Com Boots/Gloves o heroi ganha
+# golpes extras; um inimigo mais rapido bate mais de uma vez por golpe.
+# "turns" conta os golpes do heroi.
+
+ENEMY_DAMAGE_MIN = 3
+ENEMY_DAMAGE_MAX = 30
+MAX_EVENTS = 20_000
+CHUNK_SIZE = 4_000_000  # lutas simuladas por bloco de arrays
+HP_LOSS_BINS = np.arange(0, MAX_HP + 31, 10)
+
+
+def enemy_stats(level, difficulty, kind="enemy"):
+    # Mesmas contas de generate_enemies() / update_boss(): (hp, forca, defesa)
+    if kind == "summon":
+        return int(20 * difficulty), int(5 * difficulty), 1
+    hp = int((30 + level * 5) * difficulty)
+    strength = int((5 + level * 2) * difficulty)
+    if kind == "boss":
+        hp *= 5
+        strength *= 3
+    return hp, strength, 2
+
+
+def turn_intervals(speed, reference_speed):
+    # scheduler.action_interval sobre um array (mesma ordem de operacoes,
+    # entao os horarios somados batem bit a bit com os do jogo)
+    return COMBAT_TURN * reference_speed / np.maximum(np.asarray(speed, dtype=np.float64), 1)
+
+
+def enemy_kinds(level):
+    return ["boss", "summon"] if level == MAX_LEVELS else ["enemy"]
+
+
+def simulate_fights(hero_hp, hero_strength, hero_defense, enemy_hp, rng, hero_speed=HERO_REFERENCE_SPEED,
+                    enemy_speed=ENEMY_REFERENCE_SPEED):
+    # Todos os argumentos sao arrays 1-D do mesmo tamanho (uma luta por
+    # posicao; as velocidades tambem podem ser escalares). O laço é por
+    # acao: em cada passo cada luta resolve a proxima acao da agenda dela, e
+    # as lutas encerradas saem dos arrays de trabalho, que vão encolhendo.
+    hero_hp = np.asarray(hero_hp, dtype=np.int32)
+    n = hero_hp.shape[0]
+    turns = np.zeros(n, dtype=np.int32)
+    win = np.zeros(n, dtype=bool)
+    final_hp = hero_hp.copy()
+
+    idx = np.arange(n, dtype=np.int32)
+    h_hp = hero_hp.copy()
+    e_hp = np.array(enemy_hp, dtype=np.int32)
+    low = np.asarray(hero_strength, dtype=np.int32) // 2
+    span = (np.asarray(hero_strength, dtype=np.int32) - low + 1).astype(np.float64)
+    reduction = np.asarray(hero_defense, dtype=np.int32) // 2
+    h_step = np.broadcast_to(turn_intervals(hero_speed, HERO_REFERENCE_SPEED), (n,)).copy()
+    e_step = np.broadcast_to(turn_intervals(enemy_speed, ENEMY_REFERENCE_SPEED), (n,)).copy()
+    h_next = h_step.copy()
+    e_next = e_step.copy()
+    strikes = np.zeros(n, dtype=np.int32)
+    hero_first = np.ones(n, dtype=bool)  # empate: quem foi agendado antes
+
+    for _ in range(MAX_EVENTS):
+        if idx.size == 0:
+            break
+        hero_acts = (h_next < e_next) | ((h_next == e_next) & hero_first)
+        enemy_acts = ~hero_acts
+        hero_first = enemy_acts
+
+        # randint(strength // 2, strength)
+        k = np.flatnonzero(hero_acts)
+        e_hp[k] -= low[k] + (rng.random(k.size) * span[k]).astype(np.int32)
+        h_next[k] += h_step[k]
+        strikes[k] += 1
+
+        # max(1, randint(3, 30) - defense // 2)
+        k = np.flatnonzero(enemy_acts)
+        damage = rng.integers(ENEMY_DAMAGE_MIN, ENEMY_DAMAGE_MAX + 1, size=k.size, dtype=np.int32)
+        damage -= reduction[k]
+        np.maximum(damage, 1, out=damage)
+        h_hp[k] -= damage
+        e_next[k] += e_step[k]
+
+        killed = e_hp <= 0
+        dead = h_hp <= 0
+        over = killed | dead
+        if over.any():
+            done = idx[over]
+            win[done] = killed[over]
+            turns[done] = strikes[over]
+            final_hp[done] = h_hp[over]
+            alive = ~over
+            idx, h_hp, e_hp, strikes = idx[alive], h_hp[alive], e_hp[alive], strikes[alive]
+            low, span, reduction = low[alive], span[alive], reduction[alive]
+            h_step, e_step, h_next, e_next = h_step[alive], e_step[alive], h_next[alive], e_next[alive]
+            hero_first = hero_first[alive]
+
+    return win, turns, hero_hp - final_hp
+
+
+def summarize(win, turns, hp_lost):
+    hist, _ = np.histogram(np.minimum(hp_lost, HP_LOSS_BINS[-1] - 1), bins=HP_LOSS_BINS)
+    won_turns = turns[win]
+    return {
+        "fights": int(win.size),
+        "win_probability": float(win.mean()),
+        "expected_turns": float(turns.mean()),
+        "expected_turns_when_won": float(won_turns.mean()) if won_turns.size else None,
+        "hp_loss_mean": float(hp_lost.mean()),
+        "hp_loss_p50": float(np.percentile(hp_lost, 50)),
+        "hp_loss_p95": float(np.percentile(hp_lost, 95)),
+        "hp_loss_histogram": hist.tolist(),
+    }
+
+
+def build_scenarios(difficulties, levels, hero_hps, strengths, defenses, speeds=(HERO_REFERENCE_SPEED,),
+                    enemy_speeds=(ENEMY_REFERENCE_SPEED,)):
+    scenarios = []
+    for difficulty, level in itertools.product(difficulties, levels):
+        multiplier = DIFFICULTY_LEVELS[difficulty]
+        for kind in enemy_kinds(level):
+            hp, strength, _ = enemy_stats(level, multiplier, kind)
+            for hero_hp, hero_strength, hero_defense, hero_speed, enemy_speed in itertools.product(
+                    hero_hps, strengths, defenses, speeds, enemy_speeds):
+                scenarios.append({
+                    "difficulty": difficulty,
+                    "level": level,
+                    "enemy": kind,
+                    "enemy_hp": hp,
+                    "enemy_strength": strength,
+                    "enemy_speed": enemy_speed,
+                    "hero_hp": hero_hp,
+                    "hero_strength": hero_strength,
+                    "hero_defense": hero_defense,
+                    "hero_speed": hero_speed,
+                })
+    return scenarios
+
+
+def analyze(scenarios, fights_per_scenario=50_000, seed=None):
+    # Empilha varios cenarios num mesmo bloco de arrays para amortizar o
+    # custo por rodada do laço em Python
+    rng = np.random.default_rng(seed)
+    per_chunk = max(1, CHUNK_SIZE // fights_per_scenario)
+    results = []
+    for start in range(0, len(scenarios), per_chunk):
+        chunk = scenarios[start:start + per_chunk]
+        columns = {
+            key: np.repeat([s[key] for s in chunk], fights_per_scenario)
+            for key in ("hero_hp", "hero_strength", "hero_defense", "hero_speed", "enemy_hp", "enemy_speed")
+        }
+        win, turns, hp_lost = simulate_fights(
+            columns["hero_hp"], columns["hero_strength"], columns["hero_defense"], columns["enemy_hp"], rng,
+            columns["hero_speed"], columns["enemy_speed"]
+        )
+        for i, scenario in enumerate(chunk):
+            part = slice(i * fights_per_scenario, (i + 1) * fights_per_scenario)
+            results.append({**scenario, **summarize(win[part], turns[part], hp_lost[part])})
+    return results
+
+
+def reference_win_rate(hero_hp, hero_strength, hero_defense, enemy_hp, fights, seed=None,
+                       hero_speed=HERO_REFERENCE_SPEED, enemy_speed=ENEMY_REFERENCE_SPEED):
+    # Roda as lutas pelo proprio GameState.attack() para conferir o analisador
+    state = GameState(seed=seed)
+    wins = 0
+    for _ in range(fights):
+        hero = state.hero
+        hero.hp, hero.strength, hero.defense, hero.speed = hero_hp, hero_strength, hero_defense, hero_speed
+        state.set_enemies([])
+        state.turns.clear()  # derrota nao limpa a agenda; cada luta comeca do zero
+        enemy = state.add_enemy(Enemy(1, 1, enemy_hp, 0, 2, enemy_speed, rng=state.rng))
+        state.add_enemy(Enemy(2, 2, 1, 0, 2, 1, rng=state.rng))
+        state.combat_enemy = enemy
+        state.current_state = STATE_COMBAT
+        while state.current_state == STATE_COMBAT and enemy.hp > 0:
+            state.attack()
+        wins += state.current_state != STATE_GAME_OVER
+    return wins / fights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo do combate por dificuldade e nivel")
+    parser.add_argument("--fights", type=int, default=50_000, help="lutas simuladas por cenario")
+    parser.add_argument("--difficulty", nargs="*", default=list(DIFFICULTY_LEVELS))
+    parser.add_argument("--level", nargs="*", type=int, default=list(range(1, MAX_LEVELS + 1)))
+    parser.add_argument("--hp", nargs="*", type=int, default=[MAX_HP])
+    parser.add_argument("--strength", nargs="*", type=int, default=[10, 20, 40])
+    parser.add_argument("--defense", nargs="*", type=int, default=[5, 15, 30])
+    parser.add_argument("--speed", nargs="*", type=int, default=[HERO_REFERENCE_SPEED, 7, 10],
+                        help="velocidade do heroi (Boots/Gloves somam)")
+    parser.add_argument("--enemy-speed", nargs="*", type=int, default=[ENEMY_REFERENCE_SPEED])
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--check", action="store_true", help="confere contra GameState.attack()")
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args.difficulty, args.level, args.hp, args.strength, args.defense, args.speed,
+                                args.enemy_speed)
+    start = time.perf_counter()
+    results = analyze(scenarios, args.fights, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'difficulty':<10} {'lvl':>3} {'enemy':<7} {'e.hp':>5} {'e.spd':>5} {'str':>4} {'def':>4} {'spd':>4} "
+          f"{'win%':>7} {'turns':>6} {'hp lost':>8} {'p95':>5}")
+    for r in results:
+        print(f"{r['difficulty']:<10} {r['level']:>3} {r['enemy']:<7} {r['enemy_hp']:>5} {r['enemy_speed']:>5} "
+              f"{r['hero_strength']:>4} {r['hero_defense']:>4} {r['hero_speed']:>4} {r['win_probability'] * 100:>6.2f}% "
+              f"{r['expected_turns']:>6.2f} {r['hp_loss_mean']:>8.2f} {r['hp_loss_p95']:>5.0f}")
+    total = len(scenarios) * args.fights
+    print(f"{total} lutas em {elapsed:.2f}s ({total / elapsed / 1e6:.1f}M lutas/s)")
+
+    if args.check:
+        # Para cada par de velocidades, o cenario mais disputado (win% mais
+        # perto de 50%), onde uma ordem de golpes errada mais aparece
+        checked = {}
+        for r in results:
+            key = (r["hero_speed"], r["enemy_speed"])
+            if key not in checked or abs(r["win_probability"] - 0.5) < abs(checked[key]["win_probability"] - 0.5):
+                checked[key] = r
+        for r in checked.values():
+            ref = reference_win_rate(r["hero_hp"], r["hero_strength"], r["hero_defense"], r["enemy_hp"], 20_000,
+                                     args.seed, r["hero_speed"], r["enemy_speed"])
+            print(f"check {r['difficulty']} L{r['level']} {r['enemy']} spd {r['hero_speed']}/{r['enemy_speed']}: "
+                  f"analisador {r['win_probability']:.4f} / jogo {ref:.4f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"fights_per_scenario": args.fights, "seconds": elapsed, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import numpy as np
+
+from scheduler import TimingWheel, action_interval
+from spatial import OccupancyGrid
+
+# Populacao de inimigos em arrays contiguos (struct-of-arrays). O passo de
+# movimento e uma unica passada vetorizada para todos; objetos EnemyView so
+# sao criados para quem precisa ser desenhado ou entrou em combate.
+#
+# Quem anda em cada passo sai de uma TimingWheel: cada inimigo tem o
+# horario da proxima acao (coluna next_action, no relogio do store) e so os
+# do balde do tick sao processados.
+
+# Ticks entre acoes com speed 1 (a media da antiga chance de 2% por quadro)
+ACTION_TICKS = 50
+# Espalha a primeira acao de quem nasce junto (fracao aurea por slot; ids
+# mudam ao carregar um save, slots e relogio nao)
+PHASE_STEP = 0.6180339887498949
+# Mesma ordem de engine.DIRECTIONS
+DIR_X = np.array([1, -1, 0, 0], dtype=np.int32)
+DIR_Y = np.array([0, 0, 1, -1], dtype=np.int32)
+# Mesma ordem de engine.CLIPS
+CLIPS = ("idle", "walk")
+NO_IDS = np.zeros(0, dtype=np.int64)
+
+COLUMNS = {
+    "grid_x": np.int32,
+    "grid_y": np.int32,
+    "hp": np.int32,
+    "strength": np.int32,
+    "defense": np.int16,
+    "speed": np.int16,
+    "direction": np.int8,
+    "boss": np.bool_,
+    "can_summon": np.bool_,
+    "summon_cooldown": np.int16,
+    "frame": np.int32,
+    "moving": np.bool_,
+    "clip": np.int8,
+    "next_action": np.float64,
+    "ids": np.int64,
+}
+
+
+SNAPSHOT_COLUMNS = tuple(name for name in COLUMNS if name != "ids")
+
+
+class EnemyView:
+    # Proxy leve: le e escreve direto nos arrays do store pelo id estavel
+    __slots__ = ("store", "id")
+
+    image_prefix = "enemy"
+
+    def __init__(self, store, enemy_id):
+        self.store = store
+        self.id = enemy_id
+
+    def _get(self, column):
+        store = self.store
+        return getattr(store, column)[store.slots[self.id]].item()
+
+    def _set(self, column, value):
+        store = self.store
+        getattr(store, column)[store.slots[self.id]] = value
+        store.version += 1
+
+    grid_x = property(lambda self: self._get("grid_x"))
+    grid_y = property(lambda self: self._get("grid_y"))
+    hp = property(lambda self: self._get("hp"), lambda self, v: self._set("hp", v))
+    strength = property(lambda self: self._get("strength"), lambda self, v: self._set("strength", v))
+    defense = property(lambda self: self._get("defense"), lambda self, v: self._set("defense", v))
+    speed = property(lambda self: self._get("speed"), lambda self, v: self._set("speed", v))
+    boss = property(lambda self: self._get("boss"))
+    can_summon = property(lambda self: self._get("can_summon"), lambda self, v: self._set("can_summon", v))
+    summon_cooldown = property(lambda self: self._get("summon_cooldown"), lambda self, v: self._set("summon_cooldown", v))
+    frame = property(lambda self: self._get("frame"), lambda self, v: self._set("frame", v))
+    moving = property(lambda self: self._get("moving"), lambda self, v: self._set("moving", v))
+    clip = property(lambda self: self._get("clip"))
+
+    @property
+    def alive(self):
+        return self.id in self.store.slots
+
+    @property
+    def topleft(self):
+        slot = self.store.slots[self.id]
+        tile = self.store.tile_size
+        return (int(self.store.grid_x[slot]) * tile, int(self.store.grid_y[slot]) * tile)
+
+    @property
+    def image(self):
+        slot = self.store.slots[self.id]
+        return f"enemy_{CLIPS[self.store.clip[slot]]}_{self.store.frame[slot] % 2}"
+
+    def move(self, dx, dy):
+        return self.store.move(self.id, dx, dy)
+
+    def animate(self):
+        store = self.store
+        slot = store.slots[self.id]
+        store.frame[slot] += 1
+        store.clip[slot] = store.moving[slot]
+        store.moving[slot] = False
+
+    def __repr__(self):
+        return f"EnemyView(id={self.id}, pos=({self.grid_x}, {self.grid_y}), hp={self.hp})"
+
+
+class EnemyStore:
+    def __init__(self, world, tile_size, capacity=16):
+        # world: worldmap.ChunkedMap (limites e paredes)
+        self.world = world
+        self.tile_size = tile_size
+        self.count = 0
+        self.next_id = 0
+        self.slots = {}  # id -> posicao nos arrays
+        self.views = {}  # id -> EnemyView ja materializada
+        self.grid = OccupancyGrid(key=int)  # (x, y) -> ids
+        self.time = 0                       # passos de movimento ja rodados
+        self.schedule = TimingWheel()       # tick -> ids que agem nele
+        # Muda quando posicao, direcao, hp ou a populacao mudam (animacao
+        # nao conta); quem espelha o store compara so este numero
+        self.version = 0
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    # --- Gestao da populacao ---
+
+    def _grow(self, needed):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, grid_x, grid_y, hp, strength, defense, speed, direction=0, boss=False,
+              can_summon=False, summon_cooldown=0, next_action=None):
+        self._grow(self.count + 1)
+        slot = self.count
+        enemy_id = self.next_id
+        self.next_id += 1
+        self.grid_x[slot] = grid_x
+        self.grid_y[slot] = grid_y
+        self.hp[slot] = hp
+        self.strength[slot] = strength
+        self.defense[slot] = defense
+        self.speed[slot] = speed
+        self.direction[slot] = direction
+        self.boss[slot] = boss
+        self.can_summon[slot] = can_summon
+        self.summon_cooldown[slot] = summon_cooldown
+        self.frame[slot] = 0
+        self.moving[slot] = False
+        self.clip[slot] = 0
+        if next_action is None:
+            phase = ((slot + self.time) * PHASE_STEP) % 1.0
+            next_action = self.time + action_interval(ACTION_TICKS, speed) * phase
+        self.next_action[slot] = next_action
+        self.ids[slot] = enemy_id
+        self.slots[enemy_id] = slot
+        self.count += 1
+        self.grid.add(enemy_id, grid_x, grid_y)
+        self.schedule.schedule([enemy_id], [next_action], self.time)
+        self.version += 1
+        return self.view(enemy_id)
+
+    def add(self, enemy, direction=0):
+        # Copia um engine.Enemy (ou qualquer objeto com os mesmos campos)
+        return self.spawn(enemy.grid_x, enemy.grid_y, enemy.hp, enemy.strength, enemy.defense,
+                          enemy.speed, direction, enemy.boss, enemy.can_summon, enemy.summon_cooldown)
+
+    def remove(self, enemy):
+        enemy_id = enemy.id if isinstance(enemy, EnemyView) else enemy
+        slot = self.slots.pop(enemy_id)
+        self.grid.remove(enemy_id, int(self.grid_x[slot]), int(self.grid_y[slot]))
+        # Fica no balde da agenda; update_movement ignora ids mortos
+        self.views.pop(enemy_id, None)
+
+        # Troca com o ultimo para manter os arrays contiguos
+        last = self.count - 1
+        if slot != last:
+            for name in COLUMNS:
+                column = getattr(self, name)
+                column[slot] = column[last]
+            self.slots[int(self.ids[slot])] = slot
+        self.count = last
+        self.version += 1
+
+    def clear(self):
+        self.count = 0
+        self.slots.clear()
+        self.views.clear()
+        self.grid.clear()
+        self.schedule.clear()
+        self.version += 1
+
+    def export_columns(self, names=None):
+        # Copia compacta das colunas vivas (para save/snapshot)
+        n = self.count
+        return {name: getattr(self, name)[:n].copy() for name in (names or COLUMNS)}
+
+    def snapshot(self):
+        # Colunas vivas + relogio; ids sao de sessao e voltam novos
+        return self.time, self.export_columns(SNAPSHOT_COLUMNS)
+
+    def restore(self, state):
+        time, columns = state
+        self.import_columns(columns, time)
+
+    def import_columns(self, columns, time=None):
+        # Substitui a populacao; cada linha ganha um id novo, na ordem, e a
+        # agenda e refeita de next_action (relogio do store em `time`)
+        self.clear()
+        if time is not None:
+            self.time = time
+        n = len(next(iter(columns.values()))) if columns else 0
+        self._grow(max(n, 1))
+        for name in COLUMNS:
+            # Colunas ausentes (frame, moving...) voltam a zero
+            getattr(self, name)[:n] = columns.get(name, 0)
+        self.count = n
+        self.ids[:n] = np.arange(self.next_id, self.next_id + n)
+        self.next_id += n
+        if "next_action" not in columns:
+            phase = ((np.arange(n) + self.time) * PHASE_STEP) % 1.0
+            self.next_action[:n] = self.time + ACTION_TICKS / np.maximum(self.speed[:n], 1) * phase
+        ids = self.ids[:n].tolist()
+        for slot, (enemy_id, x, y) in enumerate(zip(ids, self.grid_x[:n].tolist(), self.grid_y[:n].tolist())):
+            self.slots[enemy_id] = slot
+            self.grid.add(enemy_id, x, y)
+        self.schedule.schedule(ids, self.next_action[:n], self.time)
+
+    def view(self, enemy_id):
+        view = self.views.get(enemy_id)
+        if view is None:
+            view = self.views[enemy_id] = EnemyView(self, enemy_id)
+        return view
+
+    # --- Consultas ---
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # Materializa todos; prefira visible() no render
+        return iter([self.view(int(i)) for i in self.ids[:self.count]])
+
+    def __getitem__(self, index):
+        return self.view(int(self.ids[:self.count][index]))
+
+    def __bool__(self):
+        return self.count > 0
+
+    def at(self, x, y):
+        return [self.view(enemy_id) for enemy_id in self.grid.at(x, y)]
+
+    def visible(self, x0, y0, x1, y1):
+        # Somente inimigos dentro do retangulo de tiles [x0, x1) x [y0, y1)
+        n = self.count
+        gx = self.grid_x[:n]
+        gy = self.grid_y[:n]
+        mask = (gx >= x0) & (gx < x1) & (gy >= y0) & (gy < y1)
+        return [self.view(int(i)) for i in self.ids[:n][mask]]
+
+    def animate_visible(self, x0, y0, x1, y1):
+        # Anima so quem esta no retangulo e devolve (x, y, clip, frame, boss)
+        # de cada um, sem materializar views
+        n = self.count
+        gx = self.grid_x[:n]
+        gy = self.grid_y[:n]
+        idx = np.flatnonzero((gx >= x0) & (gx < x1) & (gy >= y0) & (gy < y1))
+        if idx.size == 0:
+            return []
+        self.frame[idx] += 1
+        self.clip[idx] = self.moving[idx]
+        self.moving[idx] = False
+        return list(zip(gx[idx].tolist(), gy[idx].tolist(), self.clip[idx].tolist(),
+                        self.frame[idx].tolist(), self.boss[idx].tolist()))
+
+    def tick_frames(self):
+        self.frame[:self.count] += 1
+
+    def boss_count(self):
+        return int(np.count_nonzero(self.boss[:self.count]))
+
+    # --- Movimento ---
+
+    def move(self, enemy_id, dx, dy):
+        slot = self.slots[enemy_id]
+        old_x = int(self.grid_x[slot])
+        old_y = int(self.grid_y[slot])
+        new_x = old_x + dx
+        new_y = old_y + dy
+        if self.world.is_walkable(new_x, new_y):
+            self.grid_x[slot] = new_x
+            self.grid_y[slot] = new_y
+            self.moving[slot] = True
+            self.grid.move(enemy_id, old_x, old_y, new_x, new_y)
+            self.version += 1
+            return True
+        return False
+
+    def update_movement(self, rng, field=None):
+        # Avanca um passo do relogio; quem tem acao vencida anda na direcao
+        # atual e, se bater na borda (ou numa parede), sorteia outra. Com um
+        # pathfinding.FlowField, quem esta dentro do campo segue o gradiente
+        # ate o heroi. Devolve os ids de quem agiu
+        self.time += 1
+        due = self.schedule.pop(self.time)
+        # Em ordem de slot, que um save preserva (a ordem no balde nao)
+        rolled = sorted([slot for slot in map(self.slots.get, due) if slot is not None])
+        if not rolled:
+            return NO_IDS
+        self.version += 1
+        rolled = np.array(rolled, dtype=np.int64)
+        old_x = self.grid_x[rolled]
+        old_y = self.grid_y[rolled]
+        if field is not None:
+            best, chasing = field.best_directions(old_x, old_y)
+            self.direction[rolled[chasing]] = best[chasing]
+        direction = self.direction[rolled]
+        new_x = old_x + DIR_X[direction]
+        new_y = old_y + DIR_Y[direction]
+        world = self.world
+        inside = (new_x >= 0) & (new_x < world.width) & (new_y >= 0) & (new_y < world.height)
+        if world.has_walls:
+            # Paredes so sao consultadas para quem passou nos limites
+            candidates = np.flatnonzero(inside)
+            is_walkable = world.is_walkable
+            for i, x, y in zip(candidates.tolist(), new_x[candidates].tolist(), new_y[candidates].tolist()):
+                if not is_walkable(x, y):
+                    inside[i] = False
+
+        moved = rolled[inside]
+        self.grid_x[moved] = new_x[inside]
+        self.grid_y[moved] = new_y[inside]
+        self.moving[moved] = True
+
+        blocked = rolled[~inside]
+        if blocked.size:
+            self.direction[blocked] = rng.integers(0, 4, size=blocked.size)
+
+        # O indice por tile so e tocado para quem de fato andou
+        grid = self.grid
+        for enemy_id, ox, oy, nx, ny in zip(self.ids[moved].tolist(), old_x[inside].tolist(), old_y[inside].tolist(),
+                                            new_x[inside].tolist(), new_y[inside].tolist()):
+            grid.move(enemy_id, ox, oy, nx, ny)
+
+        # Proxima acao pela velocidade, com +-50% de folga para ninguem
+        # andar em compasso com os outros
+        acted = self.ids[rolled]
+        interval = ACTION_TICKS / np.maximum(self.speed[rolled], 1)
+        next_action = self.time + interval * (0.5 + rng.random(rolled.size))
+        self.next_action[rolled] = next_action
+        self.schedule.schedule(acted.tolist(), next_action, self.time)
+        return acted
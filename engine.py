@@ -0,0 +1,684 @@
+import random
+from collections import deque
+
+import numpy as np
+
+from enemies import EnemyStore
+from events import DAMAGE, DROP, HEAL, KILL, LEVEL, SALE, check_event
+from inventory import Inventory
+from items import SALE_PRICES
+from loot import CHESTS_PER_LEVEL, LOOT
+from pathfinding import FlowField
+from profiler import FrameProfiler
+from scheduler import ActorScheduler, action_interval
+from stats import BASE_STATS, StatEngine
+from worldmap import ChunkedMap
+from spatial import OccupancyGrid, build_index
+
+# Regras do jogo sem pgzero, janela ou audio. main.py apenas desenha o
+# estado e repassa teclado/mouse; simulacoes usam GameState.step() direto.
+
+# --- Constants ---
+WIDTH = 640
+HEIGHT = 480
+TILE_SIZE = 32
+ROWS = HEIGHT // TILE_SIZE
+COLS = WIDTH // TILE_SIZE
+
+MAX_LEVELS = 3
+MAX_HP = 100
+
+# Turnos de combate: intervalo entre acoes na velocidade de referencia de
+# cada lado (heroi sem itens, inimigo comum); com as duas na referencia os
+# golpes alternam como sempre
+COMBAT_TURN = 10
+HERO_REFERENCE_SPEED = BASE_STATS["speed"]
+ENEMY_REFERENCE_SPEED = 1
+HERO_TURN = "hero"
+ENEMY_TURN = "enemy"
+SUMMON_COOLDOWN = 3  # acoes do chefe entre invocacoes
+COMBAT_LOG_SIZE = 10  # linhas guardadas para a tela de combate
+
+# Trilhas (nomes em music/)
+MENU_MUSIC = "background_music"
+BOSS_MUSIC = "boss_music"
+VICTORY_MUSIC = "victory_music"
+
+# Game states
+STATE_MENU = "menu"
+STATE_DIFFICULTY_SELECTION = "difficulty_selection"
+STATE_GAME = "game"
+STATE_COMBAT = "combat"
+STATE_GAME_OVER = "game_over"
+STATE_VICTORY = "victory"
+STATE_INSTRUCTIONS = "instructions"
+
+# Difficulties with multipliers
+DIFFICULTY_LEVELS = {
+    "Easy": 1.0,
+    "Normal": 1.5,
+    "Hard": 3.0,
+    "Legendary": 9.0
+}
+
+HEALING_ZONES = [
+    {"grid_x": 5, "grid_y": 2},
+    {"grid_x": 8, "grid_y": 6}
+]
+
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+# Clips de animacao (images/{prefixo}_{clip}_{n}.png); o indice e o clip
+CLIPS = ("idle", "walk")
+CLIP_IDLE = 0
+CLIP_WALK = 1
+
+# Teclas de movimento (nomes do enum keys do pgzero)
+MOVE_KEYS = {
+    "UP": (0, -1),
+    "DOWN": (0, 1),
+    "LEFT": (-1, 0),
+    "RIGHT": (1, 0),
+}
+
+# --- Buttons (x, y, w, h) ---
+MENU_BUTTONS = {
+    "start": (WIDTH // 2 - 80, 150, 160, 40),
+    "sound": (WIDTH // 2 - 80, 210, 160, 40),
+    "quit": (WIDTH // 2 - 80, 270, 160, 40),
+    "instructions": (WIDTH // 2 - 80, 330, 160, 40)
+}
+
+button_start_y = 150
+button_height = 40
+button_spacing = 15
+DIFFICULTY_BUTTONS = {}
+for i, name in enumerate(DIFFICULTY_LEVELS.keys()):
+    DIFFICULTY_BUTTONS[name] = (WIDTH // 2 - 80, button_start_y + i * (button_height + button_spacing), 160, button_height)
+START_GAME_BUTTON = (WIDTH // 2 - 80, button_start_y + len(DIFFICULTY_LEVELS) * (button_height + button_spacing) + 20, 160, 40)
+
+
+def collide(rect, pos):
+    x, y, w, h = rect
+    return x <= pos[0] < x + w and y <= pos[1] < y + h
+
+
+def enemy_kind(enemy):
+    return "boss" if enemy.boss else "enemy"
+
+
+def level_music(level):
+    return BOSS_MUSIC if level == MAX_LEVELS else MENU_MUSIC
+
+
+def next_music(level):
+    # Trilha da proxima troca a partir deste nivel (para pre-carregar)
+    return level_music(level + 1) if level < MAX_LEVELS else VICTORY_MUSIC
+
+
+# --- Classes ---
+
+
+class Character:
+    def __init__(self, image_prefix, grid_x, grid_y, hp, strength, defense, speed):
+        self.image_prefix = image_prefix
+        self.clip = CLIP_IDLE
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.frame = 0
+        self.hp = hp
+        self.strength = strength
+        self.defense = defense
+        self.speed = speed
+        self.moving = False
+
+    @property
+    def topleft(self):
+        return (self.grid_x * TILE_SIZE, self.grid_y * TILE_SIZE)
+
+    def move(self, dx, dy, world=None):
+        new_x = self.grid_x + dx
+        new_y = self.grid_y + dy
+        if world is not None:
+            allowed = world.is_walkable(new_x, new_y)
+        else:
+            allowed = 0 <= new_x < COLS and 0 <= new_y < ROWS
+        if allowed:
+            self.grid_x = new_x
+            self.grid_y = new_y
+            self.moving = True
+
+    @property
+    def image(self):
+        # Nome do quadro atual; o render usa (clip, frame) direto no atlas
+        return f"{self.image_prefix}_{CLIPS[self.clip]}_{self.frame % 2}"
+
+    def animate(self):
+        # So avanca indices: andou desde o ultimo quadro -> clip de andar
+        self.frame += 1
+        self.clip = CLIP_WALK if self.moving else CLIP_IDLE
+        self.moving = False
+
+
+class Hero(Character):
+    def __init__(self, grid_x=1, grid_y=1):
+        super().__init__("hero", grid_x, grid_y, hp=MAX_HP, strength=10, defense=5, speed=5)
+        self.exp = 0
+        self.inventory = Inventory()
+        # Atributos vêm do StatEngine; equipment é o dict de slots dele
+        self.stats = StatEngine()
+        self.equipment = self.stats.equipment
+        self.apply_stats()
+
+    def apply_stats(self):
+        self.strength, self.defense, self.speed = self.stats.totals
+
+    def update_stats(self):
+        self.stats.recompute()
+        self.apply_stats()
+
+    def equip_item(self, item):
+        self.stats.equip(item)
+        self.apply_stats()
+
+    def equip_from_inventory(self, position):
+        item = self.inventory[position]
+        self.equip_item(item)
+        self.inventory.mark_equipped(position)
+        return item
+
+    def unequip_item(self, item_type):
+        self.stats.unequip(item_type)
+        self.inventory.unmark_equipped(item_type)
+        self.apply_stats()
+
+    def reset(self):
+        # Reseta atributos do heroi, inventario, hp, etc
+        self.hp = MAX_HP
+        self.exp = 0
+        self.inventory.clear()
+        self.stats.clear()
+        self.apply_stats()
+
+
+class Enemy(Character):
+    def __init__(self, grid_x, grid_y, hp, strength, defense, speed, boss=False, rng=random):
+        super().__init__("enemy", grid_x, grid_y, hp, strength, defense, speed)
+        self.boss = boss
+        self.direction = rng.choice(DIRECTIONS)
+        self.can_summon = False
+        self.summon_cooldown = 0
+
+
+# --- Functions ---
+
+
+def random_position(rng, world=None):
+    if world is not None:
+        return world.random_floor(rng)
+    return rng.randint(1, COLS - 2), rng.randint(1, ROWS - 2)
+
+
+def generate_legendary_chests(current_level, rng=random, world=None, difficulty=1.0, np_rng=None):
+    # Itens de todos os baus num sorteio so (vetorizado em np_rng) da tabela
+    # de loot do nivel; as posicoes saem de rng
+    chests = []
+    for items in LOOT.roll_chests(CHESTS_PER_LEVEL, current_level, difficulty, np_rng):
+        pos_x, pos_y = random_position(rng, world)
+        chest = {
+            "pos_x": pos_x,
+            "pos_y": pos_y,
+            "items": items,
+            "opened": False
+        }
+        chests.append(chest)
+    return chests
+
+
+def generate_enemies(level, difficulty, boss=False, rng=random, world=None):
+    new_enemies = []
+    quantity = rng.randint(1, 3) if not boss else 1
+    for i in range(quantity):
+        grid_x, grid_y = random_position(rng, world)
+        e = Enemy(
+            grid_x=grid_x,
+            grid_y=grid_y,
+            hp=int((30 + level * 5) * difficulty),
+            strength=int((5 + level * 2) * difficulty),
+            defense=2,
+            speed=1,
+            boss=boss,
+            rng=rng
+        )
+        new_enemies.append(e)
+
+    if boss:
+        boss_enemy = new_enemies[0]
+        boss_enemy.hp *= 5
+        boss_enemy.strength *= 3
+        boss_enemy.can_summon = True
+        boss_enemy.summon_cooldown = SUMMON_COOLDOWN
+        return new_enemies, boss_enemy
+    else:
+        return new_enemies, None
+
+
+def calculate_attributes_with_item(hero, item):
+    # (forca, defesa, velocidade) se o item substituir o do mesmo slot
+    return hero.stats.with_item(item)
+
+
+def calculate_sale_price(item):
+    # Preco base da raridade x nivel do item
+    return SALE_PRICES[item.rarity] * item.level
+
+
+# --- Estado do jogo ---
+
+
+class GameState:
+    def __init__(self, difficulty="Normal", seed=None, rng=None, map_size=None, wall_density=0.0, pursuit=True,
+                 world=None):
+        # Toda a aleatoriedade da partida sai de self.rng / self.np_rng; sem
+        # seed explicito sorteamos um e guardamos, para gravar e reproduzir
+        if rng is None and seed is None:
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        # Gerador NumPy para os passos vetorizados, derivado do mesmo seed
+        self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        self.observers = []
+        self._events = None
+
+        self.current_state = STATE_MENU
+        self.current_level = 1
+        self.selected_difficulty = difficulty
+        self.difficulty_multiplier = DIFFICULTY_LEVELS[difficulty]
+        self.sound_enabled = True
+
+        self.hero = Hero()
+        self.healing_zones = [dict(zone) for zone in HEALING_ZONES]
+
+        # Mapa classico = uma tela (COLS x ROWS); map_size=(w, h) liga o modo
+        # de mapa grande em chunks, com paredes esparsas se wall_density > 0.
+        # world= reaproveita o mapa de outra partida (copias para busca)
+        width, height = map_size or (COLS, ROWS)
+        keep_clear = [(1, 1)] + [(zone["grid_x"], zone["grid_y"]) for zone in self.healing_zones]
+        map_seed = self.rng.getrandbits(32)
+        self.world = world or ChunkedMap(width, height, wall_density=wall_density, seed=map_seed, keep_clear=keep_clear)
+
+        self.enemies = EnemyStore(self.world, TILE_SIZE)
+        # Um unico campo de distancias ate o heroi, usado por todos os
+        # inimigos; pursuit=False volta ao passeio aleatorio original
+        self.flow_field = FlowField(self.world) if pursuit else None
+        self.boss_enemy = None
+        self.combat_enemy = None
+        # Ordem de acao no combate (heroi x inimigo) pela velocidade
+        self.turns = ActorScheduler()
+        self.legendary_chests = []
+
+        # Indices por tile: colisao (dentro do EnemyStore), baus e cura
+        # viram buscas O(1)
+        self.chest_index = OccupancyGrid()
+        self.zone_index = build_index(self.healing_zones, "grid_x", "grid_y")
+        self.money = 0
+        self.combat_log = deque(maxlen=COMBAT_LOG_SIZE)
+
+        self.inventory_visible = False
+        self.item_selected = None
+        self.start_visible = 0
+        self.items_per_page = 5
+        self.tick = 0
+        # Desligado por padrao; main.py compartilha o dele para medir as
+        # fases internas do update
+        self.profiler = FrameProfiler()
+
+    # --- Observadores (render, som, logs) ---
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def emit(self, event, **data):
+        if __debug__:
+            check_event(event, data)
+        if self._events is not None:
+            self._events.append((event, data))
+        for observer in self.observers:
+            observer(event, data)
+
+    # --- Entrada ---
+
+    def step(self, actions=()):
+        # Aplica as entradas do tick (nomes de teclas ou ("click", pos)) e
+        # roda um update(); devolve os eventos emitidos no caminho
+        events = self._events = []
+        for action in actions:
+            self.handle_input(action)
+        self.update()
+        self._events = None
+        return events
+
+    def handle_input(self, action):
+        if isinstance(action, tuple):
+            kind, pos = action
+            if kind == "click":
+                self.handle_click(pos)
+        else:
+            self.handle_key(action)
+
+    def handle_click(self, pos):
+        if self.current_state == STATE_MENU:
+            if collide(MENU_BUTTONS["start"], pos):
+                self.current_state = STATE_DIFFICULTY_SELECTION
+            elif collide(MENU_BUTTONS["sound"], pos):
+                self.sound_enabled = not self.sound_enabled
+                self.emit("sound_toggled", enabled=self.sound_enabled)
+            elif collide(MENU_BUTTONS["instructions"], pos):
+                self.current_state = STATE_INSTRUCTIONS
+            elif collide(MENU_BUTTONS["quit"], pos):
+                self.emit("quit")
+
+        elif self.current_state == STATE_DIFFICULTY_SELECTION:
+            for name, rect in DIFFICULTY_BUTTONS.items():
+                if collide(rect, pos):
+                    self.select_difficulty(name)
+            if self.selected_difficulty and collide(START_GAME_BUTTON, pos):
+                self.new_game()
+
+    def handle_key(self, key):
+        if self.current_state == STATE_DIFFICULTY_SELECTION:
+            options = list(DIFFICULTY_LEVELS.keys())
+            index = options.index(self.selected_difficulty)
+            if key == "UP":
+                self.select_difficulty(options[(index - 1) % len(options)])
+            elif key == "DOWN":
+                self.select_difficulty(options[(index + 1) % len(options)])
+            elif key == "RETURN":
+                self.new_game()
+
+        elif self.current_state == STATE_GAME:
+            if key in MOVE_KEYS:
+                self.move_hero(*MOVE_KEYS[key])
+            elif key == "I":
+                self.toggle_inventory()
+            elif self.inventory_visible:
+                if key == "W":
+                    self.select_previous_item()
+                elif key == "S":
+                    self.select_next_item()
+                elif key == "E":
+                    self.equip_selected()
+                elif key == "D":
+                    self.sell_selected()
+
+        elif self.current_state == STATE_INSTRUCTIONS:
+            if key == "RETURN":
+                self.current_state = STATE_MENU
+
+        elif self.current_state == STATE_COMBAT:
+            if key == "SPACE":
+                self.attack()
+
+        elif self.current_state == STATE_VICTORY:
+            if key == "RETURN":
+                self.return_to_menu()
+
+    # --- Fluxo de jogo ---
+
+    def select_difficulty(self, name):
+        self.selected_difficulty = name
+        self.difficulty_multiplier = DIFFICULTY_LEVELS[name]
+
+    def new_game(self):
+        self.current_level = 1
+        self.set_enemies(*generate_enemies(self.current_level, self.difficulty_multiplier, rng=self.rng, world=self.world))
+        self.start_level()
+        self.current_state = STATE_GAME
+
+    def return_to_menu(self):
+        self.current_state = STATE_MENU
+        self.current_level = 1
+        self.set_enemies(*generate_enemies(self.current_level, self.difficulty_multiplier, rng=self.rng, world=self.world))
+        self.hero.reset()
+        self.emit("music", track=MENU_MUSIC)
+
+    def start_level(self):
+        self.hero.grid_x = 1
+        self.hero.grid_y = 1
+        self.legendary_chests = generate_legendary_chests(self.current_level, self.rng, self.world,
+                                                         self.difficulty_multiplier, self.np_rng)
+        self.chest_index = build_index(self.legendary_chests, "pos_x", "pos_y")
+        self.emit(LEVEL, level=self.current_level)
+
+    def advance_level(self):
+        if self.current_level < MAX_LEVELS:
+            self.current_level += 1
+            if self.current_level == MAX_LEVELS:
+                self.set_enemies(*generate_enemies(self.current_level, self.difficulty_multiplier, boss=True, rng=self.rng, world=self.world))
+            else:
+                self.set_enemies(*generate_enemies(self.current_level, self.difficulty_multiplier, rng=self.rng, world=self.world))
+            self.emit("music", track=level_music(self.current_level))
+            self.start_level()
+
+    def set_enemies(self, enemies, boss_enemy=None):
+        # Recebe engine.Enemy e guarda no EnemyStore; boss_enemy vira a view
+        self.enemies.clear()
+        self.boss_enemy = None
+        for enemy in enemies:
+            view = self.add_enemy(enemy)
+            if enemy is boss_enemy:
+                self.boss_enemy = view
+
+    def add_enemy(self, enemy):
+        return self.enemies.add(enemy, DIRECTIONS.index(enemy.direction))
+
+    def remove_enemy(self, enemy):
+        self.enemies.remove(enemy)
+
+    def update_boss(self):
+        # Uma acao do chefe: conta a recarga e invoca quando zera
+        boss = self.boss_enemy
+        if boss and boss.can_summon:
+            boss.summon_cooldown -= 1
+            if boss.summon_cooldown <= 0:
+                if len(self.enemies) < 6:
+                    grid_x, grid_y = random_position(self.rng, self.world)
+                    summon = Enemy(
+                        grid_x=grid_x,
+                        grid_y=grid_y,
+                        hp=int(20 * self.difficulty_multiplier),
+                        strength=int(5 * self.difficulty_multiplier),
+                        defense=1,
+                        speed=1,
+                        boss=False,
+                        rng=self.rng
+                    )
+                    self.add_enemy(summon)
+                boss.summon_cooldown = SUMMON_COOLDOWN
+
+    def update(self):
+        self.tick += 1
+        hero = self.hero
+        for zone in self.zone_index.at(hero.grid_x, hero.grid_y):
+            if hero.hp < MAX_HP:
+                hero.hp = min(hero.hp + 1, MAX_HP)
+
+        if self.current_state == STATE_GAME:
+            profiler = self.profiler
+            field = self.flow_field
+            if field is not None:
+                # Sem custo se o heroi nao mudou de tile
+                with profiler.phase("flow_field"):
+                    field.update(hero.grid_x, hero.grid_y)
+            with profiler.phase("enemies"):
+                acted = self.enemies.update_movement(self.np_rng, field)
+            # O chefe so conta a recarga quando a agenda lhe da a vez
+            boss = self.boss_enemy
+            if boss is not None and acted.size and boss.alive and (acted == boss.id).any():
+                self.update_boss()
+            self.check_collision()
+
+    def check_collision(self):
+        hero = self.hero
+        for enemy in self.enemies.at(hero.grid_x, hero.grid_y):
+            self.combat_enemy = enemy
+            self.current_state = STATE_COMBAT
+        if self.current_state == STATE_COMBAT:
+            self.start_combat()
+
+    def check_legendary_chest_interaction(self):
+        hero = self.hero
+        for chest in self.chest_index.at(hero.grid_x, hero.grid_y):
+            if not chest["opened"]:
+                chest["opened"] = True
+                hero.inventory.extend(chest["items"])
+                self.emit("chest_opened", chest=chest)
+
+    def check_healing_zone(self):
+        hero = self.hero
+        for zone in self.zone_index.at(hero.grid_x, hero.grid_y):
+            if hero.hp < MAX_HP:
+                healed = min(hero.hp + 15, MAX_HP) - hero.hp
+                hero.hp += healed
+                self.emit(HEAL, amount=healed, hp=hero.hp)
+
+    def move_hero(self, dx, dy):
+        hero = self.hero
+        new_x = hero.grid_x + dx
+        new_y = hero.grid_y + dy
+
+        if self.world.is_walkable(new_x, new_y):
+            hero.move(dx, dy, self.world)
+            self.emit("step")
+            self.check_collision()
+            self.check_legendary_chest_interaction()
+            self.check_healing_zone()
+
+    # --- Combate ---
+
+    def add_to_combat_log(self, message):
+        # Ring buffer: so as ultimas COMBAT_LOG_SIZE mensagens ficam
+        self.combat_log.append(message)
+
+    def clear_combat_log(self):
+        self.combat_log.clear()
+
+    def start_combat(self):
+        # Os dois comecam um intervalo a frente; empate fica com o heroi
+        turns = self.turns
+        turns.clear()
+        turns.schedule(HERO_TURN, self.hero_turn_interval())
+        turns.schedule(ENEMY_TURN, self.enemy_turn_interval())
+
+    def hero_turn_interval(self):
+        return action_interval(COMBAT_TURN, self.hero.speed, HERO_REFERENCE_SPEED)
+
+    def enemy_turn_interval(self):
+        return action_interval(COMBAT_TURN, self.combat_enemy.speed, ENEMY_REFERENCE_SPEED)
+
+    def enemy_turns(self):
+        # Inimigo age ate a vez do heroi (mais de uma vez se for mais rapido)
+        turns = self.turns
+        while self.hero.hp > 0 and turns.peek()[1] == ENEMY_TURN:
+            time, _ = turns.pop()
+            self.enemy_attack()
+            turns.schedule(ENEMY_TURN, time + self.enemy_turn_interval())
+
+    def enemy_attack(self):
+        hero = self.hero
+        enemy = self.combat_enemy
+        damage_enemy = self.rng.randint(3, 30) - hero.defense // 2
+        damage_enemy = max(1, damage_enemy)
+        hero.hp -= damage_enemy
+
+        self.add_to_combat_log(f"{enemy.image_prefix} dealt {damage_enemy} damage to Hero!")
+        self.emit(DAMAGE, source=enemy_kind(enemy), target="hero", amount=damage_enemy, hp=hero.hp)
+
+    def attack(self):
+        hero = self.hero
+        enemy = self.combat_enemy
+        turns = self.turns
+        if HERO_TURN not in turns:
+            self.start_combat()
+        # Um inimigo mais rapido pode ter vez antes do golpe
+        self.enemy_turns()
+        if hero.hp <= 0:
+            self.current_state = STATE_GAME_OVER
+            return
+        time, _ = turns.pop()
+        turns.schedule(HERO_TURN, time + self.hero_turn_interval())
+
+        damage_hero = self.rng.randint(hero.strength // 2, hero.strength)
+        enemy.hp -= damage_hero
+
+        self.add_to_combat_log(f"Hero dealt {damage_hero} damage to {enemy.image_prefix}!")
+        self.emit(DAMAGE, source="hero", target=enemy_kind(enemy), amount=damage_hero, hp=enemy.hp)
+
+        if enemy.hp <= 0:
+            hero.exp += 10
+            turns.clear()
+            self.clear_combat_log()
+            self.emit(KILL, target=enemy_kind(enemy), exp=10)
+            drop = LOOT.roll(self.current_level, self.difficulty_multiplier, self.rng)
+            hero.inventory.append(drop)
+            self.emit(DROP, item=drop.name, template_id=drop.template_id, rarity=drop.rarity)
+            if getattr(enemy, "boss", False):
+                self.current_state = STATE_VICTORY
+                self.emit("music", track=VICTORY_MUSIC)
+                self.set_enemies([], None)
+            else:
+                self.remove_enemy(enemy)
+                self.update_boss()
+
+                if not self.enemies or (len(self.enemies) == 1 and self.enemies.boss_count()):
+                    self.advance_level()
+                self.current_state = STATE_GAME
+        else:
+            self.enemy_turns()
+
+        if hero.hp <= 0:
+            self.current_state = STATE_GAME_OVER
+
+    # --- Inventário ---
+
+    def toggle_inventory(self):
+        self.inventory_visible = not self.inventory_visible
+        if self.inventory_visible:
+            self.item_selected = 0 if self.hero.inventory else None
+            self.start_visible = 0
+
+    def select_previous_item(self):
+        if self.item_selected is not None and self.item_selected > 0:
+            self.item_selected -= 1
+            # Ajusta a janela de itens visíveis para cima
+            if self.item_selected < self.start_visible:
+                self.start_visible = self.item_selected
+
+    def select_next_item(self):
+        if self.item_selected is not None and self.item_selected < len(self.hero.inventory) - 1:
+            self.item_selected += 1
+            # Ajusta a janela de itens visíveis para baixo
+            if self.item_selected >= self.start_visible + self.items_per_page:
+                self.start_visible = self.item_selected - self.items_per_page + 1
+
+    def equip_selected(self):
+        if self.item_selected is None:
+            return
+        self.hero.equip_from_inventory(self.item_selected)
+        self.inventory_visible = False
+        self.item_selected = None
+
+    def sell_selected(self):
+        if self.item_selected is None:
+            return
+        inventory = self.hero.inventory
+        item = inventory.pop(self.item_selected)
+        sale_price = calculate_sale_price(item)
+        self.money += sale_price
+        self.emit(SALE, item=item.name, template_id=item.template_id, price=sale_price, money=self.money)
+        # Ajusta seleção
+        if self.item_selected >= len(inventory):
+            self.item_selected = len(inventory) - 1 if inventory else None
+        # Ajusta janela se necessário
+        if self.start_visible > 0 and self.start_visible + self.items_per_page > len(inventory):
+            self.start_visible = max(0, len(inventory) - self.items_per_page)
@@ -0,0 +1,151 @@
+import argparse
+import gzip
+import json
+import queue
+import threading
+import time
+from collections import Counter
+
+# Eventos de jogo com tipo e campos fixos, emitidos por GameState.emit() no
+# lugar dos antigos print(). Os observadores continuam recebendo (evento,
+# dados); EventWriter grava os tipos abaixo num JSONL comprimido para
+# analise offline, serializando numa thread propria: o handler de entrada so
+# enfileira uma tupla.
+
+DAMAGE = "damage"
+KILL = "kill"
+DROP = "drop"
+SALE = "sale"
+HEAL = "heal"
+LEVEL = "level_started"
+
+# Campos de cada tipo (todos valores JSON simples)
+EVENT_FIELDS = {
+    DAMAGE: ("source", "target", "amount", "hp"),  # hp: o que sobrou no alvo
+    KILL: ("target", "exp"),
+    DROP: ("item", "template_id", "rarity"),
+    SALE: ("item", "template_id", "price", "money"),
+    HEAL: ("amount", "hp"),
+    LEVEL: ("level",),
+}
+_FIELD_SETS = {event: frozenset(fields) for event, fields in EVENT_FIELDS.items()}
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def check_event(event, data):
+    # GameState.emit() chama sob __debug__: um tipo conhecido tem de vir
+    # com exatamente os seus campos, cada um um valor JSON simples
+    fields = _FIELD_SETS.get(event)
+    if fields is None:
+        return
+    if data.keys() != fields:
+        raise ValueError(f"{event!r} event needs fields {', '.join(EVENT_FIELDS[event])}; got {', '.join(data) or 'none'}")
+    for name, value in data.items():
+        if not isinstance(value, _JSON_SCALARS):
+            raise ValueError(f"{event!r} event field {name!r} is {type(value).__name__}, not a JSON scalar")
+
+
+BATCH_SIZE = 512
+FLUSH_INTERVAL = 1.0  # segundos ate um lote incompleto ir para o arquivo
+_STOP = object()
+
+
+class EventWriter:
+    def __init__(self, game, path, kinds=EVENT_FIELDS, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.game = game
+        self.path = path
+        self.kinds = frozenset(kinds)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._queue = queue.SimpleQueue()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+        game.add_observer(self)
+
+    def __call__(self, event, data):
+        if event in self.kinds:
+            self._queue.put((self.game.tick, event, data))
+
+    def _run(self):
+        get = self._queue.get
+        write = self._file.write
+        dumps = json.JSONEncoder(separators=(",", ":")).encode
+        running = True
+        while running:
+            # Espera o primeiro evento do lote e junta o que chegar ate encher
+            # ou vencer o intervalo
+            batch = [get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(get(timeout=timeout))
+                except queue.Empty:
+                    break
+            lines = []
+            for record in batch:
+                if record is _STOP:
+                    running = False
+                    break
+                tick, event, data = record
+                lines.append(dumps({"tick": tick, "event": event, **data}))
+            if lines:
+                write("\n".join(lines) + "\n")
+                self.written += len(lines)
+
+    def close(self):
+        # Grava o que estiver na fila e fecha o arquivo
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._file.close()
+        if self in self.game.observers:
+            self.game.observers.remove(self)
+
+
+def read_events(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def summarize(records):
+    counts = Counter()
+    damage = Counter()
+    sales = 0
+    healed = 0
+    last_tick = 0
+    for record in records:
+        event = record["event"]
+        counts[event] += 1
+        last_tick = max(last_tick, record["tick"])
+        if event == DAMAGE:
+            damage[record["source"], record["target"]] += record["amount"]
+        elif event == SALE:
+            sales += record["price"]
+        elif event == HEAL:
+            healed += record["amount"]
+    return {"counts": dict(counts), "damage": {f"{s}->{t}": v for (s, t), v in damage.items()},
+            "sales": sales, "healed": healed, "ticks": last_tick}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo de um log de eventos (.jsonl.gz)")
+    parser.add_argument("paths", nargs="+")
+    options = parser.parse_args()
+    for path in options.paths:
+        summary = summarize(read_events(path))
+        print(f"{path}: {summary['ticks']} ticks")
+        for event, count in sorted(summary["counts"].items(), key=lambda item: -item[1]):
+            print(f"  {event:<14} {count:>8}")
+        for pair, amount in sorted(summary["damage"].items()):
+            print(f"  dano {pair:<16} {amount:>8}")
+        print(f"  vendas {summary['sales']} moedas, cura {summary['healed']} HP")
+
+
+if __name__ == "__main__":
+    main()
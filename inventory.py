@@ -0,0 +1,252 @@
+# Inventario para listas enormes: os itens ficam em slots com "lapides"
+# para os removidos, e uma arvore de Fenwick sobre os slots vivos resolve
+# posicao -> slot em O(log n). Vender (pop por posicao) nao desloca nada;
+# a compactacao so acontece quando as lapides passam dos vivos.
+#
+# Como os itens sao flyweights (o mesmo objeto pode aparecer varias vezes),
+# cada entrada recebe um id proprio e o indice de equipados guarda ids. Os
+# ids crescem na ordem dos slots, entao id -> slot e uma busca binaria.
+#
+# snapshot()/restore() compartilham as listas internas (copy-on-write): a
+# primeira mudanca depois de um snapshot copia, as seguintes nao.
+#
+# Um diario curto de appends e pops (com a versao de cada um) deixa quem
+# espelha o inventario mandar so as operacoes desde a ultima versao vista;
+# clear/restore/carga inteira zeram o diario e changes_since() pede a lista
+# completa.
+
+from bisect import bisect_left
+
+COMPACT_MIN_DEAD = 64
+JOURNAL_LIMIT = 256  # operacoes guardadas para changes_since()
+
+
+class Inventory:
+    def __init__(self, items=()):
+        self._items = []   # slot -> item (None se removido)
+        self._ids = []     # slot -> id da entrada (crescente)
+        self._tree = [0]   # Fenwick 1-based com 1 por slot vivo
+        self._live = 0
+        self._next_id = 0
+        self._equipped = {}   # tipo do item -> id da entrada equipada
+        self._shared = False  # listas tambem referenciadas por um snapshot
+        self.version = 0      # muda a cada alteracao (quem espelha o inventario)
+        self._journal = []    # (versao, "+", item) / (versao, "-", posicao)
+        self._journal_start = 0
+        self.extend(items)
+
+    def _own(self):
+        if self._shared:
+            self._items = list(self._items)
+            self._ids = list(self._ids)
+            self._tree = list(self._tree)
+            self._shared = False
+
+    def _log(self, op, value):
+        journal = self._journal
+        journal.append((self.version, op, value))
+        if len(journal) > JOURNAL_LIMIT:
+            drop = len(journal) // 2
+            self._journal_start = journal[drop - 1][0]
+            del journal[:drop]
+
+    def _reset_journal(self):
+        self._journal = []
+        self._journal_start = self.version
+
+    def changes_since(self, version):
+        # Operacoes (op, valor) depois de `version`, na ordem; None se o
+        # diario nao cobre (o espelho precisa da lista inteira)
+        if version is None or version < self._journal_start:
+            return None
+        return [(op, value) for logged, op, value in self._journal if logged > version]
+
+    # --- Fenwick ---
+
+    def _add(self, slot, delta):
+        tree = self._tree
+        i = slot + 1
+        n = len(tree)
+        while i < n:
+            tree[i] += delta
+            i += i & -i
+
+    def _slot_at(self, position):
+        # Menor slot cujo prefixo de vivos e position + 1
+        tree = self._tree
+        n = len(tree) - 1
+        pos = 0
+        remaining = position + 1
+        step = 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] < remaining:
+                pos = nxt
+                remaining -= tree[nxt]
+            step >>= 1
+        return pos
+
+    def _position_of(self, slot):
+        total = 0
+        i = slot + 1
+        tree = self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total - 1
+
+    def _rebuild(self):
+        # Compacta os slots e reconstroi a arvore em O(n) (listas novas)
+        pairs = [(item, entry) for item, entry in zip(self._items, self._ids) if item is not None]
+        self._items = [item for item, _ in pairs]
+        self._ids = [entry for _, entry in pairs]
+        n = len(self._items)
+        tree = [0] + [1] * n
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    # --- Lista ---
+
+    def append(self, item):
+        self._own()
+        self.version += 1
+        slot = len(self._items)
+        entry = self._next_id
+        self._next_id += 1
+        self._items.append(item)
+        self._ids.append(entry)
+
+        # Novo no da Fenwick = 1 + soma dos filhos já existentes
+        i = slot + 1
+        value = 1
+        j = i - 1
+        low = i - (i & -i)
+        tree = self._tree
+        while j > low:
+            value += tree[j]
+            j -= j & -j
+        tree.append(value)
+        self._live += 1
+        self._log("+", item)
+        return entry
+
+    def extend(self, items):
+        if self._items:
+            for item in items:
+                self.append(item)
+            return
+        # Inventario vazio (carregar um save): tudo vivo, entao cada no da
+        # Fenwick e so o lowbit do indice, O(n) sem appends um a um
+        self._shared = False
+        self.version += 1
+        self._items = list(items)
+        n = len(self._items)
+        first = self._next_id
+        self._ids = list(range(first, first + n))
+        self._tree = [i & -i for i in range(n + 1)]
+        self._live = n
+        self._next_id = first + n
+        self._reset_journal()
+
+    def _normalize(self, position):
+        if position < 0:
+            position += self._live
+        if not 0 <= position < self._live:
+            raise IndexError("inventory index out of range")
+        return position
+
+    def __getitem__(self, position):
+        return self._items[self._slot_at(self._normalize(position))]
+
+    def pop(self, position=-1):
+        self._own()
+        self.version += 1
+        position = self._normalize(position)
+        slot = self._slot_at(position)
+        item = self._items[slot]
+        entry = self._ids[slot]
+        self._log("-", position)
+        self._items[slot] = None
+        self._add(slot, -1)
+        self._live -= 1
+        if self._equipped.get(item.type) == entry:
+            del self._equipped[item.type]
+
+        dead = len(self._items) - self._live
+        if dead > COMPACT_MIN_DEAD and dead > self._live:
+            self._rebuild()
+        return item
+
+    def clear(self):
+        self._items = []
+        self._ids = []
+        self._tree = [0]
+        self._live = 0
+        self._shared = False
+        self._equipped.clear()
+        self.version += 1
+        self._reset_journal()
+
+    # --- Snapshot ---
+
+    def snapshot(self):
+        self._shared = True
+        return (self._items, self._ids, self._tree, self._live, self._next_id, dict(self._equipped))
+
+    def restore(self, state):
+        self._items, self._ids, self._tree, self._live, self._next_id, equipped = state
+        self._equipped = dict(equipped)
+        self._shared = True
+        self.version += 1
+        self._reset_journal()
+
+    def __len__(self):
+        return self._live
+
+    def __bool__(self):
+        return self._live > 0
+
+    def __iter__(self):
+        return (item for item in self._items if item is not None)
+
+    def __repr__(self):
+        return f"Inventory({self._live} items)"
+
+    # --- Equipados (por entrada, nao por nome) ---
+
+    def entry_id(self, position):
+        return self._ids[self._slot_at(self._normalize(position))]
+
+    def mark_equipped(self, position):
+        slot = self._slot_at(self._normalize(position))
+        self._equipped[self._items[slot].type] = self._ids[slot]
+        self.version += 1
+
+    def unmark_equipped(self, item_type):
+        if self._equipped.pop(item_type, None) is not None:
+            self.version += 1
+
+    def is_equipped(self, position):
+        slot = self._slot_at(self._normalize(position))
+        return self._equipped.get(self._items[slot].type) == self._ids[slot]
+
+    def equipped_position(self, item_type):
+        entry = self._equipped.get(item_type)
+        if entry is None:
+            return None
+        return self._position_of(bisect_left(self._ids, entry))
+
+    # --- Janela visivel ---
+
+    def window(self, start, count):
+        # (posicao, item, equipado) apenas para as linhas da janela
+        rows = []
+        equipped = self._equipped
+        for position in range(max(0, start), min(start + count, self._live)):
+            slot = self._slot_at(position)
+            item = self._items[slot]
+            rows.append((position, item, equipped.get(item.type) == self._ids[slot]))
+        return rows
@@ -0,0 +1,125 @@
+import random
+from types import MappingProxyType
+
+# Itens como flyweights imutaveis: os 5 tipos x 4 raridades x 5 niveis sao
+# montados uma vez no import e cada drop devolve o template compartilhado,
+# sem montar dicts nem formatar nomes por chamada.
+
+TYPES = ["Sword", "Shield", "Boots", "Gloves", "Ring"]
+RARITIES = [("Normal", "white"), ("Rare", "orange"), ("Excellent", "purple"), ("Legendary", "red")]
+LEVELS = [1, 2, 3, 4, 5]
+
+BASE_BONUS = {
+    "Sword": {"strength": 2},
+    "Shield": {"defense": 3},
+    "Boots": {"speed": 1, "defense": 2},
+    "Gloves": {"strength": 2, "speed": 1},
+    "Ring": {"strength": 1, "defense": 2},
+}
+
+RARITY_MULTIPLIERS = {
+    "Normal": 1.0,
+    "Rare": 1.5,
+    "Excellent": 2.0,
+    "Legendary": 3.0
+}
+
+# Preco de venda por nivel do item (engine.calculate_sale_price)
+SALE_PRICES = {
+    "Normal": 10,
+    "Rare": 30,
+    "Excellent": 60,
+    "Legendary": 100
+}
+
+STATS = ("strength", "defense", "speed")
+
+
+class Item:
+    # Acesso tambem por item["name"] / item.get("name"), como os dicts antigos
+    __slots__ = ("name", "type", "rarity", "color", "level", "bonus", "stats", "template_id")
+
+    def __init__(self, name, item_type, rarity, color, level, bonus, template_id):
+        set_field = object.__setattr__
+        set_field(self, "name", name)
+        set_field(self, "type", item_type)
+        set_field(self, "rarity", rarity)
+        set_field(self, "color", color)
+        set_field(self, "level", level)
+        set_field(self, "bonus", MappingProxyType(dict(bonus)))
+        # Bonus ja alinhado com STATS para somas sem dict
+        set_field(self, "stats", tuple(bonus.get(stat, 0) for stat in STATS))
+        set_field(self, "template_id", template_id)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Item is immutable")
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __reduce__(self):
+        # Copias (pickle/deepcopy) voltam para o mesmo template interno
+        return (template, (self.template_id,))
+
+    def __repr__(self):
+        return f"Item({self.name!r}, rarity={self.rarity!r}, level={self.level})"
+
+
+def _build_templates():
+    templates = []
+    table = {}
+    for item_type in TYPES:
+        for rarity, color in RARITIES:
+            multiplier = RARITY_MULTIPLIERS[rarity]
+            for level in LEVELS:
+                bonus = {stat: int(val * level * multiplier) for stat, val in BASE_BONUS[item_type].items()}
+                item = Item(f"{item_type} {rarity} Lv{level}", item_type, rarity, color, level, bonus, len(templates))
+                templates.append(item)
+                table[(item_type, rarity, level)] = item
+    return tuple(templates), table
+
+
+TEMPLATES, TEMPLATE_TABLE = _build_templates()
+TEMPLATE_COUNT = len(TEMPLATES)
+
+# Variantes dos baus lendarios: mantem nome/bonus do sorteio original mas
+# exibem raridade Legendary, cor vermelha e nivel minimo do andar. Tambem
+# sao internadas, com id deterministico: TEMPLATE_COUNT * (nivel + 1) + base.
+_variants = {}
+
+
+def legendary_variant(item, level):
+    level = max(level, item.level)
+    base = item.template_id % TEMPLATE_COUNT
+    template_id = TEMPLATE_COUNT * (level + 1) + base
+    variant = _variants.get(template_id)
+    if variant is None:
+        source = TEMPLATES[base]
+        variant = Item(source.name, source.type, "Legendary", "red", level, dict(source.bonus), template_id)
+        _variants[template_id] = variant
+    return variant
+
+
+def template(template_id):
+    if template_id < TEMPLATE_COUNT:
+        return TEMPLATES[template_id]
+    level, base = divmod(template_id, TEMPLATE_COUNT)
+    return legendary_variant(TEMPLATES[base], level - 1)
+
+
+def generate_random_item(rng=random):
+    # Tipo, raridade e nivel uniformes e independentes, como antes
+    return TEMPLATE_TABLE[(rng.choice(TYPES), rng.choice(RARITIES)[0], rng.randint(1, 5))]
+
+
+def generate_items(n, rng=random):
+    # Tipo x raridade x nivel uniformes = template uniforme entre os 100
+    if hasattr(rng, "integers"):
+        return [TEMPLATES[i] for i in rng.integers(0, TEMPLATE_COUNT, size=n).tolist()]
+    return rng.choices(TEMPLATES, k=n)
@@ -0,0 +1,215 @@
+import argparse
+import random
+import time
+from itertools import accumulate
+
+import numpy as np
+
+from items import LEVELS, RARITIES, RARITY_MULTIPLIERS, TEMPLATE_COUNT, TEMPLATES, TYPES, legendary_variant
+
+# Tabelas de loot: o template de cada drop sai de uma distribuicao sobre os
+# 100 templates (tipo x raridade x nivel), montada a partir de pesos por
+# nivel da dungeon e puxada para as raridades altas pela dificuldade.
+#
+# O sorteio usa tabelas de alias (Vose): O(1) por drop, um indice + um
+# uniforme, e a versao vetorizada sorteia milhoes de uma vez com um
+# numpy.random.Generator. A mesma distribuicao sai exata por distribution()
+# e odds(), sem amostrar.
+
+# Pesos (Normal, Rare, Excellent, Legendary) por nivel da dungeon; niveis
+# acima do ultimo usam o ultimo
+RARITY_WEIGHTS = {
+    1: (40, 30, 20, 10),
+    2: (25, 30, 27, 18),
+    3: (15, 25, 33, 27),
+}
+# Pesos dos niveis de item 1-5 por nivel da dungeon
+ITEM_LEVEL_WEIGHTS = {
+    1: (30, 30, 20, 12, 8),
+    2: (15, 25, 25, 20, 15),
+    3: (8, 15, 25, 27, 25),
+}
+TYPE_WEIGHTS = (1, 1, 1, 1, 1)
+# Peso da raridade de indice t multiplicado por dificuldade ** (t * SKEW):
+# Easy (1.0) nao muda nada, Legendary (9.0) quintuplica o Legendary
+DIFFICULTY_SKEW = 0.25
+# Itens por bau: 1 a 8, uniforme
+CHEST_QUANTITY_WEIGHTS = (1, 1, 1, 1, 1, 1, 1, 1)
+CHESTS_PER_LEVEL = 3
+
+
+def _is_numpy(rng):
+    return hasattr(rng, "integers")
+
+
+class AliasTable:
+    # Cada coluna i fica com i com chance prob[i], senao vai para alias[i]
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or weights.size == 0 or (weights < 0).any() or not weights.sum() > 0:
+            raise ValueError("weights must be non-negative with a positive sum")
+        n = weights.size
+        self.probabilities = weights / weights.sum()
+        scaled = (self.probabilities * n).tolist()
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Sobras de arredondamento ficam com prob 1
+        self._prob = prob
+        self._alias = alias
+        self.prob = np.array(prob)
+        self.alias = np.array(alias, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._prob)
+
+    def sample(self, rng=random, size=None):
+        # Um indice (size=None) ou um array de `size` indices
+        n = len(self._prob)
+        if size is None:
+            if _is_numpy(rng):
+                column, u = int(rng.integers(n)), rng.random()
+            else:
+                column, u = rng.randrange(n), rng.random()
+            return column if u < self._prob[column] else self._alias[column]
+        if _is_numpy(rng):
+            columns = rng.integers(0, n, size=size)
+            return np.where(rng.random(size) < self.prob[columns], columns, self.alias[columns])
+        return np.array([self.sample(rng) for _ in range(size)], dtype=np.int64)
+
+
+def _row(table, level):
+    return table[min(max(level, min(table)), max(table))]
+
+
+class LootTable:
+    def __init__(self, rarity_weights=RARITY_WEIGHTS, level_weights=ITEM_LEVEL_WEIGHTS, type_weights=TYPE_WEIGHTS,
+                 difficulty_skew=DIFFICULTY_SKEW, chest_quantity=CHEST_QUANTITY_WEIGHTS):
+        for name, table, size in (("rarity_weights", rarity_weights, len(RARITIES)),
+                                  ("level_weights", level_weights, len(LEVELS))):
+            if not table or any(len(weights) != size for weights in table.values()):
+                raise ValueError(f"{name} needs {size} weights per dungeon level")
+        if len(type_weights) != len(TYPES):
+            raise ValueError(f"type_weights needs {len(TYPES)} weights")
+        self.rarity_weights = rarity_weights
+        self.level_weights = level_weights
+        self.type_weights = type_weights
+        self.difficulty_skew = difficulty_skew
+        self.quantity = AliasTable(chest_quantity)
+        self._tables = {}  # (nivel, dificuldade) -> AliasTable dos templates
+
+    # --- Distribuicao exata ---
+
+    def factors(self, level, difficulty=1.0):
+        # (tipo, raridade, nivel do item) normalizados e independentes
+        rarity = np.array(_row(self.rarity_weights, level), dtype=np.float64)
+        rarity *= difficulty ** (np.arange(len(rarity)) * self.difficulty_skew)
+        levels = np.array(_row(self.level_weights, level), dtype=np.float64)
+        types = np.array(self.type_weights, dtype=np.float64)
+        return types / types.sum(), rarity / rarity.sum(), levels / levels.sum()
+
+    def distribution(self, level, difficulty=1.0):
+        # Probabilidade de cada template, na ordem de items.TEMPLATES
+        types, rarity, levels = self.factors(level, difficulty)
+        return np.einsum("i,j,k->ijk", types, rarity, levels).ravel()
+
+    def odds(self, level, difficulty=1.0):
+        # Marginais legiveis: raridade, nivel do item e tipo -> probabilidade
+        types, rarity, levels = self.factors(level, difficulty)
+        return {
+            "rarity": {name: float(p) for (name, _), p in zip(RARITIES, rarity)},
+            "level": {item_level: float(p) for item_level, p in zip(LEVELS, levels)},
+            "type": {name: float(p) for name, p in zip(TYPES, types)},
+            "mean_multiplier": float(sum(RARITY_MULTIPLIERS[name] * p for (name, _), p in zip(RARITIES, rarity))),
+            "mean_level": float(np.dot(LEVELS, levels)),
+        }
+
+    def table(self, level, difficulty=1.0):
+        key = (level, difficulty)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = AliasTable(self.distribution(level, difficulty))
+        return table
+
+    # --- Sorteio ---
+
+    def roll(self, level, difficulty=1.0, rng=random):
+        return TEMPLATES[self.table(level, difficulty).sample(rng)]
+
+    def roll_ids(self, n, level, difficulty=1.0, rng=None):
+        # Ids de template de n drops num unico sorteio vetorizado
+        rng = rng if rng is not None else np.random.default_rng()
+        return self.table(level, difficulty).sample(rng, n)
+
+    def roll_many(self, n, level, difficulty=1.0, rng=random):
+        return [TEMPLATES[i] for i in self.roll_ids(n, level, difficulty, rng).tolist()]
+
+    def roll_chests(self, count, level, difficulty=1.0, rng=None):
+        # Itens de `count` baus num unico roll_ids (quantidades tambem de uma
+        # vez); a variante Legendary do nivel sai uma vez por template
+        # distinto. Com um numpy.random.Generator nada roda por item.
+        rng = rng if rng is not None else np.random.default_rng()
+        quantities = self.quantity.sample(rng, count) + 1
+        ids = self.roll_ids(int(quantities.sum()), level, difficulty, rng)
+        ids = ids.tolist()
+        variants = {i: legendary_variant(TEMPLATES[i], level) for i in set(ids)}
+        items = [variants[i] for i in ids]
+        ends = list(accumulate(quantities.tolist()))
+        return [items[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+
+LOOT = LootTable()
+
+
+# --- Relatorio ---
+
+
+def main():
+    from engine import DIFFICULTY_LEVELS, MAX_LEVELS
+
+    parser = argparse.ArgumentParser(description="Chances de drop por nivel e dificuldade (exatas, sem amostrar)")
+    parser.add_argument("--level", type=int, nargs="*", default=list(range(1, MAX_LEVELS + 1)))
+    parser.add_argument("--difficulty", nargs="*", default=list(DIFFICULTY_LEVELS))
+    parser.add_argument("--sample", type=int, default=0,
+                        help="sorteia N drops vetorizados por linha e mostra o maior desvio da conta exata")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    unknown = [name for name in args.difficulty if name not in DIFFICULTY_LEVELS]
+    if unknown:
+        parser.error(f"dificuldades desconhecidas: {', '.join(unknown)}")
+
+    rng = np.random.default_rng(args.seed)
+    rarity_names = " ".join(f"{name[:4]:>5}" for name, _ in RARITIES)
+    header = f"{'nivel':>5} {'difficulty':<10} {rarity_names}  {'item lvl 1-5 (%)':<26} {'mult':>5} {'lvl':>5}"
+    if args.sample:
+        header += f" {'desvio':>8} {'drops/s':>12}"
+    print(header)
+    for level in args.level:
+        for difficulty in args.difficulty:
+            multiplier = DIFFICULTY_LEVELS[difficulty]
+            odds = LOOT.odds(level, multiplier)
+            rarity = " ".join(f"{p * 100:5.1f}" for p in odds["rarity"].values())
+            levels = " ".join(f"{p * 100:4.1f}" for p in odds["level"].values())
+            line = (f"{level:>5} {difficulty:<10} {rarity}  {levels:<26} {odds['mean_multiplier']:>5.2f} "
+                    f"{odds['mean_level']:>5.2f}")
+            if args.sample:
+                LOOT.table(level, multiplier)  # monta fora da medicao
+                start = time.perf_counter()
+                ids = LOOT.roll_ids(args.sample, level, multiplier, rng)
+                elapsed = time.perf_counter() - start
+                observed = np.bincount(ids, minlength=TEMPLATE_COUNT) / args.sample
+                error = np.abs(observed - LOOT.distribution(level, multiplier)).max()
+                line += f" {error:>8.5f} {args.sample / elapsed:>12.3g}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,211 +1,215 @@
-import random
+import atexit
+import os
+import sys
+import time
+STARTED = time.perf_counter()  # inicio da abertura (relatorio em assets.StartupTimer)
 from pygame import Rect
-import math
+
+# pgzrun executa este arquivo fora do sys.path; garante os modulos vizinhos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from assets import AssetLoader, AssetManifest, StartupTimer, load_surface
+from audio import AudioManager
+from events import LEVEL, EventWriter
+from render import ChunkLayers, LogicalCanvas, SpriteAtlas, TextCache, compose_floor_chunk, compose_objects
+from engine import (
+    WIDTH as VIEW_WIDTH, HEIGHT as VIEW_HEIGHT, TILE_SIZE, ROWS, COLS, MAX_LEVELS,
+    STATE_MENU, STATE_DIFFICULTY_SELECTION, STATE_GAME, STATE_COMBAT,
+    STATE_GAME_OVER, STATE_VICTORY, STATE_INSTRUCTIONS,
+    MENU_BUTTONS, DIFFICULTY_BUTTONS, START_GAME_BUTTON, CLIPS, MENU_MUSIC, BOSS_MUSIC, VICTORY_MUSIC,
+    GameState, next_music,
+)
+from profiler import FrameProfiler
+from replay import Recorder
+from savegame import SaveSlot, slot_path
+from worldmap import Camera
 
 # --- Constants ---
-WIDTH = 640
-HEIGHT = 480
 TITLE = "Dungeon Escape"
-TILE_SIZE = 32
-ROWS = HEIGHT // TILE_SIZE
-COLS = WIDTH // TILE_SIZE
-
-MAX_LEVELS = 3
-
-# Game states
-STATE_MENU = "menu"
-STATE_DIFFICULTY_SELECTION = "difficulty_selection"
-STATE_GAME = "game"
-STATE_COMBAT = "combat"
-STATE_GAME_OVER = "game_over"
-STATE_VICTORY = "victory"
-STATE_INSTRUCTIONS = "instructions"
-
-# Difficulties with multipliers
-DIFFICULTY_LEVELS = {
-    "Easy": 1.0,
-    "Normal": 1.5,
-    "Hard": 3.0,
-    "Legendary": 9.0
-}
-healing_zones = [
-    {"grid_x": 5, "grid_y": 2},
-    {"grid_x": 8, "grid_y": 6}
-]
-legendary_chests = []
-
-# --- Global variables ---
-current_state = STATE_MENU
-current_level = 1
-selected_difficulty = "Normal"
-difficulty_multiplier = DIFFICULTY_LEVELS[selected_difficulty]
-sound_enabled = True
-inventory_visible = False
-enemy_in_combat = None
-selected_item_index = None
-visible_start_index = 0
-start_visible = 0
-item_selected = None
-items_per_page = 5
-sound_enabled = True
-money = 0
-
-music.set_volume(0.5)  # Volume entre 0.0 e 1.0
-music.play("background_music")
+
+# --- Janela ---
+# As funcoes draw_* usam coordenadas logicas (VIEW_WIDTH x VIEW_HEIGHT).
+# DUNGEON_WINDOW=2560x1440 abre a janela nesse tamanho (WIDTH/HEIGHT sao o
+# que o pgzero le): a cena e desenhada no tamanho logico e escalada uma vez
+# por quadro. DUNGEON_SCALE=integer|smooth escolhe a escala (padrao: inteira
+# quando cabe).
+WINDOW = os.environ.get("DUNGEON_WINDOW")
+WIDTH, HEIGHT = VIEW_WIDTH, VIEW_HEIGHT
+if WINDOW:
+    WIDTH, HEIGHT = (int(v) for v in WINDOW.lower().split("x"))
+canvas = None
+if (WIDTH, HEIGHT) != (VIEW_WIDTH, VIEW_HEIGHT) or os.environ.get("DUNGEON_SCALE"):
+    canvas = LogicalCanvas((VIEW_WIDTH, VIEW_HEIGHT), (WIDTH, HEIGHT), os.environ.get("DUNGEON_SCALE") or None)
+
+# --- Estado do jogo ---
+# Toda a regra vive em engine.GameState; este módulo só desenha e repassa
+# teclado/mouse. Som e camadas de render reagem aos eventos do estado.
+# DUNGEON_MAP_SIZE=2000x2000 liga o mapa grande em chunks (com paredes)
+MAP_SIZE = os.environ.get("DUNGEON_MAP_SIZE")
+game_options = {}
+if MAP_SIZE:
+    game_options = {"map_size": tuple(int(v) for v in MAP_SIZE.lower().split("x")), "wall_density": 0.08}
+# DUNGEON_SEED fixa a partida; DUNGEON_RECORD=arquivo.json grava seed +
+# entradas para reproduzir com: python replay.py arquivo.json
+SEED = os.environ.get("DUNGEON_SEED")
+# DUNGEON_SERVER=localhost:8765 joga numa sessao do server.py: as regras rodam
+# la e este modulo so desenha o espelho e repassa o teclado/mouse
+SERVER = os.environ.get("DUNGEON_SERVER")
+remote = None
+if SERVER:
+    # So importa o cliente (e o asyncio do server.py) quando vai usar
+    from netclient import RemoteGame
+    host, _, port = SERVER.rpartition(":")
+    remote = RemoteGame(host or "localhost", int(port))
+    game = remote.game
+else:
+    game = GameState(seed=int(SEED) if SEED else None, **game_options)
+
+# DUNGEON_EVENT_LOG=sessao.jsonl.gz grava dano, mortes, drops, vendas, curas
+# e trocas de nivel (resumo: python events.py sessao.jsonl.gz)
+EVENT_LOG = os.environ.get("DUNGEON_EVENT_LOG")
+if EVENT_LOG:
+    atexit.register(EventWriter(game, EVENT_LOG).close)
+
+RECORD_PATH = os.environ.get("DUNGEON_RECORD")
+recorder = None
+if RECORD_PATH and remote is not None:
+    print("DUNGEON_RECORD ignorado: a partida roda no servidor")
+elif RECORD_PATH:
+    recorder = Recorder(game, game_options)
+    atexit.register(recorder.save, RECORD_PATH)
+
+
+def close_remote():
+    # Latencia vista pelo jogador: tecla enviada -> tick que a aplicou
+    remote.close()
+    stats = remote.latency()
+    if stats:
+        print(f"Latencia de entrada ({stats['count']} teclas): p50 {stats['p50']:.1f} ms, "
+              f"p95 {stats['p95']:.1f} ms, p99 {stats['p99']:.1f} ms")
+
+
+if remote is not None:
+    atexit.register(close_remote)
+
+# Câmera do tamanho da tela; no mapa clássico ela fica parada em (0, 0)
+camera = Camera(COLS, ROWS, game.world)
+SPRITE_MARGIN = 4  # sprites passam do tile; inclui vizinhos fora da tela
+
+# Slots de save (F5-F7 salvam, F9-F11 carregam)
+SAVE_DIR = os.environ.get("DUNGEON_SAVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves"))
+save_slots = {slot: SaveSlot(slot_path(slot, SAVE_DIR)) for slot in (1, 2, 3)}
+SAVE_KEYS = {"F5": 1, "F6": 2, "F7": 3}
+LOAD_KEYS = {"F9": 1, "F10": 2, "F11": 3}
+
 # --- Buttons ---
-buttons = {
-    "start": Rect(WIDTH // 2 - 80, 150, 160, 40),
-    "sound": Rect(WIDTH // 2 - 80, 210, 160, 40),
-    "quit": Rect(WIDTH // 2 - 80, 270, 160, 40),
-    "instructions": Rect(WIDTH // 2 - 80, 330, 160, 40)
+buttons = {name: Rect(rect) for name, rect in MENU_BUTTONS.items()}
+difficulty_buttons = {name: Rect(rect) for name, rect in DIFFICULTY_BUTTONS.items()}
+button_start_game = Rect(START_GAME_BUTTON)
+
+
+# --- Camadas estaticas ---
+# Chao/grade compostos uma vez por nivel e por chunk; baus e zonas de cura
+# numa camada propria, refeita apenas quando um bau daquele chunk abre.
+
+
+def chunk_has_objects(cx, cy):
+    world = game.world
+    return any(world.chunk_of(c["pos_x"], c["pos_y"]) == (cx, cy) for c in game.legendary_chests) or \
+        any(world.chunk_of(z["grid_x"], z["grid_y"]) == (cx, cy) for z in game.healing_zones)
+
+
+def compose_objects_chunk(surf, cx, cy):
+    x0, y0, _, _ = game.world.chunk_bounds(cx, cy)
+    compose_objects(surf, game.legendary_chests, game.healing_zones, TILE_SIZE, origin=(x0, y0))
+
+
+# --- Assets ---
+# O menu so usa texto e retangulos: textura do chao, quadros dos sprites e
+# efeitos sao carregados numa thread enquanto o jogador escolhe a
+# dificuldade. O que faltar no disco e avisado uma vez aqui.
+REQUIRED_ASSETS = {
+    "images": ["dungeon_floor"] + [f"{prefix}_{clip}_0" for prefix in ("hero", "enemy") for clip in CLIPS],
+    "sounds": ["step"],
+    "music": [MENU_MUSIC, BOSS_MUSIC, VICTORY_MUSIC],
 }
+manifest = AssetManifest()
+missing_assets = manifest.missing(REQUIRED_ASSETS)
+if missing_assets:
+    print(f"Assets ausentes (o jogo segue sem eles): {', '.join(missing_assets)}")
+
+startup = StartupTimer(STARTED)
+loader = AssetLoader()
+loader.submit("floor", load_surface, manifest.path("images", "dungeon_floor"), (COLS * TILE_SIZE, ROWS * TILE_SIZE))
+
+floor_chunks = ChunkLayers(game.world, TILE_SIZE, lambda surf, cx, cy: compose_floor_chunk(surf, game.world, cx, cy, TILE_SIZE, loader.get("floor")))
+object_chunks = ChunkLayers(game.world, TILE_SIZE, compose_objects_chunk, transparent=True, needed=chunk_has_objects)
+
+# Quadros de animacao decodificados pelo loader e montados num atlas no
+# primeiro desenho, com a janela ja aberta; o desenho pega o atlas por
+# loader.get, que espera (e conta) se a thread ainda nao terminou
+loader.submit("sprites", SpriteAtlas(CLIPS).load)
+
+
+def blit_sprite(frames, frame, pos):
+    surface, (dx, dy) = frames[frame % len(frames)]
+    screen.blit(surface, (pos[0] + dx, pos[1] + dy))
+
+
+# Profiler de quadros (F3 liga o overlay, F4 exporta CSV); desligado custa
+# so uma chamada por fase. DUNGEON_PROFILE=1 ja comeca ligado.
+profiler = FrameProfiler(enabled=bool(os.environ.get("DUNGEON_PROFILE")))
+game.profiler = profiler
+
+# Textos do HUD, combate e inventario só são rasterizados quando mudam
+text_cache = TextCache(max_entries=512)
+
+
+def draw_text(text, pos=None, **kwargs):
+    text_cache.draw(screen, text, pos, **kwargs)
+
+
+# --- Observadores do estado ---
+
+
+# Efeitos em canais proprios, decodificados pelo loader; a trilha do
+# proximo nivel e lida em segundo plano assim que o nivel atual comeca
+audio = AudioManager(manifest, preload=False)
+loader.submit("sounds", audio.load_sounds)
+audio.play_music(MENU_MUSIC)
 
-difficulty_buttons = {}
-button_start_y = 150
-button_height = 40
-button_spacing = 15
-for i, name in enumerate(DIFFICULTY_LEVELS.keys()):
-    difficulty_buttons[name] = Rect(WIDTH // 2 - 80, button_start_y + i * (button_height + button_spacing), 160, button_height)
-button_start_game = Rect(WIDTH // 2 - 80, button_start_y + len(DIFFICULTY_LEVELS) * (button_height + button_spacing) + 20, 160, 40)
-
-# --- Classes ---
-
-from pgzero.actor import Actor
-
-
-class Character(Actor):
-    def __init__(self, image_prefix, grid_x, grid_y, hp, strength, defense, speed):
-        super().__init__(f"{image_prefix}_idle_0", (grid_x * TILE_SIZE, grid_y * TILE_SIZE))
-        self.image_prefix = image_prefix
-        self.grid_x = grid_x
-        self.grid_y = grid_y
-        self.frame = 0
-        self.hp = hp
-        self.strength = strength
-        self.defense = defense
-        self.speed = speed
-        self.moving = False
-
-    def move(self, dx, dy):
-        new_x = self.grid_x + dx
-        new_y = self.grid_y + dy
-        if 0 <= new_x < COLS and 0 <= new_y < ROWS:
-            self.grid_x = new_x
-            self.grid_y = new_y
-            self.topleft = (self.grid_x * TILE_SIZE, self.grid_y * TILE_SIZE)
-            self.moving = True
-
-    def animate(self):
-        self.frame += 1
-        if self.moving:
-            self.image = f"{self.image_prefix}_walk_{self.frame % 2}"
+
+def on_game_event(event, data):
+    if event in (LEVEL, "game_loaded"):
+        floor_chunks.invalidate_all()
+        object_chunks.invalidate_all()
+        audio.prefetch(next_music(game.current_level))
+    elif event == "chest_opened":
+        object_chunks.invalidate_at(data["chest"]["pos_x"], data["chest"]["pos_y"])
+    elif event == "step":
+        if game.sound_enabled:
+            audio.play("step")
+    elif event == "music":
+        if game.sound_enabled:
+            audio.play_music(data["track"])
+    elif event == "sound_toggled":
+        if data["enabled"]:
+            audio.play_music(MENU_MUSIC)
         else:
-            self.image = f"{self.image_prefix}_idle_{self.frame % 2}"
-        self.moving = False
-
-
-class Hero(Character):
-    def __init__(self, grid_x=1, grid_y=1):
-        super().__init__("hero", grid_x, grid_y, hp=100, strength=10, defense=5, speed=5)
-        self.exp = 0
-        self.inventory = []
-        self.equipment = {}
-
-    def reset_stats(self):
-        self.strength = 10
-        self.defense = 5
-        self.speed = 5
-
-    def update_stats(self):
-        self.reset_stats()
-        for item in self.equipment.values():
-            for stat, val in item["bonus"].items():
-                if hasattr(self, stat):
-                    setattr(self, stat, getattr(self, stat) + val)
-    
-   
-
-    def equip_item(self, item):
-        self.equipment[item["type"]] = item
-        self.update_stats()
-
-    def unequip_item(self, item_type):
-        if item_type in self.equipment:
-            del self.equipment[item_type]
-        self.update_stats()
-
-
-class Enemy(Character):
-    def __init__(self, grid_x, grid_y, hp, strength, defense, speed, boss=False):
-        super().__init__("enemy", grid_x, grid_y, hp, strength, defense, speed)
-        self.boss = boss
-        self.direction = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
-        self.can_summon = False
-        self.summon_cooldown = 0
-
-    def update_movement(self):
-        if random.random() < 0.02:
-            dx, dy = self.direction
-            new_x = self.grid_x + dx
-            new_y = self.grid_y + dy
-            if 0 <= new_x < COLS and 0 <= new_y < ROWS:
-                self.move(dx, dy)
-            else:
-                self.direction = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
-
-
-# --- Game variables ---
-hero = Hero()
-enemies = []
-boss_enemy = None
-combat_enemy = None
-
-# Legendary chest example
-legendary_chest = None
-
-
-# --- Functions ---
-
-
-def generate_legendary_chests():
-    chests = []
-    for i in range(3):  # 3 baús
-        items = []
-        quantity = random.randint(1, 8)
-        for _ in range(quantity):
-            item = generate_random_item()
-            item["rarity"] = "Legendary"
-            item["color"] = "red"
-            item["level"] = max(current_level, item["level"])
-            items.append(item)
-        chest = {
-            "pos_x": random.randint(1, COLS - 2),
-            "pos_y": random.randint(1, ROWS - 2),
-            "items": items,
-            "opened": False
-        }
-        chests.append(chest)
-    return chests
-
-
-def draw_healing_zones():
-    for zone in healing_zones:
-        x = zone["grid_x"] * TILE_SIZE
-        y = zone["grid_y"] * TILE_SIZE
-        rect = Rect((x, y), (TILE_SIZE, TILE_SIZE))
-        
-        border_thickness = 1
-        # Desenhar borda rosa grossa dentro do retângulo
-        for i in range(border_thickness):
-            inner_rect = rect.inflate(-2*i, -2*i)  # diminui o retângulo por dentro
-            screen.draw.rect(inner_rect, (255, 105, 180))
-        
-        screen.draw.text("+", center=(x + TILE_SIZE // 2, y + TILE_SIZE // 2), fontsize=32, color="pink")
+            audio.stop_music()
+    elif event == "quit":
+        exit()
+
+
+game.add_observer(on_game_event)
+
+
+# --- Desenho ---
 
 
 def draw_instructions():
     screen.clear()
-    screen.draw.text("INSTRUCOES", center=(WIDTH // 2, 50), fontsize=50, color="yellow")
+    draw_text("INSTRUCOES", center=(VIEW_WIDTH // 2, 50), fontsize=50, color="yellow")
 
     instructions_text = [
         "Objetivo: Mate o chefe final para vencer o jogo.",
@@ -218,10 +222,12 @@ def draw_instructions():
         "Use 'E' para equipar um item selecionado no inventario.",
         'fique ATENTO ao tipo de item EQUIPADO, pois cada um AFETA atributos diferentes.',
         "Use 'W' e 'S' para navegar pelo inventario.",
-        "Use 'D' para vender um item selecionado no inventario.",   
+        "Use 'D' para vender um item selecionado no inventario.",
         "Quando encontrar um inimigo, o combate começara.",
         "No combate, pressione ESPACO para atacar.",
         "Derrote todos os inimigos e prepare-se para o chefe!",
+        "F5/F6/F7 salvam nos slots 1-3; F9/F10/F11 carregam.",
+        "F8 liga/desliga o jogador automatico.",
         "",
         "Dicas:",
         "- Use itens de cura encontrados na dungeon [QUADRADOS ROSAS].",
@@ -232,303 +238,120 @@ def draw_instructions():
 
     y = 120
     for line in instructions_text:
-        screen.draw.text(line, (10, y), fontsize=16, color="white")
+        draw_text(line, (10, y), fontsize=16, color="white")
         y += 16
 
-def draw_legendary_chests():
-    for chest in legendary_chests:
-        x = chest["pos_x"] * TILE_SIZE
-        y = chest["pos_y"] * TILE_SIZE
-        color = "gold" if not chest["opened"] else "lightyellow"
-        screen.draw.rect(Rect(x, y, TILE_SIZE, TILE_SIZE), color)
-        screen.draw.text("C", (x + 10, y + 6), fontsize=24, color="black")
-
-
-
-def check_legendary_chest_interaction():
-    for chest in legendary_chests:
-        if not chest["opened"] and hero.grid_x == chest["pos_x"] and hero.grid_y == chest["pos_y"]:
-            chest["opened"] = True
-            hero.inventory.extend(chest["items"])
-
-
-
-def start_level():
-    global legendary_chests
-    hero.grid_x = 1
-    hero.grid_y = 1
-    hero.topleft = (hero.grid_x * TILE_SIZE, hero.grid_y * TILE_SIZE)
-    legendary_chests = generate_legendary_chests()
-
-
-
-def generate_random_item():
-    types = ["Sword", "Shield", "Boots", "Gloves", "Ring"]
-    rarities = [("Normal", "white"), ("Rare", "orange"), ("Excellent", "purple"), ("Legendary", "red")]
-    item_type = random.choice(types)
-    rarity, color = random.choice(rarities)
-    level = random.randint(1, 5)
-
-    base_bonus = {
-        "Sword": {"strength": 2},
-        "Shield": {"defense": 3},
-        "Boots": {"speed": 1, "defense": 2},
-        "Gloves": {"strength": 2, "speed": 1},
-        "Ring": {"strength": 1, "defense": 2},
-    }
-
-    rarity_multipliers = {
-        "Normal": 1.0,
-        "Rare": 1.5,
-        "Excellent": 2.0,
-        "Legendary": 3.0
-    }
-
-    multiplier = rarity_multipliers[rarity]
-
-    bonus = {}
-    for stat, val in base_bonus[item_type].items():
-        bonus[stat] = int(val * level * multiplier)
-
-    name = f"{item_type} {rarity} Lv{level}"
-    return {
-        "name": name,
-        "type": item_type,
-        "rarity": rarity,
-        "color": color,
-        "level": level,
-        "bonus": bonus
-    }
-
-
-def generate_enemies(level, difficulty, boss=False):
-    new_enemies = []
-    quantity = random.randint(1, 3) if not boss else 1
-    for i in range(quantity):
-        e = Enemy(
-            grid_x=random.randint(1, COLS - 2),
-            grid_y=random.randint(1, ROWS - 2),
-            hp=int((30 + level * 5) * difficulty),
-            strength=int((5 + level * 2) * difficulty),
-            defense=2,
-            speed=1,
-            boss=boss
-        )
-        new_enemies.append(e)
-
-    if boss:
-        boss_enemy = new_enemies[0]
-        boss_enemy.hp *= 5
-        boss_enemy.strength *= 3
-        boss_enemy.can_summon = True
-        boss_enemy.summon_cooldown = 3
-        return new_enemies, boss_enemy
-    else:
-        return new_enemies, None
-
-
-def update_boss():
-    global enemies, boss_enemy
-    if boss_enemy and boss_enemy.can_summon:
-        boss_enemy.summon_cooldown -= 1
-        if boss_enemy.summon_cooldown <= 0:
-            if len(enemies) < 6:
-                summon = Enemy(
-                    grid_x=random.randint(1, COLS - 2),
-                    grid_y=random.randint(1, ROWS - 2),
-                    hp=int(20 * difficulty_multiplier),
-                    strength=int(5 * difficulty_multiplier),
-                    defense=1,
-                    speed=1,
-                    boss=False
-                )
-                enemies.append(summon)
-            boss_enemy.summon_cooldown = 3
-
-
-def advance_level():
-    global current_level, enemies, boss_enemy, current_state
-    if current_level < MAX_LEVELS:
-        current_level += 1
-        if current_level == MAX_LEVELS:
-            enemies, boss_enemy = generate_enemies(current_level, difficulty_multiplier, boss=True)
-            try:
-                music.play("boss_music")
-            except:
-                pass
-        else:
-            enemies, boss_enemy = generate_enemies(current_level, difficulty_multiplier)
-            try:
-                music.play("background_music")
-            except:
-                pass
-        start_level()
-
 
 def draw_menu():
     screen.clear()
-    screen.draw.text("DUNGEON ESCAPE", center=(WIDTH // 2, 100), fontsize=48, color="white")
+    draw_text("DUNGEON ESCAPE", center=(VIEW_WIDTH // 2, 100), fontsize=48, color="white")
     for name, rect in buttons.items():
-        color = "green" if (name == "sound" and not sound_enabled) else "gray"
+        color = "green" if (name == "sound" and not game.sound_enabled) else "gray"
         screen.draw.filled_rect(rect, color)
 
-        label = "START" if name == "start" else ("SOUND ON" if sound_enabled else "SOUND OFF") if name == "sound" else "QUIT"
+        label = "START" if name == "start" else ("SOUND ON" if game.sound_enabled else "SOUND OFF") if name == "sound" else "QUIT"
         if name == "instructions":
             label = "INSTRUCTIONS"
-        screen.draw.text(label, center=rect.center, fontsize=26, color="black")
+        draw_text(label, center=rect.center, fontsize=26, color="black")
 
 
 def draw_difficulty_selection():
     screen.clear()
-    screen.draw.text("SELECT DIFFICULTY", center=(WIDTH // 2, 100), fontsize=40, color="white")
+    draw_text("SELECT DIFFICULTY", center=(VIEW_WIDTH // 2, 100), fontsize=40, color="white")
     for name, rect in difficulty_buttons.items():
-        color = "yellow" if name == selected_difficulty else "gray"
+        color = "yellow" if name == game.selected_difficulty else "gray"
         screen.draw.filled_rect(rect, color)
-        screen.draw.text(name, center=rect.center, fontsize=30, color="black")
+        draw_text(name, center=rect.center, fontsize=30, color="black")
 
-    if selected_difficulty:
+    if game.selected_difficulty:
         screen.draw.filled_rect(button_start_game, "green")
-        screen.draw.text("START", center=button_start_game.center, fontsize=30, color="black")
-
-def check_collision():
-
-    global current_state, combat_enemy, enemies, hero, boss_enemy
+        draw_text("START", center=button_start_game.center, fontsize=30, color="black")
 
-    for enemy in enemies:
-        if hero.grid_x == enemy.grid_x and hero.grid_y == enemy.grid_y:
-            combat_enemy = enemy
-            current_state = STATE_COMBAT
-    
 
 def draw_game():
-    screen.clear()
-
-    # Desenha o fundo da dungeon em dimgray (como antes)
-    for y in range(ROWS):
-        for x in range(COLS):
-            screen.draw.filled_rect(Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE), "dimgray")
-
-    # Agora desenha as linhas brancas da grade
-    for y in range(ROWS + 1):
-        y_pos = y * TILE_SIZE
-        screen.draw.line((0, y_pos), (COLS * TILE_SIZE, y_pos), "white")
-    for x in range(COLS + 1):
-        x_pos = x * TILE_SIZE
-        screen.draw.line((x_pos, 0), (x_pos, ROWS * TILE_SIZE), "white")
-
-    # Desenha os baús e zonas de cura
-    draw_legendary_chests()
-    draw_healing_zones()
-
-    # Anima e desenha o herói
-    hero.animate()
-    screen.blit(hero.image, hero.topleft)
-
-    # Anima e desenha inimigos (com destaque para chefes)
-    for enemy in enemies:
-        enemy.animate()
-        screen.blit(enemy.image, enemy.topleft)
-        if enemy.boss:
-            rect = Rect(enemy.topleft[0], enemy.topleft[1], TILE_SIZE, TILE_SIZE)
-            for i in range(3):
-                screen.draw.rect(rect.inflate(i * 4, i * 4), "red")
-
-    # Desenha as estatísticas com espaçamento menor e cor branca
-    y_start = 10
-    y_spacing = 20  # menos espaçamento
-
-    screen.draw.text(f"HP: {hero.hp}  EXP: {hero.exp}", (10, y_start), fontsize=20, color="white")
-    screen.draw.text(f"Strength: {hero.strength}", (10, y_start + y_spacing), fontsize=20, color="white")
-    screen.draw.text(f"Defense: {hero.defense}", (10, y_start + 2 * y_spacing), fontsize=20, color="white")
-    screen.draw.text(f"Speed: {hero.speed}", (10, y_start + 3 * y_spacing), fontsize=20, color="white")
-    screen.draw.text(f"Money: {money} coins", (10, y_start + 4 * y_spacing), fontsize=20, color="white")
-
-
-
-
-check_collision()
-
-
-
-
-def calculate_attributes_with_item(item):
-    # Valores base do herói (pode usar herói atual para pegar base real)
-    strength = 10
-    defense = 5
-    speed = 5
-
-    # Soma bônus dos equipamentos atuais, exceto o slot do item que vamos testar
-    for slot, equipped in hero.equipment.items():
-        if slot != item["type"]:
-            for stat, val in equipped["bonus"].items():
-                if stat == "strength":
-                    strength += val
-                elif stat == "defense":
-                    defense += val
-                elif stat == "speed":
-                    speed += val
-
-    # Soma bônus do item hipotético
-    for stat, val in item["bonus"].items():
-        if stat == "strength":
-            strength += val
-        elif stat == "defense":
-            defense += val
-        elif stat == "speed":
-            speed += val
-
-    return strength, defense, speed
-
+    hero = game.hero
+
+    camera.follow(hero.grid_x, hero.grid_y)
+    x0, y0, x1, y1 = camera.visible_rect()
+
+    with profiler.phase("layers"):
+        # Fundo da dungeon e grade vêm prontos das camadas por chunk
+        floor_chunks.draw(screen, camera)
+
+        # Baús e zonas de cura
+        object_chunks.draw(screen, camera)
+
+    with profiler.phase("sprites"):
+        # Anima e desenha o herói
+        hero.animate()
+        sprites = loader.get("sprites")
+        blit_sprite(sprites.clips("hero")[hero.clip], hero.frame, camera.to_screen(hero.grid_x, hero.grid_y, TILE_SIZE))
+
+        # Anima e desenha só os inimigos dentro da câmera (com destaque para chefes)
+        enemy_clips = sprites.clips("enemy")
+        visible = game.enemies.animate_visible(x0 - SPRITE_MARGIN, y0 - SPRITE_MARGIN, x1, y1)
+        for grid_x, grid_y, clip, frame, boss in visible:
+            pos = camera.to_screen(grid_x, grid_y, TILE_SIZE)
+            blit_sprite(enemy_clips[clip], frame, pos)
+            if boss:
+                rect = Rect(pos[0], pos[1], TILE_SIZE, TILE_SIZE)
+                for i in range(3):
+                    screen.draw.rect(rect.inflate(i * 4, i * 4), "red")
+
+    with profiler.phase("hud"):
+        # Desenha as estatísticas com espaçamento menor e cor branca
+        y_start = 10
+        y_spacing = 20  # menos espaçamento
+
+        draw_text(f"HP: {hero.hp}  EXP: {hero.exp}", (10, y_start), fontsize=20, color="white")
+        draw_text(f"Strength: {hero.strength}", (10, y_start + y_spacing), fontsize=20, color="white")
+        draw_text(f"Defense: {hero.defense}", (10, y_start + 2 * y_spacing), fontsize=20, color="white")
+        draw_text(f"Speed: {hero.speed}", (10, y_start + 3 * y_spacing), fontsize=20, color="white")
+        draw_text(f"Money: {game.money} coins", (10, y_start + 4 * y_spacing), fontsize=20, color="white")
 
 
 def draw_inventory():
-    global start_visible, item_selected
-    screen.draw.text("INVENTARIO (E = Equipar, D = Vender)", (400, 20), fontsize=18, color="yellow")
-
-    global start_visible, item_selected
+    hero = game.hero
+    start_visible = game.start_visible
+    item_selected = game.item_selected
+    draw_text("INVENTARIO (E = Equipar, D = Vender)", (400, 20), fontsize=18, color="yellow")
 
     total_items = len(hero.inventory)
-    end_visible = min(start_visible + items_per_page, total_items)
+    end_visible = min(start_visible + game.items_per_page, total_items)
     y = 60
 
-        # Desenha somente os itens visíveis da "janela" do inventário
-    for idx in range(start_visible, end_visible):
-        item = hero.inventory[idx]
+    # Desenha somente os itens visíveis da "janela" do inventário
+    for idx, item, equipped in hero.inventory.window(start_visible, game.items_per_page):
         color = item["color"]
         prefix = "-> " if item_selected == idx else "   "
         item_text = f"{prefix}{item['name']}"
         text_x, text_y = 400, y
-        screen.draw.text(item_text, (text_x, text_y), fontsize=20, color=color)
+        draw_text(item_text, (text_x, text_y), fontsize=20, color=color)
 
-        # Verifica se o item está equipado e desenha a linha verde
-        if any(equipado.get("name") == item["name"] for equipado in hero.equipment.values()):
-            text_width = screen.surface.get_rect().width  # largura da tela
+        # Linha verde sob a entrada equipada
+        if equipped:
             line_y = text_y + 14  # linha abaixo do texto
             screen.draw.line((text_x, line_y), (text_x + 160, line_y), "green")
 
         y += 30
 
-
     # Indicadores de scroll
     if end_visible < total_items:
-        screen.draw.text("abaixo", (570, y - 5), fontsize=18, color="white")
+        draw_text("abaixo", (570, y - 5), fontsize=18, color="white")
     if start_visible > 0:
-        screen.draw.text("acima", (570, 60 - 5), fontsize=18, color="white")
+        draw_text("acima", (570, 60 - 5), fontsize=18, color="white")
 
     # Equipamentos
     y_equip = y + 20
-    screen.draw.text("EQUIPADO:", (400, y_equip), fontsize=18, color="cyan")
+    draw_text("EQUIPADO:", (400, y_equip), fontsize=18, color="cyan")
     for i, (slot, item) in enumerate(hero.equipment.items()):
-        screen.draw.text(f"{slot}: {item['name']}", (400, y_equip + 25 + i * 25), fontsize=18, color=item["color"])
+        draw_text(f"{slot}: {item['name']}", (400, y_equip + 25 + i * 25), fontsize=18, color=item["color"])
 
     # Preview do item selecionado (se estiver na janela visível)
     if item_selected is not None and start_visible <= item_selected < end_visible:
         item = hero.inventory[item_selected]
-        nova_forca, nova_defesa, nova_velocidade = calculate_attributes_with_item(item)
-
-        diff_strength = nova_forca - hero.strength
-        diff_defense = nova_defesa - hero.defense
-        diff_speed = nova_velocidade - hero.speed
+        # Diferença em cache até o equipamento mudar
+        diff_strength, diff_defense, diff_speed = hero.stats.preview(item)
 
         def text_diff(value, name):
             sign = "+" if value >= 0 else ""
@@ -539,362 +362,212 @@ def draw_inventory():
         d_text, d_color = text_diff(diff_defense, "Defesa")
         v_text, v_color = text_diff(diff_speed, "Velocidade")
 
-        screen.draw.text("Com este item equipado:", (400, y_equip + 120), fontsize=18, color="yellow")
-        screen.draw.text(f_text, (400, y_equip + 150), fontsize=18, color=f_color)
-        screen.draw.text(d_text, (400, y_equip + 175), fontsize=18, color=d_color)
-        screen.draw.text(v_text, (400, y_equip + 200), fontsize=18, color=v_color)
+        draw_text("Com este item equipado:", (400, y_equip + 120), fontsize=18, color="yellow")
+        draw_text(f_text, (400, y_equip + 150), fontsize=18, color=f_color)
+        draw_text(d_text, (400, y_equip + 175), fontsize=18, color=d_color)
+        draw_text(v_text, (400, y_equip + 200), fontsize=18, color=v_color)
 
 
-combat_log = []
-
-def add_to_combat_log(message):
-    global combat_log
-    combat_log.append(message)
-    # Mantém só as últimas 10 mensagens para não encher demais a tela
-    if len(combat_log) > 10:
-        combat_log.pop(0)
-
-
-
-def clear_combat_log():
-    global combat_log
-    combat_log = []
-
 MAX_LOG_LINES = 8  # número de linhas visíveis no histórico
 
+
 def draw_combat():
     screen.clear()
-    screen.draw.text("TURN-BASED COMBAT!", center=(WIDTH // 2, 60), fontsize=40, color="red")
-    screen.draw.text(f"HERO HP: {hero.hp}", (100, 150), fontsize=30)
-    screen.draw.text(f"ENEMY HP: {combat_enemy.hp}", (100, 200), fontsize=30)
-    screen.draw.text("PRESS SPACE TO ATTACK", center=(WIDTH // 2, 400), fontsize=25, color="yellow")
+    draw_text("TURN-BASED COMBAT!", center=(VIEW_WIDTH // 2, 60), fontsize=40, color="red")
+    draw_text(f"HERO HP: {game.hero.hp}", (100, 150), fontsize=30)
+    draw_text(f"ENEMY HP: {game.combat_enemy.hp}", (100, 200), fontsize=30)
+    draw_text("PRESS SPACE TO ATTACK", center=(VIEW_WIDTH // 2, 400), fontsize=25, color="yellow")
 
     # Desenhar o histórico no canto superior direito
-    x = WIDTH - 220  # distância da margem direita
-    y = 100 
-    for line in combat_log[-MAX_LOG_LINES:]:
-        screen.draw.text(line, (x, y), fontsize=20, color="white")
+    x = VIEW_WIDTH - 220  # distância da margem direita
+    y = 100
+    for line in list(game.combat_log)[-MAX_LOG_LINES:]:
+        draw_text(line, (x, y), fontsize=20, color="white")
         y += 22
 
 
 def draw_game_over():
     screen.clear()
-    screen.draw.text("GAME OVER", center=(WIDTH // 2, HEIGHT // 2), fontsize=60, color="red")
+    draw_text("GAME OVER", center=(VIEW_WIDTH // 2, VIEW_HEIGHT // 2), fontsize=60, color="red")
 
 
 def draw_victory():
     screen.clear()
-    screen.draw.text("CONGRATULATIONS! BOSS DEFEATED!", center=(WIDTH // 2, HEIGHT // 2 - 40), fontsize=40, color="yellow")
-    screen.draw.text("PRESS ENTER TO RETURN TO MENU", center=(WIDTH // 2, HEIGHT // 2 + 20), fontsize=25, color="white")
-
-
-
-
-
-
-def update():
-    global current_state
-
-   
-    for zone in healing_zones:
-        if hero.grid_x == zone["grid_x"] and hero.grid_y == zone["grid_y"]:
-            if hero.hp < 100:
-                hero.hp = min(hero.hp + 1, 100)
-   
-
-    if current_state == STATE_GAME:
-        for enemy in enemies:
-            enemy.update_movement()
-        update_boss()
-        check_collision()
-
-
-def on_mouse_down(pos):
-    global current_state, selected_difficulty, difficulty_multiplier, current_level, enemies, boss_enemy, sound_enabled
-
-    if current_state == STATE_MENU:
-        if buttons["start"].collidepoint(pos):
-            current_state = STATE_DIFFICULTY_SELECTION
-        elif buttons["sound"].collidepoint(pos):
-            sound_enabled = not sound_enabled
-            if sound_enabled:
-                music.play("background_music")
-            else:
-                music.stop()
-        elif buttons["instructions"].collidepoint(pos):
-            current_state = STATE_INSTRUCTIONS
-        elif buttons["quit"].collidepoint(pos):
-            exit()
+    draw_text("CONGRATULATIONS! BOSS DEFEATED!", center=(VIEW_WIDTH // 2, VIEW_HEIGHT // 2 - 40), fontsize=40, color="yellow")
+    draw_text("PRESS ENTER TO RETURN TO MENU", center=(VIEW_WIDTH // 2, VIEW_HEIGHT // 2 + 20), fontsize=25, color="white")
 
 
-    elif current_state == STATE_DIFFICULTY_SELECTION:
-        for name, rect in difficulty_buttons.items():
-            if rect.collidepoint(pos):
-                selected_difficulty = name
-                difficulty_multiplier = DIFFICULTY_LEVELS[selected_difficulty]
-        if selected_difficulty and button_start_game.collidepoint(pos):
-            current_level = 1
-            enemies, boss_enemy = generate_enemies(current_level, difficulty_multiplier)
-            start_level()
-            current_state = STATE_GAME
-    
+PROFILER_COLUMNS = (0, 110, 155, 200, 245)  # x de cada coluna do overlay
 
-def move_hero(dx, dy):
-    global hero, sound_enabled
-    new_x = hero.grid_x + dx
-    new_y = hero.grid_y + dy
 
-    if 0 <= new_x < COLS and 0 <= new_y < ROWS:
-        hero.move(dx, dy)
-        if sound_enabled:
-            sounds.step.play()
-        check_collision()
-        check_legendary_chest_interaction()
-        check_healing_zone(hero)
+def draw_profiler():
+    rows = profiler.report_rows()
+    top = VIEW_HEIGHT - 8 - 14 * len(rows)
+    screen.draw.filled_rect(Rect(VIEW_WIDTH - 300, top, 300, VIEW_HEIGHT - top), (0, 0, 0))
+    for i, row in enumerate(rows):
+        for x, cell in zip(PROFILER_COLUMNS, row):
+            draw_text(cell, (VIEW_WIDTH - 296 + x, top + 4 + 14 * i), fontsize=14, color="yellow")
 
 
-
-def draw():
-    global current_state, inventory_visible, selected_item_index, visible_start_index, items_per_page
-    if current_state == STATE_MENU:
+def draw_screen():
+    state = game.current_state
+    if state == STATE_MENU:
         draw_menu()
-    elif current_state == STATE_DIFFICULTY_SELECTION:
+    elif state == STATE_DIFFICULTY_SELECTION:
         draw_difficulty_selection()
-    elif current_state == STATE_GAME:
-        draw_game()
-        draw_healing_zones()
-        if inventory_visible:
-            draw_inventory()
-        if current_level == MAX_LEVELS:
-            screen.draw.text("DERROTE O CHEFE!", center=(WIDTH//2, 10), fontsize=30, color="red")
-    
-    elif current_state == STATE_INSTRUCTIONS:
+    elif state == STATE_GAME:
+        with profiler.phase("draw_game"):
+            draw_game()
+        if game.inventory_visible:
+            with profiler.phase("draw_inventory"):
+                draw_inventory()
+        if game.current_level == MAX_LEVELS:
+            draw_text("DERROTE O CHEFE!", center=(VIEW_WIDTH//2, 10), fontsize=30, color="red")
+
+    elif state == STATE_INSTRUCTIONS:
         draw_instructions()
-    elif current_state == STATE_COMBAT:
-        draw_combat()
-    elif current_state == STATE_GAME_OVER:
+    elif state == STATE_COMBAT:
+        with profiler.phase("draw_combat"):
+            draw_combat()
+    elif state == STATE_GAME_OVER:
         draw_game_over()
-    elif current_state == STATE_VICTORY:
+    elif state == STATE_VICTORY:
         draw_victory()
-   
-
-def calculate_sell_price(item):
-    # Função exemplo para calcular preço de venda
-    base_price = item.get("level", 1) * 10
-    rarity_multiplier = {"Normal": 1, "Rare": 2, "Excellent": 3, "Legendary": 5}
-    return base_price * rarity_multiplier.get(item.get("rarity", "Normal"), 1)
-
-def check_healing_zone(hero):
-    for zone in healing_zones:
-        if hero.grid_x == zone["grid_x"] and hero.grid_y == zone["grid_y"]:
-            if hero.hp < 100:
-                hero.hp = min(hero.hp + 15, 100)
-                print("Cura recebida! HP atual:", hero.hp)
-
-
-def reset_hero():
-    global hero
-    # Reseta atributos do heroi, inventario, hp, etc
-    hero.hp = 100
-    hero.exp = 0
-    hero.inventory = []
-    hero.equipment = {}
-    hero.strength = 10
-    hero.defense = 5
-    hero.speed = 5
-
-
-
-
-def update_hero_attributes():
-    # Atributos base
-    hero.strength = 10
-    hero.defense = 5
-    hero.speed = 5
-
-    # Somar bônus dos equipamentos
-    for item in hero.equipment.values():
-        for stat, val in item["bonus"].items():
-            if hasattr(hero, stat):
-                setattr(hero, stat, getattr(hero, stat) + val)
 
 
+def draw():
+    window = screen.surface
+    if canvas is not None:
+        screen.surface = canvas.target(window)
+    with profiler.phase("draw"):
+        draw_screen()
+    if profiler.enabled:
+        draw_profiler()
+    if canvas is not None:
+        screen.surface = window
+        with profiler.phase("present"):
+            canvas.present(window)
+    profiler.end_frame()
+    if not startup.done():
+        mark_startup()
 
-def calculate_sale_price(item):
-    base_valor = {
-        "Normal": 10,
-        "Raro": 30,
-        "Excelente": 60,
-        "Lendario": 100
-    }
 
-    preco = base_valor.get(item["rarity"], 10)
+def mark_startup():
+    # Marcas da abertura; com DUNGEON_PROFILE=1 o relatorio sai no terminal
+    startup.mark("first_frame")
+    if loader.ready():
+        startup.mark("assets_ready", loader.finished_at)
+    if game.current_state == STATE_GAME:
+        startup.mark("first_playable")
+        if profiler.enabled:
+            print(f"Abertura: {startup.report()} (cargas que travaram: {loader.blocking_loads})")
 
-    preco *= item["level"]
-    return preco
 
+# --- Entrada e loop ---
 
-def on_key_down(key):
-    global current_state, hero, enemies, combat_enemy, current_level
-    global difficulty_selected, difficulty_multiplier, sound_enabled, music, legendary_chest
-    global selected_item_index, visible_start_index, items_per_page
-    global inventory_visible, selected_difficulty
-    global boss_enemy, enemy_in_combat
-    global item_selected, start_visible, difficulties
-    global difficulties
 
+# F8 liga o jogador automatico (MCTS); as teclas dele passam por send(),
+# entao tambem vao para a gravacao
+autoplayer = None
 
 
+def update():
+    if remote is not None:
+        with profiler.phase("network"):
+            remote.poll()
+        if not remote.connected:
+            print("Conexao com o servidor encerrada")
+            exit()
+        return
+    if autoplayer is not None:
+        with profiler.phase("autoplay"):
+            actions = autoplayer.choose()
+        for action in actions:
+            send(action)
+    with profiler.phase("update"):
+        game.update()
+
+
+def send(action):
+    if remote is not None:
+        remote.send(action)
+        return
+    if recorder is not None:
+        recorder.record(action)
+    game.handle_input(action)
 
-    if current_state == STATE_DIFFICULTY_SELECTION:
-        options = list(difficulties.keys())
-        if difficulty_selected not in options:
-            difficulty_selected = options[0]
 
-        index = options.index(difficulty_selected)
+def on_mouse_down(pos):
+    if canvas is not None:
+        pos = canvas.to_logical(pos)
+        if pos is None:
+            return  # clique na borda preta
+    send(("click", tuple(pos)))
 
-        if key == keys.UP:
-            index = (index - 1) % len(options)
-            difficulty_selected = options[index]
 
-        elif key == keys.DOWN:
-            index = (index + 1) % len(options)
-            difficulty_selected = options[index]
+def save_game(slot):
+    if remote is not None:
+        print("Saves indisponiveis numa sessao do servidor")
+        return
+    if game.current_state in (STATE_GAME, STATE_COMBAT):
+        save_slots[slot].save(game)
+        print(f"Jogo salvo no slot {slot}")
 
-        elif key == keys.RETURN:
-            difficulty_multiplier = difficulties[difficulty_selected]
-            current_level = 1
-            enemies = generate_enemies(current_level, difficulty_multiplier)
-            start_level()
-            current_state = STATE_GAME
 
+def load_game(slot):
+    global recorder
+    if remote is not None:
+        print("Saves indisponiveis numa sessao do servidor")
         return
-    
-   
-        
-    if current_state == STATE_GAME:
-        dx, dy = 0, 0
-        if key == keys.UP:
-            dy = -1
-        elif key == keys.DOWN:
-            dy = 1
-        elif key == keys.LEFT:
-            dx = -1
-        elif key == keys.RIGHT:
-            dx = 1
-
-        if dx != 0 or dy != 0:
-            new_x = hero.grid_x + dx
-            new_y = hero.grid_y + dy
-            if 0 <= new_x < COLS and 0 <= new_y < ROWS:
-                hero.move(dx, dy)
-                if sound_enabled:
-                    sounds.step.play()
-                check_collision()
-                check_legendary_chest_interaction()
-        elif key == keys.I:
-            inventory_visible = not inventory_visible
-            if inventory_visible:
-                item_selected = 0 if hero.inventory else None
-                start_visible = 0
-
-        if inventory_visible:
-                if key == keys.W and item_selected is not None:
-                    if item_selected > 0:
-                        item_selected -= 1
-                        # Ajusta a janela de itens visíveis para cima
-                        if item_selected < start_visible:
-                            start_visible = item_selected
-
-                elif key == keys.S and item_selected is not None:
-                    if item_selected < len(hero.inventory) - 1:
-                        item_selected += 1
-                        # Ajusta a janela de itens visíveis para baixo
-                        if item_selected >= start_visible + items_per_page:
-                            start_visible = item_selected - items_per_page + 1
-
-                elif key == keys.E and item_selected is not None:
-                    item = hero.inventory[item_selected]
-                    hero.equipment[item["type"]] = item
-                    update_hero_attributes()
-                    inventory_visible = False
-                    item_selected = None
-
-                elif key == keys.D and item_selected is not None:
-                    item = hero.inventory.pop(item_selected)
-                    sale_price = calculate_sale_price(item)
-                    global money
-                    money += sale_price
-                    print(f"Item vendido por {sale_price} moedas: {item['name']}")
-                    # Ajusta seleção
-                    if item_selected >= len(hero.inventory):
-                        item_selected = len(hero.inventory) - 1 if hero.inventory else None
-                    # Ajusta janela se necessário
-                    if start_visible > 0 and start_visible + items_per_page > len(hero.inventory):
-                        start_visible = max(0, len(hero.inventory) - items_per_page)
-
-    if current_state == STATE_INSTRUCTIONS:
-        if key == keys.RETURN:
-            current_state = STATE_MENU
-
-    elif current_state == STATE_COMBAT:
-       
-        if key == keys.SPACE:
-            damage_hero = random.randint(hero.strength // 2, hero.strength)
-            combat_enemy.hp -= damage_hero
-
-            add_to_combat_log(f"Hero dealt {damage_hero} damage to {combat_enemy.image_prefix}!")
-            print(f"Hero dealt {damage_hero} damage!")
-
-            if combat_enemy.hp <= 0:
-                hero.exp += 10
-                clear_combat_log()
-                drop = generate_random_item()
-                hero.inventory.append(drop)
-                if getattr(combat_enemy, "boss", False):
-                    print("Boss defeated! You won the game!")
-                    current_state = STATE_VICTORY
-                    try:
-                        music.play("victory_music")
-                    except:
-                        pass
-                    enemies.clear()
-                else:
-                    enemies.remove(combat_enemy)
-                    update_boss()
-
-                    if not enemies or (len(enemies) == 1 and any(getattr(i, "boss", False) for i in enemies)):
-                        print("All enemies defeated! Advancing level...")
-                        advance_level()
-                    current_state = STATE_GAME
-            else:
-                damage_enemy = random.randint(3, 30) - hero.defense // 2
-                damage_enemy = max(1, damage_enemy)
-                hero.hp -= damage_enemy
-
-                add_to_combat_log(f"{combat_enemy.image_prefix} dealt {damage_enemy} damage to Hero!")
-                print(f"Enemy dealt {damage_enemy} damage!")
-
-            if hero.hp <= 0:
-                current_state = STATE_GAME_OVER
-
-    elif current_state == STATE_VICTORY:
-        if key == keys.RETURN:
-            current_state = STATE_MENU
-            current_level = 1
-            enemies = generate_enemies(current_level, difficulty_multiplier)
-            reset_hero()
-            try:
-                music.play("background_music")
-            except:
-                pass
+    save_slot = save_slots[slot]
+    if not save_slot.exists():
+        print(f"Slot {slot} vazio")
+        return
+    try:
+        save_slot.load(game)
+    except ValueError as error:
+        print(f"Nao foi possivel carregar o slot {slot}: {error}")
+        return
+    if recorder is not None:
+        # A gravacao parte de um jogo novo; depois de carregar nao reproduz mais
+        atexit.unregister(recorder.save)
+        recorder.save(RECORD_PATH)
+        recorder = None
+        print("Gravacao encerrada ao carregar um save")
+    print(f"Slot {slot} carregado")
+
+
+def toggle_autoplay():
+    global autoplayer
+    if remote is not None:
+        print("Jogador automatico so no jogo local")
+        return
+    if autoplayer is not None:
+        autoplayer = None
+    else:
+        from autoplay import MCTSPlayer  # a busca so carrega quando liga
+        autoplayer = MCTSPlayer(game)
+    print(f"Jogador automatico {'ligado' if autoplayer else 'desligado'}")
 
 
+def on_key_down(key):
+    if key.name == "F8":
+        toggle_autoplay()
+    elif key.name == "F3":
+        profiler.toggle()
+    elif key.name == "F4":
+        print(f"Amostras salvas em {profiler.export_csv(time.strftime('profile_%Y%m%d_%H%M%S.csv'))}")
+    elif key.name in SAVE_KEYS:
+        save_game(SAVE_KEYS[key.name])
+    elif key.name in LOAD_KEYS:
+        load_game(LOAD_KEYS[key.name])
+    else:
+        send(key.name)
 
 
 def animate():
-    hero.frame += 1
-    for enemy in enemies:
-        enemy.frame += 1
+    game.hero.frame += 1
+    game.enemies.tick_frames()
 
-clock.schedule_interval(animate, 0.3)
\ No newline at end of file
+clock.schedule_interval(animate, 0.3)
+startup.mark("import")
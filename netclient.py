@@ -0,0 +1,197 @@
+import json
+import queue
+import socket
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from engine import GameState
+from items import TYPES, template
+from replay import encode_action
+from server import ENEMY_FIELDS, PROTOCOL_VERSION, encode_line
+from spatial import build_index
+
+# Cliente fino do server.py: mantem um GameState "espelho" que nunca roda
+# update(), so recebe os deltas do servidor, para main.py desenhar com as
+# mesmas funcoes do jogo local. Os eventos de cada tick sao reemitidos no
+# espelho depois de aplicar o estado, entao som e camadas de render reagem
+# como no jogo local.
+#
+# A leitura do socket fica numa thread; poll() aplica no quadro o que ja
+# chegou.
+
+LATENCY_SAMPLES = 1000
+
+
+class RemoteGame:
+    def __init__(self, host, port, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self.sock.makefile("rb")
+        hello = json.loads(self._file.readline())
+        if hello.get("version") != PROTOCOL_VERSION:
+            raise ValueError(f"protocol version {hello.get('version')} != {PROTOCOL_VERSION}")
+        self.sock.settimeout(None)
+        self.session = hello["session"]
+        options = dict(hello["options"])
+        if "map_size" in options:
+            options["map_size"] = tuple(options["map_size"])  # lista no JSON
+        # Mesmo seed e opcoes -> mesmo mapa; o espelho nao persegue ninguem
+        self.game = GameState(seed=hello["seed"], pursuit=False, **options)
+        self.ids = {}  # id do inimigo no servidor -> id no espelho
+        self.connected = True
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)  # entrada -> ack (s)
+        self._seq = 0
+        self._sent = {}
+        self._messages = queue.SimpleQueue()
+        self._reader = threading.Thread(target=self._read, name="net-reader", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        try:
+            for line in self._file:
+                self._messages.put(json.loads(line))
+        except OSError:
+            pass
+        self._messages.put(None)
+
+    def send(self, action):
+        if not self.connected:
+            return
+        self._seq += 1
+        self._sent[self._seq] = time.perf_counter()
+        try:
+            self.sock.sendall(encode_line({"seq": self._seq, "input": encode_action(action)}))
+        except OSError:
+            self.connected = False
+
+    def poll(self):
+        # Aplica as mensagens que chegaram; devolve quantas
+        applied = 0
+        while True:
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                self.connected = False
+                break
+            self._acknowledge(message.get("ack"))
+            apply_update(self.game, message, self.ids)
+            applied += 1
+        return applied
+
+    def _acknowledge(self, ack):
+        if ack is None:
+            return
+        now = time.perf_counter()
+        for seq in [seq for seq in self._sent if seq <= ack]:
+            self.latencies.append(now - self._sent.pop(seq))
+
+    def latency(self):
+        # Percentis (ms) de entrada ate o tick que a aplicou
+        if not self.latencies:
+            return None
+        values = np.array(self.latencies) * 1000
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        return {"count": len(values), "p50": p50, "p95": p95, "p99": p99, "max": values.max()}
+
+    def close(self):
+        self.connected = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def apply_update(game, message, ids):
+    # Aplica um tick do servidor no espelho e reemite os eventos dele
+    game.tick = message.get("tick", game.tick)
+    for name, value in message.get("hud", {}).items():
+        if name == "selected_difficulty":
+            game.select_difficulty(value)
+        else:
+            setattr(game, name, value)
+
+    hero = game.hero
+    fields = message.get("hero")
+    if fields:
+        x = fields.get("grid_x", hero.grid_x)
+        y = fields.get("grid_y", hero.grid_y)
+        if (x, y) != (hero.grid_x, hero.grid_y):
+            hero.moving = True  # clip de andar no proximo desenho
+        for name, value in fields.items():
+            setattr(hero, name, value)
+
+    inventory = message.get("inventory")
+    if inventory is not None:
+        _apply_inventory(hero, inventory)
+
+    chests = message.get("chests")
+    if chests is not None:
+        game.legendary_chests = [{"pos_x": x, "pos_y": y, "opened": opened, "items": []}
+                                 for x, y, opened in chests]
+        game.chest_index = build_index(game.legendary_chests, "pos_x", "pos_y")
+
+    if "log" in message:
+        game.combat_log.clear()
+        game.combat_log.extend(message["log"])
+
+    enemies = message.get("enemies")
+    if enemies:
+        _apply_enemies(game.enemies, enemies, ids)
+
+    if "combat" in message:
+        remote_id = message["combat"]
+        game.combat_enemy = game.enemies.view(ids[remote_id]) if remote_id is not None else None
+
+    for event, data in message.get("events", ()):
+        if event == "chest_opened":
+            data = {"chest": game.legendary_chests[data["chest"]]}
+        game.emit(event, **data)
+
+
+def _apply_inventory(hero, message):
+    inventory = hero.inventory
+    if "items" in message:
+        inventory.clear()
+        inventory.extend(template(template_id) for template_id in message["items"])
+    else:
+        for op, value in message["ops"]:
+            if op == "+":
+                inventory.append(template(value))
+            else:
+                inventory.pop(value)
+        for item_type in TYPES:
+            inventory.unmark_equipped(item_type)
+    # Equipamento pelos templates (o item pode ja ter sido vendido) e as
+    # marcas pelas posicoes; forca/defesa/velocidade ficam com os campos
+    # "hero" do servidor, sem apply_stats
+    hero.stats.clear()
+    for template_id in message["equipment"].values():
+        hero.stats.equip(template(template_id))
+    for position in message["equipped"]:
+        inventory.mark_equipped(position)
+
+
+def _apply_enemies(store, enemies, ids):
+    for remote_id in enemies.get("removed", ()):
+        store.remove(ids.pop(remote_id))
+    for remote_id, *row in enemies.get("set", ()):
+        values = dict(zip(ENEMY_FIELDS, row))
+        local_id = ids.get(remote_id)
+        if local_id is None:
+            view = store.spawn(values["grid_x"], values["grid_y"], values["hp"], 0, 0, 1,
+                               direction=values["direction"], boss=bool(values["boss"]))
+            ids[remote_id] = view.id
+            continue
+        slot = store.slots[local_id]
+        dx = values["grid_x"] - int(store.grid_x[slot])
+        dy = values["grid_y"] - int(store.grid_y[slot])
+        if dx or dy:
+            store.move(local_id, dx, dy)
+        store.direction[slot] = values["direction"]
+        store.hp[slot] = values["hp"]
@@ -0,0 +1,128 @@
+import numpy as np
+
+# Campo de distancias (BFS) a partir do tile do heroi, compartilhado por
+# todos os inimigos: cada inimigo so olha os 4 vizinhos e desce o gradiente,
+# custo O(1) por inimigo. O campo cobre uma janela em volta do heroi (o mapa
+# pode ter 2000x2000) e so e recalculado quando o heroi muda de tile.
+
+INF = np.iinfo(np.int32).max // 2
+DEFAULT_RADIUS = 32
+
+# Mesma ordem de engine.DIRECTIONS / enemies.DIR_X, DIR_Y
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class FlowField:
+    def __init__(self, world, radius=DEFAULT_RADIUS):
+        self.world = world
+        self.radius = radius
+        # Janela de (2r+1)^2 tiles, recortada ao mapa: o mapa classico cabe
+        # inteiro nela
+        self.width = min(2 * radius + 1, world.width)
+        self.height = min(2 * radius + 1, world.height)
+        self.origin = None      # canto (x, y) da janela no mapa
+        self.target = None      # tile do heroi usado no ultimo calculo
+        self.walkable = None
+        self.dist = None        # int32 [y, x] relativo a origin
+        self.padded = None      # dist com borda de INF, para olhar vizinhos
+        self.full_updates = 0
+        self.incremental_updates = 0
+        self.iterations = 0
+
+    def _window_for(self, x, y):
+        # Janela so anda quando o heroi chega perto da borda (ou nunca, se
+        # ela cobre o mapa todo)
+        world = self.world
+        if self.origin is not None:
+            ox, oy = self.origin
+            margin = self.radius // 2
+            fits_x = ox + margin <= x < ox + self.width - margin or self.width == world.width
+            fits_y = oy + margin <= y < oy + self.height - margin or self.height == world.height
+            if fits_x and fits_y:
+                return self.origin
+        ox = min(max(x - self.radius, 0), world.width - self.width)
+        oy = min(max(y - self.radius, 0), world.height - self.height)
+        return ox, oy
+
+    def update(self, x, y):
+        if (x, y) == self.target:
+            return
+        origin = self._window_for(x, y)
+        previous = self.target
+        if origin != self.origin:
+            self.origin = origin
+            self.walkable = self.world.walkable_window(origin[0], origin[1], self.width, self.height)
+            self.dist = None
+        self.target = (x, y)
+
+        ox, oy = origin
+        if not self.world.has_walls:
+            # Sem paredes a distancia BFS e a de Manhattan: forma fechada
+            cols = np.abs(np.arange(ox - x, ox - x + self.width, dtype=np.int32))
+            rows = np.abs(np.arange(oy - y, oy - y + self.height, dtype=np.int32))
+            self._set_dist(rows[:, None] + cols[None, :])
+            self.full_updates += 1
+            return
+        if self.dist is not None and previous is not None and abs(previous[0] - x) + abs(previous[1] - y) == 1:
+            # Heroi andou um tile: d_novo(v) <= d_antigo(v) + 1, entao o
+            # campo antigo + 1 e um limite superior valido para relaxar
+            dist = self.dist + 1
+            np.minimum(dist, INF, out=dist)
+            self.incremental_updates += 1
+        else:
+            dist = np.full((self.height, self.width), INF, dtype=np.int32)
+            self.full_updates += 1
+        dist[y - oy, x - ox] = 0
+        self._set_dist(self._relax(dist))
+
+    def _set_dist(self, dist):
+        self.dist = dist
+        padded = np.full((self.height + 2, self.width + 2), INF, dtype=np.int32)
+        padded[1:-1, 1:-1] = dist
+        self.padded = padded
+
+    def _relax(self, dist):
+        # BFS em frente de onda vetorizada: repete min(vizinho + 1) ate
+        # estabilizar; paredes ficam em INF
+        blocked = ~self.walkable
+        dist[blocked] = INF
+        while True:
+            self.iterations += 1
+            best = dist.copy()
+            np.minimum(best[1:, :], dist[:-1, :] + 1, out=best[1:, :])
+            np.minimum(best[:-1, :], dist[1:, :] + 1, out=best[:-1, :])
+            np.minimum(best[:, 1:], dist[:, :-1] + 1, out=best[:, 1:])
+            np.minimum(best[:, :-1], dist[:, 1:] + 1, out=best[:, :-1])
+            best[blocked] = INF
+            if np.array_equal(best, dist):
+                return dist
+            dist = best
+
+    def distance(self, x, y):
+        if self.dist is None:
+            return INF
+        ox, oy = self.origin
+        if 0 <= x - ox < self.width and 0 <= y - oy < self.height:
+            return int(self.dist[y - oy, x - ox])
+        return INF
+
+    def best_directions(self, xs, ys):
+        # Para cada posicao: (indice da direcao que desce o campo, ok). ok e
+        # False fora da janela, sem caminho ou quando nenhum vizinho melhora
+        n = len(xs)
+        if self.dist is None or n == 0:
+            return np.zeros(n, dtype=np.int8), np.zeros(n, dtype=bool)
+        ox, oy = self.origin
+        width = self.width
+        height = self.height
+        padded = self.padded
+        lx = xs - ox + 1
+        ly = ys - oy + 1
+        inside = (lx >= 1) & (lx <= width) & (ly >= 1) & (ly <= height)
+        lx = np.where(inside, lx, 1)
+        ly = np.where(inside, ly, 1)
+        here = padded[ly, lx]
+        around = np.stack([padded[ly + dy, lx + dx] for dx, dy in NEIGHBOURS])
+        best = around.argmin(axis=0)
+        ok = inside & (around.min(axis=0) < here) & (here < INF)
+        return best.astype(np.int8), ok
@@ -0,0 +1,169 @@
+import csv
+import time
+
+import numpy as np
+
+# Profiler de quadros: cada fase (update, draw, draw_game...) e medida com
+# perf_counter_ns e cada quadro vira uma linha num ring buffer (ms por fase,
+# NaN se a fase nao rodou). Percentis sao calculados do ring sob demanda.
+#
+# Desligado, phase() devolve um context manager vazio compartilhado e
+# end_frame() retorna na primeira linha: o custo e uma chamada por fase.
+
+DEFAULT_CAPACITY = 1200  # ~20 s a 60 fps
+PERCENTILES = (50, 95, 99)
+REPORT_EVERY = 15        # quadros entre recalculos do relatorio
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        # Soma: uma fase chamada duas vezes no quadro conta as duas
+        elapsed = time.perf_counter_ns() - self.start
+        totals = self.totals
+        totals[self.name] = totals.get(self.name, 0) + elapsed
+        return False
+
+
+class FrameProfiler:
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.columns = {}  # fase -> coluna do ring
+        self.ring = np.full((capacity, 0), np.nan)
+        self.frames = 0    # quadros gravados desde o ultimo reset
+        self._totals = {}  # ns por fase no quadro corrente
+        self._phases = {}
+        self._last_frame = None
+        self._report = []
+        self._report_frame = -1
+
+    # --- Ligar / desligar ---
+
+    def enable(self):
+        self.enabled = True
+        self._last_frame = None
+        self._totals.clear()
+
+    def disable(self):
+        self.enabled = False
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    def reset(self):
+        self.columns = {}
+        self.ring = np.full((self.capacity, 0), np.nan)
+        self.frames = 0
+        self._totals.clear()
+        self._phases.clear()
+        self._last_frame = None
+        self._report_frame = -1
+
+    # --- Medicao ---
+
+    def phase(self, name):
+        if not self.enabled:
+            return NULL_PHASE
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self._totals, name)
+        return phase
+
+    def _column(self, name):
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = len(self.columns)
+            self.ring = np.hstack([self.ring, np.full((self.capacity, 1), np.nan)])
+        return column
+
+    def end_frame(self):
+        # Fecha o quadro: "frame" e o tempo de parede desde o quadro anterior
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        totals = self._totals
+        if self._last_frame is not None:
+            totals["frame"] = now - self._last_frame
+        self._last_frame = now
+        if not totals:
+            return
+        for name in totals:
+            self._column(name)
+        row = self.ring[self.frames % self.capacity]
+        row[:] = np.nan
+        for name, elapsed in totals.items():
+            row[self.columns[name]] = elapsed / 1e6
+        totals.clear()
+        self.frames += 1
+
+    # --- Resultados ---
+
+    def samples(self):
+        # Linhas do ring em ordem cronologica (ms)
+        filled = min(self.frames, self.capacity)
+        if self.frames <= self.capacity:
+            return self.ring[:filled]
+        start = self.frames % self.capacity
+        return np.vstack([self.ring[start:], self.ring[:start]])
+
+    def stats(self):
+        samples = self.samples()
+        result = {}
+        for name, column in self.columns.items():
+            values = samples[:, column]
+            values = values[~np.isnan(values)]
+            if values.size == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, PERCENTILES)
+            result[name] = {"count": int(values.size), "mean": float(values.mean()), "p50": float(p50),
+                            "p95": float(p95), "p99": float(p99), "max": float(values.max())}
+        return result
+
+    def report_rows(self):
+        # Celulas do overlay (fase, p50, p95, p99, max em ms), recalculadas a
+        # cada REPORT_EVERY quadros
+        if self._report_frame < 0 or self.frames - self._report_frame >= REPORT_EVERY:
+            self._report_frame = self.frames
+            rows = [("fase (ms)", "p50", "p95", "p99", "max")]
+            for name, s in sorted(self.stats().items(), key=lambda item: -item[1]["p50"]):
+                rows.append((name,) + tuple(f"{s[key]:.2f}" for key in ("p50", "p95", "p99", "max")))
+            self._report = rows
+        return self._report
+
+    def export_csv(self, path):
+        names = sorted(self.columns, key=self.columns.get)
+        first = max(0, self.frames - self.capacity)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_ms" for name in names])
+            for i, row in enumerate(self.samples()):
+                writer.writerow([first + i] + ["" if np.isnan(v) else f"{v:.4f}" for v in row])
+        return path
@@ -0,0 +1,367 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import pygame
+from pgzero import ptext
+from pgzero.loaders import images
+
+
+# --- Camadas pre-renderizadas ---
+# Cada camada e uma Surface off-screen que so e recomposta quando
+# invalidada, em vez de redesenhar tile por tile a cada frame.
+
+
+class Layer:
+    def __init__(self, size, compose, transparent=False):
+        self.size = size
+        self.compose = compose
+        self.transparent = transparent
+        self.surface = None
+        self.dirty = True
+        self.rebuilds = 0
+
+    def invalidate(self):
+        self.dirty = True
+
+    def get(self):
+        if self.dirty or self.surface is None:
+            flags = pygame.SRCALPHA if self.transparent else 0
+            self.surface = pygame.Surface(self.size, flags)
+            self.compose(self.surface)
+            self.dirty = False
+            self.rebuilds += 1
+        return self.surface
+
+    def draw(self, screen, pos=(0, 0)):
+        screen.blit(self.get(), pos)
+
+
+def compose_floor(surface, cols, rows, tile_size, floor_image=None, walls=()):
+    width = cols * tile_size
+    height = rows * tile_size
+    surface.fill("dimgray")
+
+    # Textura do chao escalada uma unica vez para o tamanho do mapa (o
+    # AssetLoader ja entrega no tamanho da tela)
+    if floor_image is not None:
+        # O alpha vai numa superficie propria: floor_image e a do loader,
+        # compartilhada com quem mais pedir "floor"
+        if floor_image.get_size() != (width, height):
+            floor = pygame.transform.smoothscale(floor_image, (width, height))
+        else:
+            floor = floor_image.copy()
+        floor.set_alpha(140)
+        surface.blit(floor, (0, 0))
+
+    # Paredes (coordenadas locais ao chunk)
+    for x, y in walls:
+        surface.fill((15, 15, 20), pygame.Rect(x * tile_size, y * tile_size, tile_size, tile_size))
+
+    # Linhas brancas da grade
+    for y in range(rows + 1):
+        y_pos = y * tile_size
+        pygame.draw.line(surface, "white", (0, y_pos), (width, y_pos))
+    for x in range(cols + 1):
+        x_pos = x * tile_size
+        pygame.draw.line(surface, "white", (x_pos, 0), (x_pos, height))
+
+
+def compose_objects(surface, chests, healing_zones, tile_size, origin=(0, 0)):
+    ox, oy = origin
+    for chest in chests:
+        x = (chest["pos_x"] - ox) * tile_size
+        y = (chest["pos_y"] - oy) * tile_size
+        color = "gold" if not chest["opened"] else "lightyellow"
+        pygame.draw.rect(surface, color, pygame.Rect(x, y, tile_size, tile_size), 1)
+        ptext.draw("C", (x + 10, y + 6), fontsize=24, color="black", surf=surface)
+
+    for zone in healing_zones:
+        x = (zone["grid_x"] - ox) * tile_size
+        y = (zone["grid_y"] - oy) * tile_size
+        rect = pygame.Rect((x, y), (tile_size, tile_size))
+        pygame.draw.rect(surface, (255, 105, 180), rect, 1)
+        ptext.draw("+", center=(x + tile_size // 2, y + tile_size // 2), fontsize=32, color="pink", surf=surface)
+
+
+def compose_floor_chunk(surface, world, cx, cy, tile_size, floor_image=None):
+    x0, y0, cols, rows = world.chunk_bounds(cx, cy)
+    walls = ()
+    if world.has_walls:
+        walls = [(x, y) for y in range(rows) for x in range(cols) if not world.is_walkable(x0 + x, y0 + y)]
+    compose_floor(surface, cols, rows, tile_size, floor_image, walls)
+
+
+# --- Camadas por chunk ---
+# No mapa em chunks cada chunk visivel tem sua propria Layer; so os chunks
+# dentro da camera sao desenhados e um LRU limita quantos ficam em memoria.
+
+
+class ChunkLayers:
+    def __init__(self, world, tile_size, compose, transparent=False, max_chunks=8, needed=None):
+        self.world = world
+        self.tile_size = tile_size
+        self.compose = compose          # compose(surface, cx, cy)
+        self.transparent = transparent
+        self.max_chunks = max_chunks
+        self.needed = needed            # needed(cx, cy) -> bool; None = sempre
+        self.layers = OrderedDict()
+
+    def get(self, cx, cy):
+        layer = self.layers.get((cx, cy))
+        if layer is None:
+            _, _, cols, rows = self.world.chunk_bounds(cx, cy)
+            size = (cols * self.tile_size, rows * self.tile_size)
+            layer = Layer(size, lambda surf: self.compose(surf, cx, cy), self.transparent)
+            self.layers[(cx, cy)] = layer
+            if len(self.layers) > self.max_chunks:
+                self.layers.popitem(last=False)
+        else:
+            self.layers.move_to_end((cx, cy))
+        return layer
+
+    def invalidate_all(self):
+        self.layers.clear()
+
+    def invalidate_at(self, x, y):
+        layer = self.layers.get(self.world.chunk_of(x, y))
+        if layer is not None:
+            layer.invalidate()
+
+    def draw(self, screen, camera):
+        world = self.world
+        for cx, cy in world.chunks_in_rect(*camera.visible_rect()):
+            if self.needed is not None and not self.needed(cx, cy):
+                continue
+            x0, y0, _, _ = world.chunk_bounds(cx, cy)
+            self.get(cx, cy).draw(screen, camera.to_screen(x0, y0, self.tile_size))
+
+
+# --- Cache de textos renderizados ---
+# Rasterizar fontes e o custo dominante do HUD/inventario; as strings so
+# mudam em eventos, entao guardamos a Surface por (texto, tamanho, cor).
+
+DEFAULT_FONTSIZE = 24
+DEFAULT_COLOR = "white"
+
+
+class TextCache:
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text, fontsize=DEFAULT_FONTSIZE, color=DEFAULT_COLOR):
+        key = (text, fontsize, color)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = ptext.getsurf(text, fontsize=fontsize, color=color, cache=False)
+        self.entries[key] = surf
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def draw(self, screen, text, pos=None, center=None, fontsize=DEFAULT_FONTSIZE, color=DEFAULT_COLOR):
+        surf = self.get(text, fontsize, color)
+        if center is not None:
+            pos = surf.get_rect(center=center).topleft
+        screen.blit(surf, pos)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear(self):
+        self.entries.clear()
+
+
+# --- Atlas de sprites ---
+# Os quadros {prefixo}_{clip}_{n}.png de images/ sao recortados na area
+# visivel, empacotados numa unica Surface e resolvidos uma vez em listas por
+# clip. Desenhar um quadro e indexar uma lista; o deslocamento do recorte
+# mantem o sprite no mesmo lugar que a imagem inteira.
+
+SPRITE_PATTERN = re.compile(r"^(?P<prefix>[a-z]+)_(?P<clip>[a-z]+)_(?P<index>\d+)\.png$")
+
+
+class SpriteAtlas:
+    def __init__(self, clip_names, directory=None, padding=1):
+        # directory=None: a mesma pasta images/ que o pgzero usa
+        self.directory = directory
+        self.clip_names = tuple(clip_names)
+        self.padding = padding
+        self.surface = None
+        self.source_bytes = 0  # o que as imagens inteiras ocupariam em RGBA
+        self._clips = None     # prefixo -> tupla por clip de [(Surface, (dx, dy))]
+        self._frames = None
+        # load() numa thread e _build() no primeiro desenho: quem chega
+        # depois espera e os quadros sao decodificados uma vez so
+        self._lock = threading.Lock()
+
+    def load(self):
+        # Decodifica os quadros sem precisar da janela; pode rodar numa
+        # thread antes do primeiro desenho
+        with self._lock:
+            self._load_locked()
+        return self
+
+    def _load_locked(self):
+        if self._frames is None and self._clips is None:
+            self._frames, self.source_bytes = self._load_frames()
+
+    def _load_frames(self):
+        frames = []
+        source_bytes = 0
+        directory = self.directory or images._root()
+        for name in sorted(os.listdir(directory)):
+            match = SPRITE_PATTERN.match(name)
+            if not match or match["clip"] not in self.clip_names:
+                continue
+            image = pygame.image.load(os.path.join(directory, name))
+            # Mesmo resultado do convert_alpha do pgzero, sem exigir janela
+            sprite = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+            sprite.blit(image, (0, 0))
+            source_bytes += sprite.get_width() * sprite.get_height() * 4
+            bounds = sprite.get_bounding_rect()
+            frames.append((match["prefix"], match["clip"], int(match["index"]), sprite, bounds))
+        return frames, source_bytes
+
+    def _pack(self, frames):
+        # Prateleiras por altura decrescente numa largura ~ raiz da area
+        pad = self.padding
+        area = sum((b.width + pad) * (b.height + pad) for *_, b in frames)
+        width = max([b.width + pad for *_, b in frames] + [int(area ** 0.5 * 1.25)])
+        placements = {}
+        x = y = shelf = 0
+        for i in sorted(range(len(frames)), key=lambda i: frames[i][4].height, reverse=True):
+            bounds = frames[i][4]
+            if x + bounds.width > width:
+                x = 0
+                y += shelf + pad
+                shelf = 0
+            placements[i] = (x, y)
+            x += bounds.width + pad
+            shelf = max(shelf, bounds.height)
+        return width, y + shelf, placements
+
+    def _build(self):
+        with self._lock:
+            self._load_locked()
+            frames = self._frames
+            self._frames = None  # as Surfaces inteiras nao sao mais necessarias
+            self._clips = {}     # load() atrasado nao decodifica de novo
+        if not frames:
+            return
+        width, height, placements = self._pack(frames)
+        atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+        for i, (_, _, _, sprite, bounds) in enumerate(frames):
+            atlas.blit(sprite, placements[i], bounds)
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        self.surface = atlas
+
+        clips = {}
+        for i, (prefix, clip, index, _, bounds) in sorted(enumerate(frames), key=lambda f: f[1][2]):
+            region = pygame.Rect(placements[i], bounds.size)
+            clips.setdefault(prefix, {}).setdefault(clip, []).append((atlas.subsurface(region), bounds.topleft))
+        for prefix, by_name in clips.items():
+            fallback = by_name.get(self.clip_names[0]) or next(iter(by_name.values()))
+            self._clips[prefix] = tuple(by_name.get(name, fallback) for name in self.clip_names)
+
+    def clips(self, prefix):
+        if self._clips is None:
+            self._build()
+        return self._clips[prefix]
+
+    def frame(self, prefix, clip, frame):
+        frames = self.clips(prefix)[clip]
+        return frames[frame % len(frames)]
+
+    def memory_bytes(self):
+        if self._clips is None:
+            self._build()
+        if self.surface is None:
+            return 0
+        return self.surface.get_width() * self.surface.get_height() * 4
+
+
+# --- Resolucao logica ---
+# A cena e desenhada sempre numa Surface do tamanho logico e vai para a
+# janela com uma unica escala por quadro, escrita direto numa subsurface da
+# janela (sem Surface intermediaria). Escala inteira (pixels nitidos) quando
+# a janela comporta; senao smoothscale mantendo a proporcao. O que sobra da
+# janela fica preto e cliques ali sao ignorados.
+
+SCALE_MODES = ("integer", "smooth")
+
+
+class LogicalCanvas:
+    def __init__(self, size, window_size, mode=None):
+        width, height = size
+        window_width, window_height = window_size
+        factor = min(window_width // width, window_height // height)
+        if mode is None:
+            mode = "integer" if factor >= 1 else "smooth"
+        if mode not in SCALE_MODES:
+            raise ValueError(f"unknown scale mode {mode!r}; expected one of {', '.join(SCALE_MODES)}")
+        if mode == "integer":
+            if factor < 1:
+                raise ValueError(f"window {window_width}x{window_height} is smaller than {width}x{height}")
+            scaled = (width * factor, height * factor)
+        else:
+            ratio = min(window_width / width, window_height / height)
+            scaled = (round(width * ratio), round(height * ratio))
+        self.size = (width, height)
+        self.window_size = (window_width, window_height)
+        self.mode = mode
+        self.rect = pygame.Rect((0, 0), scaled)
+        self.rect.center = (window_width // 2, window_height // 2)
+        self.surface = None
+        self._window = None
+        self._target = None  # subsurface da janela onde a escala escreve
+
+    def target(self, window):
+        # Surface logica no formato da janela (escala sem conversao)
+        if self.surface is None:
+            self.surface = pygame.Surface(self.size, 0, window)
+        return self.surface
+
+    def present(self, window):
+        if window is not self._window:
+            # Janela nova: bordas pretas uma vez, a escala so cobre o centro
+            window.fill((0, 0, 0))
+            self._target = window.subsurface(self.rect)
+            self._window = window
+        if self.rect.size == self.size:
+            self._target.blit(self.surface, (0, 0))  # janela maior, mas escala 1
+        elif self.mode == "integer":
+            pygame.transform.scale(self.surface, self.rect.size, self._target)
+        else:
+            pygame.transform.smoothscale(self.surface, self.rect.size, self._target)
+
+    def to_logical(self, pos):
+        # Posicao na janela -> posicao logica; None fora da imagem
+        x, y = pos
+        if not self.rect.collidepoint(x, y):
+            return None
+        return ((x - self.rect.x) * self.size[0] // self.rect.width,
+                (y - self.rect.y) * self.size[1] // self.rect.height)
@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import json
+import time
+
+from engine import GameState
+
+# Gravacao e replay de partidas. Toda a aleatoriedade sai de GameState.rng /
+# np_rng, entao o seed + os parametros do GameState + as entradas (com o tick
+# em que chegaram) reproduzem a partida inteira, sem janela nem audio.
+#
+# Uma entrada chega entre dois update(): tick = updates ja rodados. No
+# replay, as entradas do tick t sao aplicadas e depois roda o update t.
+
+FORMAT_VERSION = 5
+
+
+def encode_action(action):
+    # "UP" ou ("click", (x, y)) -> forma JSON
+    if isinstance(action, tuple):
+        kind, (x, y) = action
+        return [kind, x, y]
+    return action
+
+
+def decode_action(action):
+    if isinstance(action, list):
+        kind, x, y = action
+        return (kind, (x, y))
+    return action
+
+
+def state_digest(game):
+    # Resumo do estado de regra (sem frames de animacao nem ids internos
+    # dos inimigos) para detectar divergencia entre gravacao e replay/save
+    hero = game.hero
+    enemies = game.enemies
+    n = enemies.count
+    parts = (
+        game.tick, game.current_state, game.current_level, game.selected_difficulty, game.money,
+        hero.grid_x, hero.grid_y, hero.hp, hero.strength, hero.defense, hero.speed,
+        [item.template_id for item in hero.inventory],
+        sorted((slot, item.template_id) for slot, item in hero.equipment.items()),
+        enemies.grid_x[:n].tolist(), enemies.grid_y[:n].tolist(), enemies.hp[:n].tolist(),
+        [(chest["pos_x"], chest["pos_y"], chest["opened"]) for chest in game.legendary_chests],
+        game.rng.getstate(),
+    )
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+class Recorder:
+    def __init__(self, game, options=None):
+        # options: argumentos extras do GameState (map_size, wall_density...)
+        if game.seed is None:
+            raise ValueError("recording needs a GameState created from a seed")
+        if game.tick:
+            raise ValueError("recording must start before the first update")
+        self.game = game
+        self.options = dict(options or {})
+        self.inputs = []
+
+    def record(self, action):
+        self.inputs.append((self.game.tick, encode_action(action)))
+
+    def to_dict(self):
+        options = dict(self.options)
+        if "map_size" in options and options["map_size"] is not None:
+            options["map_size"] = list(options["map_size"])
+        return {
+            "version": FORMAT_VERSION,
+            "seed": self.game.seed,
+            "options": options,
+            "ticks": self.game.tick,
+            "inputs": [[tick, action] for tick, action in self.inputs],
+            "digest": state_digest(self.game),
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+
+def load(path):
+    with open(path) as f:
+        recording = json.load(f)
+    if recording.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported recording version: {recording.get('version')}")
+    return recording
+
+
+def new_game(recording):
+    options = dict(recording["options"])
+    if options.get("map_size") is not None:
+        options["map_size"] = tuple(options["map_size"])
+    return GameState(seed=recording["seed"], **options)
+
+
+def replay(recording, on_tick=None):
+    # Refaz a partida; on_tick(tick, actions, seconds) recebe o custo de
+    # cada tick (entradas + update) para achar picos
+    game = new_game(recording)
+    inputs = [(tick, decode_action(action)) for tick, action in recording["inputs"]]
+    ticks = recording["ticks"]
+    clock = time.perf_counter
+    i = 0
+    for tick in range(ticks + 1):
+        start = clock() if on_tick else 0.0
+        actions = []
+        while i < len(inputs) and inputs[i][0] == tick:
+            actions.append(inputs[i][1])
+            game.handle_input(inputs[i][1])
+            i += 1
+        # As entradas depois do ultimo update nao tem update proprio
+        if tick < ticks:
+            game.update()
+        if on_tick:
+            on_tick(tick, actions, clock() - start)
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay sem janela de uma partida gravada")
+    parser.add_argument("recording", help="arquivo gravado com DUNGEON_RECORD=arquivo.json")
+    parser.add_argument("--slowest", type=int, default=5, help="mostra os N ticks mais lentos")
+    args = parser.parse_args()
+
+    recording = load(args.recording)
+    timings = []
+    start = time.perf_counter()
+    game = replay(recording, on_tick=lambda tick, actions, seconds: timings.append((seconds, tick, actions)))
+    elapsed = time.perf_counter() - start
+
+    ticks = recording["ticks"]
+    print(f"{ticks} ticks, {len(recording['inputs'])} entradas em {elapsed:.3f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    print(f"estado final: {game.current_state}, nivel {game.current_level}, HP {game.hero.hp}, {game.money} moedas")
+    digest = state_digest(game)
+    if digest == recording["digest"]:
+        print("replay identico a partida gravada")
+    else:
+        print(f"DIVERGENCIA: gravado {recording['digest']} / replay {digest}")
+    for seconds, tick, actions in sorted(timings, key=lambda t: t[0], reverse=True)[:args.slowest]:
+        print(f"tick {tick:>7}: {seconds * 1000:.3f} ms {actions}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+import argparse
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from enemies import COLUMNS
+from engine import GameState
+from items import generate_items, template
+from pathfinding import FlowField
+from spatial import build_index
+
+# Saves binarios versionados, um arquivo por slot:
+#
+#   cabecalho  "DGSV", versao, flags, capacidade do bloco, tamanho usado,
+#              quantidade de itens do inventario
+#   bloco      secoes TAG + tamanho + dados (META em JSON pequeno, estado do
+#              RNG, inimigos como colunas empacotadas, baus), com folga
+#   inventario um uint16 por item (template_id), ate o fim do arquivo
+#
+# O inventario fica por ultimo e o bloco tem folga, entao salvar de novo
+# quando o heroi so ganhou itens reescreve o bloco no lugar e anexa os ids
+# novos. Ler um slot (para listar ou carregar) so le o cabecalho e o bloco;
+# os itens sao lidos quando o save e aplicado.
+
+MAGIC = b"DGSV"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHHIII")
+SECTION = struct.Struct("<4sI")
+CHEST = struct.Struct("<iiBH")
+ITEM_DTYPE = np.dtype("<u2")
+MIN_HEAD_CAPACITY = 4096
+SAVE_SLOTS = 3
+
+# Colunas do EnemyStore que vao para o save (frame/moving/ids sao de sessao)
+ENEMY_COLUMNS = ("grid_x", "grid_y", "hp", "strength", "defense", "speed", "direction",
+                 "boss", "can_summon", "summon_cooldown", "next_action")
+
+
+def slot_path(slot, directory="saves"):
+    return os.path.join(directory, f"slot{slot}.sav")
+
+
+# --- Escrita ---
+
+
+def _section(tag, payload):
+    return SECTION.pack(tag, len(payload)) + payload
+
+
+def _store_index(store, enemy):
+    if enemy is None or not enemy.alive:
+        return None
+    return store.slots[enemy.id]
+
+
+def build_head(game):
+    hero = game.hero
+    inventory = hero.inventory
+    world = game.world
+    store = game.enemies
+    version, mt, gauss = game.rng.getstate()
+    meta = {
+        "seed": game.seed,
+        "tick": game.tick,
+        "state": game.current_state,
+        "level": game.current_level,
+        "difficulty": game.selected_difficulty,
+        "money": game.money,
+        "hero": {"x": hero.grid_x, "y": hero.grid_y, "hp": hero.hp, "exp": hero.exp},
+        "equipment": {slot: item.template_id for slot, item in hero.equipment.items()},
+        "equipped": {slot: inventory.equipped_position(slot) for slot in hero.equipment
+                     if inventory.equipped_position(slot) is not None},
+        "boss": _store_index(store, game.boss_enemy),
+        "combat": _store_index(store, game.combat_enemy),
+        "enemy_time": store.time,
+        "turns": game.turns.items(),
+        "world": {"width": world.width, "height": world.height,
+                  "wall_density": world.wall_density, "seed": world.seed},
+        "gauss": gauss,
+        "np_rng": game.np_rng.bit_generator.state,
+        "inventory": len(inventory),
+        "saved_at": time.time(),
+    }
+
+    columns = store.export_columns(ENEMY_COLUMNS)
+    enemies = struct.pack("<I", store.count) + b"".join(
+        columns[name].astype(np.dtype(COLUMNS[name]).newbyteorder("<"), copy=False).tobytes()
+        for name in ENEMY_COLUMNS)
+
+    chests = []
+    for chest in game.legendary_chests:
+        ids = np.array([item.template_id for item in chest["items"]], dtype=ITEM_DTYPE)
+        chests.append(CHEST.pack(chest["pos_x"], chest["pos_y"], chest["opened"], len(ids)) + ids.tobytes())
+
+    return b"".join((
+        _section(b"META", json.dumps(meta, separators=(",", ":")).encode()),
+        _section(b"RNG ", np.array(mt, dtype="<u4").tobytes()),
+        _section(b"ENMY", enemies),
+        _section(b"CHST", struct.pack("<H", len(chests)) + b"".join(chests)),
+    ))
+
+
+def _head_capacity(size):
+    # Folga para o bloco crescer (mais inimigos, baus) sem mover o inventario
+    capacity = MIN_HEAD_CAPACITY
+    while capacity < 2 * size:
+        capacity *= 2
+    return capacity
+
+
+class SaveSlot:
+    def __init__(self, path):
+        self.path = path
+        # (inventario, itens gravados, id da ultima entrada, capacidade do
+        # bloco) da ultima escrita, para saber se da para so anexar
+        self._written = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        return SaveFile(self.path)
+
+    def _appendable(self, inventory, head):
+        if self._written is None:
+            return False
+        written, count, last_entry, capacity = self._written
+        if written is not inventory or len(inventory) < count or len(head) > capacity:
+            return False
+        # Ids de entrada so crescem: se a entrada na posicao count - 1 ainda e
+        # a mesma, nada antes dela foi vendido e o prefixo gravado vale
+        if count and inventory.entry_id(count - 1) != last_entry:
+            return False
+        try:
+            return os.path.getsize(self.path) == HEADER.size + capacity + count * ITEM_DTYPE.itemsize
+        except OSError:
+            return False
+
+    def save(self, game):
+        # Devolve "append" ou "full" conforme o tipo de escrita feita
+        inventory = game.hero.inventory
+        head = build_head(game)
+        count = len(inventory)
+        if self._appendable(inventory, head):
+            _, written, _, capacity = self._written
+            new_ids = np.array([item.template_id for _, item, _ in inventory.window(written, count - written)],
+                               dtype=ITEM_DTYPE)
+            with open(self.path, "r+b") as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, capacity, len(head), count))
+                f.write(head)
+                f.seek(HEADER.size + capacity + written * ITEM_DTYPE.itemsize)
+                f.write(new_ids.tobytes())
+            mode = "append"
+        else:
+            capacity = _head_capacity(len(head))
+            ids = np.fromiter((item.template_id for item in inventory), dtype=ITEM_DTYPE, count=count)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Escrita completa vai para um temporario e troca no fim
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, capacity, len(head), count))
+                f.write(head)
+                f.write(bytes(capacity - len(head)))
+                f.write(ids.tobytes())
+            os.replace(tmp, self.path)
+            mode = "full"
+        self._written = (inventory, count, inventory.entry_id(count - 1) if count else None, capacity)
+        return mode
+
+    def load(self, game):
+        save = self.read()
+        restore(game, save)
+        inventory = game.hero.inventory
+        count = len(inventory)
+        self._written = (inventory, count, inventory.entry_id(count - 1) if count else None, save.capacity)
+        return save
+
+
+# --- Leitura ---
+
+
+class SaveFile:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path}: truncated save")
+            magic, version, _, self.capacity, head_len, self.inventory_count = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a save file")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported save version {version}")
+            head = f.read(head_len)
+        self.version = version
+        self.sections = {}
+        offset = 0
+        while offset < len(head):
+            tag, size = SECTION.unpack_from(head, offset)
+            offset += SECTION.size
+            self.sections[tag] = head[offset:offset + size]
+            offset += size
+        self.meta = json.loads(self.sections[b"META"])
+
+    def rng_state(self):
+        mt = np.frombuffer(self.sections[b"RNG "], dtype="<u4")
+        return (3, tuple(mt.tolist()), self.meta["gauss"])
+
+    def inventory_ids(self):
+        return np.fromfile(self.path, dtype=ITEM_DTYPE, count=self.inventory_count,
+                           offset=HEADER.size + self.capacity)
+
+    def inventory_items(self):
+        return items_from_ids(self.inventory_ids())
+
+    def enemy_columns(self):
+        data = self.sections[b"ENMY"]
+        (count,) = struct.unpack_from("<I", data)
+        offset = 4
+        columns = {}
+        for name in ENEMY_COLUMNS:
+            dtype = np.dtype(COLUMNS[name]).newbyteorder("<")
+            columns[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += count * dtype.itemsize
+        return columns
+
+    def chests(self):
+        data = self.sections[b"CHST"]
+        (count,) = struct.unpack_from("<H", data)
+        offset = 2
+        chests = []
+        for _ in range(count):
+            pos_x, pos_y, opened, n = CHEST.unpack_from(data, offset)
+            offset += CHEST.size
+            ids = np.frombuffer(data, dtype=ITEM_DTYPE, count=n, offset=offset)
+            offset += n * ITEM_DTYPE.itemsize
+            chests.append({"pos_x": pos_x, "pos_y": pos_y, "items": items_from_ids(ids), "opened": bool(opened)})
+        return chests
+
+
+def items_from_ids(ids):
+    # Um template(id) por id distinto; o resto e indexacao
+    if len(ids) == 0:
+        return []
+    unique = np.unique(ids).tolist()
+    table = np.empty(unique[-1] + 1, dtype=object)
+    for template_id in unique:
+        table[template_id] = template(template_id)
+    return table[ids].tolist()
+
+
+def restore(game, save):
+    meta = save.meta
+    world = game.world
+    saved_world = meta["world"]
+    if (saved_world["width"], saved_world["height"]) != (world.width, world.height):
+        raise ValueError("save is for a different map size")
+    # Mesmo mapa: os chunks sao refeitos do seed salvo sob demanda
+    world.wall_density = saved_world["wall_density"]
+    world.seed = saved_world["seed"]
+    world.chunks.clear()
+
+    game.seed = meta["seed"]
+    game.tick = meta["tick"]
+    game.rng.setstate(save.rng_state())
+    game.np_rng.bit_generator.state = meta["np_rng"]
+    game.current_state = meta["state"]
+    game.current_level = meta["level"]
+    game.select_difficulty(meta["difficulty"])
+    game.money = meta["money"]
+
+    hero = game.hero
+    hero.grid_x = meta["hero"]["x"]
+    hero.grid_y = meta["hero"]["y"]
+    hero.hp = meta["hero"]["hp"]
+    hero.exp = meta["hero"]["exp"]
+    hero.inventory.clear()
+    hero.inventory.extend(save.inventory_items())
+    hero.stats.clear()
+    for template_id in meta["equipment"].values():
+        hero.stats.equip(template(template_id))
+    for position in meta["equipped"].values():
+        hero.inventory.mark_equipped(position)
+    hero.apply_stats()
+
+    store = game.enemies
+    store.import_columns(save.enemy_columns(), meta["enemy_time"])
+    game.boss_enemy = store[meta["boss"]] if meta["boss"] is not None else None
+    game.combat_enemy = store[meta["combat"]] if meta["combat"] is not None else None
+    game.turns.clear()
+    for when, actor in meta["turns"]:
+        game.turns.schedule(actor, when)
+
+    game.legendary_chests = save.chests()
+    game.chest_index = build_index(game.legendary_chests, "pos_x", "pos_y")
+    if game.flow_field is not None:
+        game.flow_field = FlowField(world, game.flow_field.radius)
+
+    game.clear_combat_log()
+    game.inventory_visible = False
+    game.item_selected = None
+    game.start_visible = 0
+    game.emit("game_loaded", level=game.current_level)
+
+
+def list_slots(directory="saves", count=SAVE_SLOTS):
+    # (slot, meta ou None); so le cabecalho e bloco de cada arquivo
+    slots = []
+    for slot in range(1, count + 1):
+        path = slot_path(slot, directory)
+        try:
+            slots.append((slot, SaveFile(path).meta))
+        except (OSError, ValueError):
+            slots.append((slot, None))
+    return slots
+
+
+# --- Benchmark contra JSON ---
+
+
+def _json_payload(game):
+    # Formato ingenuo: itens como os dicts antigos, inimigos como dicts
+    hero = game.hero
+    columns = game.enemies.export_columns(ENEMY_COLUMNS)
+
+    def item_dict(item):
+        return {"name": item.name, "type": item.type, "rarity": item.rarity, "color": item.color,
+                "level": item.level, "bonus": dict(item.bonus)}
+
+    return {
+        "level": game.current_level,
+        "money": game.money,
+        "hero": {"x": hero.grid_x, "y": hero.grid_y, "hp": hero.hp},
+        "inventory": [item_dict(item) for item in hero.inventory],
+        "equipment": {slot: item_dict(item) for slot, item in hero.equipment.items()},
+        "enemies": [dict(zip(ENEMY_COLUMNS, row)) for row in zip(*(columns[name].tolist() for name in ENEMY_COLUMNS))],
+        "chests": [{"pos_x": c["pos_x"], "pos_y": c["pos_y"], "opened": c["opened"],
+                    "items": [item_dict(item) for item in c["items"]]} for c in game.legendary_chests],
+    }
+
+
+def _timed(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench(items, enemies=1000, directory="saves/bench", seed=1):
+    # Do lado JSON so conta o parse, sem remontar objetos: favorece o JSON
+    game = GameState(seed=seed)
+    game.new_game()
+    rng = np.random.default_rng(seed)
+    game.hero.inventory.extend(generate_items(items, rng))
+    if items:
+        game.hero.equip_from_inventory(0)
+    for i in range(enemies):
+        game.enemies.spawn(i % game.world.width, i % game.world.height, 40, 7, 2, 1)
+
+    os.makedirs(directory, exist_ok=True)
+    path = slot_path(items, directory)
+    json_path = os.path.join(directory, f"slot{items}.json")
+    slot = SaveSlot(path)
+
+    def full_save():
+        slot._written = None
+        return slot.save(game)
+
+    save_time, _ = _timed(full_save)
+    size = os.path.getsize(path)
+    game.hero.inventory.extend(generate_items(10, rng))
+    start = time.perf_counter()
+    mode = slot.save(game)
+    append_time = time.perf_counter() - start
+    head_time, _ = _timed(lambda: SaveFile(path).meta)
+    target = GameState(seed=seed)
+    load_time, _ = _timed(lambda: SaveSlot(path).load(target))
+    assert [i.template_id for i in target.hero.inventory] == [i.template_id for i in game.hero.inventory]
+
+    payload = _json_payload(game)
+
+    def json_save():
+        with open(json_path, "w") as f:
+            json.dump(payload, f)
+
+    def json_load():
+        with open(json_path) as f:
+            return json.load(f)
+
+    json_save_time, _ = _timed(json_save)
+    json_load_time, _ = _timed(json_load)
+    return {
+        "items": items,
+        "enemies": enemies,
+        "binary": {"bytes": size, "save_s": save_time, "append_10_s": append_time, "append_mode": mode,
+                   "read_meta_s": head_time, "load_s": load_time},
+        "json": {"bytes": os.path.getsize(json_path), "save_s": json_save_time, "parse_s": json_load_time},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Saves binarios: info de um slot ou benchmark contra JSON")
+    parser.add_argument("path", nargs="?", help="arquivo .sav para inspecionar")
+    parser.add_argument("--bench", type=int, nargs="*", help="tamanhos de inventario (ex.: 10 1000 1000000)")
+    parser.add_argument("--enemies", type=int, default=1000)
+    parser.add_argument("--dir", default="saves/bench")
+    parser.add_argument("--json", help="grava os resultados do benchmark neste arquivo")
+    args = parser.parse_args()
+
+    if args.path:
+        save = SaveFile(args.path)
+        meta = save.meta
+        print(f"{args.path}: versao {save.version}, nivel {meta['level']}, {meta['difficulty']}, "
+              f"HP {meta['hero']['hp']}, {meta['money']} moedas, {save.inventory_count} itens, "
+              f"{struct.unpack_from('<I', save.sections[b'ENMY'])[0]} inimigos")
+
+    if args.bench is not None:
+        results = [bench(n, args.enemies, args.dir) for n in (args.bench or [10, 1000, 100_000, 1_000_000])]
+        print(f"{'itens':>9} {'bin KB':>9} {'json KB':>9} {'salvar':>9} {'json':>9} {'anexar':>9} "
+              f"{'meta':>9} {'carregar':>9} {'json':>9}")
+        for r in results:
+            b, j = r["binary"], r["json"]
+            print(f"{r['items']:>9} {b['bytes'] / 1024:>9.1f} {j['bytes'] / 1024:>9.1f} "
+                  f"{b['save_s'] * 1000:>7.2f}ms {j['save_s'] * 1000:>7.2f}ms {b['append_10_s'] * 1000:>7.2f}ms "
+                  f"{b['read_meta_s'] * 1000:>7.2f}ms {b['load_s'] * 1000:>7.2f}ms {j['parse_s'] * 1000:>7.2f}ms")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
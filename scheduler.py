@@ -0,0 +1,108 @@
+import heapq
+
+import numpy as np
+
+# Agendas por tempo: cada ator tem o horario da proxima acao, derivado da
+# velocidade.
+#
+# ActorScheduler e um heap (O(log n) por acao) com ordem exata: empates saem
+# na ordem em que foram agendados. Remover ou reagendar nao mexe no heap: a
+# entrada antiga vira lapide e e descartada quando chega ao topo.
+#
+# TimingWheel e para milhares de atores num relogio de ticks inteiros: cada
+# tick tem um balde com os ids que agem nele, e agendar/colher e O(1) por
+# ator. Remover nao mexe nos baldes; quem colhe filtra os ids que ja nao
+# existem.
+
+COMPACT_MIN_STALE = 64
+
+
+def action_interval(base_ticks, speed, reference_speed=1):
+    # Ticks entre acoes: base_ticks na velocidade de referencia, menos quanto
+    # mais rapido
+    return base_ticks * reference_speed / max(speed, 1)
+
+
+class ActorScheduler:
+    def __init__(self):
+        self._heap = []     # (tempo, seq, ator)
+        self._entries = {}  # ator -> (tempo, seq) vigente
+        self._seq = 0
+
+    def schedule(self, actor, time):
+        seq = self._seq
+        self._seq += 1
+        if actor in self._entries:
+            self._compact_if_stale(1)
+        self._entries[actor] = (time, seq)
+        heapq.heappush(self._heap, (time, seq, actor))
+
+    def remove(self, actor):
+        if self._entries.pop(actor, None) is not None:
+            self._compact_if_stale(0)
+
+    def clear(self):
+        self._heap = []
+        self._entries = {}
+
+    def _compact_if_stale(self, extra):
+        stale = len(self._heap) + extra - len(self._entries)
+        if stale > COMPACT_MIN_STALE and stale > len(self._entries):
+            self._heap = [(time, seq, actor) for actor, (time, seq) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _prune(self):
+        heap = self._heap
+        entries = self._entries
+        while heap:
+            time, seq, actor = heap[0]
+            if entries.get(actor) == (time, seq):
+                return
+            heapq.heappop(heap)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, actor):
+        return actor in self._entries
+
+    def peek(self):
+        # (tempo, ator) do proximo a agir, ou None
+        self._prune()
+        if not self._heap:
+            return None
+        time, _, actor = self._heap[0]
+        return time, actor
+
+    def pop(self):
+        self._prune()
+        time, _, actor = heapq.heappop(self._heap)
+        del self._entries[actor]
+        return time, actor
+
+    def items(self):
+        # (tempo, ator) na ordem em que agiriam (para salvar)
+        return [(time, actor) for actor, (time, _) in sorted(self._entries.items(), key=lambda item: item[1])]
+
+
+class TimingWheel:
+    def __init__(self):
+        self.buckets = {}  # tick -> [ids]
+
+    def schedule(self, ids, times, now):
+        # Cada id age no primeiro tick inteiro >= seu tempo (e depois de now)
+        ticks = np.maximum(np.ceil(times), now + 1).astype(np.int64).tolist()
+        buckets = self.buckets
+        for actor, tick in zip(ids, ticks):
+            bucket = buckets.get(tick)
+            if bucket is None:
+                buckets[tick] = [actor]
+            else:
+                bucket.append(actor)
+
+    def pop(self, tick):
+        # Ids agendados para o tick (inclusive os ja removidos)
+        return self.buckets.pop(tick, ())
+
+    def clear(self):
+        self.buckets.clear()
@@ -0,0 +1,470 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from operator import attrgetter
+
+import numpy as np
+
+from engine import MENU_BUTTONS, GameState
+from profiler import FrameProfiler
+from replay import decode_action, encode_action
+
+# Servidor autoritativo: um processo, um loop asyncio, varias partidas. Cada
+# conexao TCP ganha uma sessao com o proprio GameState (as mesmas regras do
+# jogo local) e todas avancam juntas num unico laco de ticks.
+#
+# Protocolo: uma mensagem JSON por linha.
+#   servidor -> cliente: {"type": "hello", "seed", "options"...} e depois um
+#     tick por linha so com o que mudou desde o ultimo envio: hud, heroi,
+#     inventario, baus, log do combate, inimigos (so os que mudaram e os
+#     removidos), os eventos do tick e "ack" (ultima entrada aplicada)
+#   cliente -> servidor: {"seq": n, "input": "UP" | ["click", x, y]}
+# O cliente monta o mapa pelo seed (GameState(seed) gera o mesmo mundo), entao
+# o mapa nunca passa pela rede.
+#
+# Cliente lento: enquanto o buffer de saida dele estiver cheio os ticks nao
+# sao enviados; a base do delta e o ultimo estado enviado, entao o proximo
+# envio ja traz tudo o que mudou no meio.
+
+PROTOCOL_VERSION = 2
+DEFAULT_PORT = 8765
+TICK_RATE = 60
+REPORT_EVERY = 5.0           # segundos entre relatorios de latencia
+MAX_PENDING_INPUTS = 32      # entradas na fila de uma sessao (o resto cai)
+MAX_BUFFERED = 64 * 1024     # acima disso o tick da sessao nao e enviado
+MAX_BUFFERED_HARD = 1 << 20  # acima disso a sessao e encerrada
+
+HUD_FIELDS = ("current_state", "current_level", "selected_difficulty", "money", "sound_enabled",
+              "inventory_visible", "item_selected", "start_visible")
+HERO_FIELDS = ("grid_x", "grid_y", "hp", "exp", "strength", "defense", "speed")
+# Colunas do EnemyStore que o cliente desenha; linha = [id, *ENEMY_FIELDS]
+ENEMY_FIELDS = ("grid_x", "grid_y", "direction", "hp", "boss")
+NO_ROWS = np.zeros((0, len(ENEMY_FIELDS)), dtype=np.int64)
+NO_IDS = np.zeros(0, dtype=np.int64)
+_MISSING = object()
+
+
+def _plain(value):
+    # Escalares NumPy (atributos de itens gerados em lote) viram int/float
+    return value.item()
+
+
+_encoder = json.JSONEncoder(separators=(",", ":"), default=_plain)
+
+
+def encode_line(message):
+    return _encoder.encode(message).encode() + b"\n"
+
+
+def encode_events(game, events):
+    # (evento, dados) -> [evento, dados] em JSON; o bau aberto vai pelo indice
+    encoded = []
+    for event, data in events:
+        if event == "chest_opened":
+            chest = data["chest"]
+            data = {"chest": next(i for i, c in enumerate(game.legendary_chests) if c is chest)}
+        encoded.append([event, data])
+    return encoded
+
+
+class _Fields:
+    # Ultimos valores enviados de um grupo de atributos; uma tupla comparada
+    # por tick, o dict so e montado quando algo mudou
+    def __init__(self, names):
+        self.names = names
+        self.get = attrgetter(*names)
+        self.sent = (_MISSING,) * len(names)
+
+    def changed(self, source):
+        values = self.get(source)
+        if values == self.sent:
+            return None
+        changed = {name: value for name, value, old in zip(self.names, values, self.sent) if value != old}
+        self.sent = values
+        return changed
+
+
+class DeltaEncoder:
+    # Guarda o ultimo estado enviado de uma partida e devolve so as diferencas
+    def __init__(self, game):
+        self.game = game
+        self.hud = _Fields(HUD_FIELDS)
+        self.hero = _Fields(HERO_FIELDS)
+        self.inventory_version = None
+        self.equipment = None
+        self.chests = None
+        self.combat_log = None
+        self.combat = _MISSING
+        self.enemy_version = None
+        self.enemy_ids = NO_IDS
+        self.enemy_rows = NO_ROWS
+
+    def encode(self):
+        game = self.game
+        hero = game.hero
+        delta = {}
+        hud = self.hud.changed(game)
+        if hud:
+            delta["hud"] = hud
+        hero_fields = self.hero.changed(hero)
+        if hero_fields:
+            delta["hero"] = hero_fields
+
+        inventory = hero.inventory
+        # Equipamento por template, como no META do save: um item equipado
+        # pode ter sido vendido e nao ter mais posicao no inventario
+        equipment = {slot: item.template_id for slot, item in hero.equipment.items()}
+        if inventory.version != self.inventory_version or equipment != self.equipment:
+            self.equipment = equipment
+            delta["inventory"] = self._encode_inventory(inventory, equipment)
+
+        chests = [(chest["pos_x"], chest["pos_y"], chest["opened"]) for chest in game.legendary_chests]
+        if chests != self.chests:
+            self.chests = chests
+            delta["chests"] = chests
+
+        combat_log = list(game.combat_log)
+        if combat_log != self.combat_log:
+            self.combat_log = delta["log"] = combat_log
+
+        enemies = self._encode_enemies()
+        if enemies:
+            delta["enemies"] = enemies
+
+        combat = game.combat_enemy.id if game.combat_enemy is not None and game.combat_enemy.alive else None
+        if combat != self.combat:
+            self.combat = delta["combat"] = combat
+        return delta
+
+    def _encode_inventory(self, inventory, equipment):
+        # Appends ("+", template) e pops ("-", posicao) desde a ultima versao
+        # enviada; a lista inteira so na primeira vez ou quando o diario do
+        # inventario nao cobre mais (clear, load, muitas operacoes)
+        ops = inventory.changes_since(self.inventory_version)
+        self.inventory_version = inventory.version
+        equipped = [inventory.equipped_position(slot) for slot in equipment]
+        message = {"equipment": equipment, "equipped": [position for position in equipped if position is not None]}
+        if ops is None:
+            message["items"] = [item.template_id for item in inventory]
+        else:
+            message["ops"] = [[op, value.template_id if op == "+" else value] for op, value in ops]
+        return message
+
+    def _encode_enemies(self):
+        store = self.game.enemies
+        if store.version == self.enemy_version:
+            return None
+        self.enemy_version = store.version
+        n = store.count
+        ids = store.ids[:n]
+        order = np.argsort(ids)
+        ids = ids[order]
+        rows = np.column_stack([getattr(store, name)[:n][order] for name in ENEMY_FIELDS]).astype(np.int64) \
+            if n else NO_ROWS
+        old_ids = self.enemy_ids
+        old_rows = self.enemy_rows
+        if np.array_equal(ids, old_ids) and np.array_equal(rows, old_rows):
+            return None
+        self.enemy_ids = ids
+        self.enemy_rows = rows
+
+        _, old_index, new_index = np.intersect1d(old_ids, ids, assume_unique=True, return_indices=True)
+        changed = np.ones(len(ids), dtype=bool)  # novos ou diferentes
+        changed[new_index] = (old_rows[old_index] != rows[new_index]).any(axis=1)
+        kept = np.zeros(len(old_ids), dtype=bool)
+        kept[old_index] = True
+        delta = {}
+        if changed.any():
+            delta["set"] = np.column_stack([ids[changed], rows[changed]]).tolist()
+        if not kept.all():
+            delta["removed"] = old_ids[~kept].tolist()
+        return delta
+
+
+# --- Sessoes ---
+
+
+class Session:
+    def __init__(self, session_id, game, writer, options):
+        self.id = session_id
+        self.game = game
+        self.writer = writer
+        self.options = options
+        self.encoder = DeltaEncoder(game)
+        self.inputs = []      # (seq, acao) ainda nao aplicadas
+        self.events = []      # eventos de ticks ainda nao enviados
+        self.ack = 0
+        self.sent_ack = 0
+        self.bytes_sent = 0
+        self.closing = False
+
+    def hello(self):
+        return {"type": "hello", "version": PROTOCOL_VERSION, "session": self.id,
+                "seed": self.game.seed, "options": self.options}
+
+    def receive(self, message):
+        seq = int(message["seq"])
+        action = decode_action(message["input"])
+        # Erro aqui derruba so esta conexao; dentro do tick pararia todas
+        if isinstance(action, tuple):
+            kind, (x, y) = action
+            action = (str(kind), (int(x), int(y)))
+        elif not isinstance(action, str):
+            raise ValueError(f"invalid input {message['input']!r}")
+        if len(self.inputs) < MAX_PENDING_INPUTS:
+            self.inputs.append((seq, action))
+
+    def step(self):
+        inputs = self.inputs
+        self.inputs = []
+        events = self.game.step([action for _, action in inputs])
+        if inputs:
+            self.ack = inputs[-1][0]
+        if events:
+            self.events.extend(events)
+            if any(event == "quit" for event, _ in events):
+                self.closing = True
+
+    def flush(self):
+        # Envia o delta do tick (ou nada, se nada mudou); devolve os bytes
+        buffered = self.writer.transport.get_write_buffer_size()
+        if buffered > MAX_BUFFERED_HARD:
+            raise ConnectionError(f"session {self.id}: client is not reading")
+        if buffered > MAX_BUFFERED:
+            return 0
+        message = self.encoder.encode()
+        if self.events:
+            message["events"] = encode_events(self.game, self.events)
+            self.events = []
+        if self.ack != self.sent_ack:
+            message["ack"] = self.sent_ack = self.ack
+        if not message:
+            return 0
+        message["tick"] = self.game.tick
+        data = encode_line(message)
+        self.writer.write(data)
+        self.bytes_sent += len(data)
+        return len(data)
+
+
+class DungeonServer:
+    def __init__(self, host="localhost", port=DEFAULT_PORT, tick_rate=TICK_RATE, seed=None, game_options=None,
+                 report_every=REPORT_EVERY):
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.seed = seed
+        self.game_options = dict(game_options or {})
+        self.report_every = report_every
+        self.sessions = {}
+        self.next_session = 1
+        self.ticks = 0
+        self.session_ticks = 0  # soma de sessoes ativas em cada tick
+        self.overruns = 0       # ticks que passaram do intervalo
+        self.bytes_sent = 0
+        # "tick" = todas as sessoes; "frame" = intervalo real entre ticks
+        self.profiler = FrameProfiler(capacity=int(tick_rate * (report_every or REPORT_EVERY)) + 1, enabled=True)
+        self._server = None
+        self._handlers = set()
+
+    def new_game(self, session_id):
+        seed = self.seed + session_id if self.seed is not None else random.randrange(2 ** 63)
+        return GameState(seed=seed, **self.game_options)
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        session_id = self.next_session
+        self.next_session += 1
+        session = Session(session_id, self.new_game(session_id), writer, self.game_options)
+        writer.write(encode_line(session.hello()))
+        self.sessions[session_id] = session
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while not session.closing:
+                line = await reader.readline()
+                if not line:
+                    break
+                session.receive(json.loads(line))
+        except (ValueError, KeyError, TypeError, ConnectionError) as error:
+            print(f"Sessao {session_id} encerrada: {error}")
+        finally:
+            self.close_session(session)
+            self._handlers.discard(handler)
+
+    def close_session(self, session):
+        if self.sessions.pop(session.id, None) is not None:
+            session.writer.close()
+
+    async def run(self, duration=None):
+        # Laco unico: aplica entradas, roda um update e envia o delta de cada
+        # sessao; relatorio de latencia a cada report_every segundos
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        start = loop.time()
+        next_tick = start
+        next_report = start + self.report_every
+        profiler = self.profiler
+        while duration is None or loop.time() - start < duration:
+            self.session_ticks += len(self.sessions)
+            with profiler.phase("tick"):
+                for session in list(self.sessions.values()):
+                    with profiler.phase("step"):
+                        session.step()
+                    with profiler.phase("send"):
+                        try:
+                            self.bytes_sent += session.flush()
+                        except ConnectionError as error:
+                            print(error)
+                            self.close_session(session)
+                            continue
+                    if session.closing:
+                        self.close_session(session)
+            profiler.end_frame()
+            self.ticks += 1
+
+            now = loop.time()
+            if self.report_every and now >= next_report:
+                print(self.report())
+                next_report = now + self.report_every
+            next_tick += interval
+            if next_tick < now:
+                # Atrasado: nao tenta recuperar os ticks perdidos de uma vez
+                self.overruns += 1
+                next_tick = now
+            await asyncio.sleep(next_tick - now)
+
+    def latency(self):
+        return self.profiler.stats()
+
+    def report(self):
+        stats = self.latency()
+        lines = [f"{len(self.sessions)} sessoes, {self.ticks} ticks, {self.overruns} atrasados, "
+                 f"{self.bytes_sent / 1024:.0f} KiB enviados"]
+        for name in ("tick", "step", "send", "frame"):
+            s = stats.get(name)
+            if s:
+                lines.append(f"  {name:<6} p50 {s['p50']:6.2f}  p95 {s['p95']:6.2f}  p99 {s['p99']:6.2f}  "
+                             f"max {s['max']:6.2f} ms")
+        return "\n".join(lines)
+
+    async def close(self):
+        for session in list(self.sessions.values()):
+            self.close_session(session)
+        # Com o socket fechado cada handler le EOF e termina
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+# --- Clientes de carga ---
+
+
+async def bot_client(host, port, duration, rng, latencies, interval=0.1):
+    # Cliente sem tela: sai do menu, anda ao acaso (espaco no combate) e
+    # mede entrada -> primeiro tick com ack dela
+    reader, writer = await asyncio.open_connection(host, port)
+    hello = json.loads(await reader.readline())
+    if hello.get("version") != PROTOCOL_VERSION:
+        raise ValueError(f"protocol version {hello.get('version')} != {PROTOCOL_VERSION}")
+    sent = {}
+    seq = 0
+
+    def send(action):
+        nonlocal seq
+        seq += 1
+        sent[seq] = time.perf_counter()
+        writer.write(encode_line({"seq": seq, "input": encode_action(action)}))
+
+    async def read():
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            ack = json.loads(line).get("ack")
+            if ack is not None:
+                now = time.perf_counter()
+                for done in [s for s in sent if s <= ack]:
+                    latencies.append(now - sent.pop(done))
+
+    reading = asyncio.ensure_future(read())
+    x, y, w, h = MENU_BUTTONS["start"]
+    send(("click", (x + w // 2, y + h // 2)))
+    send("RETURN")  # dificuldade padrao
+    loop = asyncio.get_running_loop()
+    end = loop.time() + duration
+    while loop.time() < end and not reading.done():
+        send(rng.choice(("UP", "DOWN", "LEFT", "RIGHT", "SPACE")))
+        await asyncio.sleep(interval * (0.5 + rng.random()))
+    writer.close()
+    reading.cancel()
+
+
+async def run_bots(host, port, count, duration, seed=0):
+    latencies = []
+    rng = random.Random(seed)
+    bots = [bot_client(host, port, duration, random.Random(rng.getrandbits(64)), latencies) for _ in range(count)]
+    results = await asyncio.gather(*bots, return_exceptions=True)
+    failed = [result for result in results if isinstance(result, Exception)]
+    return np.array(latencies) * 1000, failed
+
+
+async def serve(options):
+    server = DungeonServer(options.host, options.port, options.tick_rate, options.seed,
+                           options.game_options, options.report)
+    await server.start()
+    print(f"Servidor em {options.host}:{server.port} ({options.tick_rate} ticks/s)")
+    if not options.bots:
+        try:
+            await server.run()
+        finally:
+            await server.close()
+        return
+    # Carga: servidor e clientes no mesmo loop (disputam a mesma CPU)
+    ticking = asyncio.ensure_future(server.run())
+    latencies, failed = await run_bots(options.host, server.port, options.bots, options.seconds, options.seed or 0)
+    ticking.cancel()
+    print(server.report())
+    await server.close()
+    if failed:
+        print(f"{len(failed)} clientes falharam: {failed[0]!r}")
+    if latencies.size:
+        p50, p95, p99 = np.percentile(latencies, (50, 95, 99))
+        print(f"entrada -> estado ({latencies.size} entradas): p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  "
+              f"max {latencies.max():.1f} ms")
+    print(f"{server.bytes_sent / max(server.session_ticks, 1):.1f} bytes por tick por sessao")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de partidas (varias sessoes num processo)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 escolhe uma porta livre")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="ticks por segundo")
+    parser.add_argument("--seed", type=int, default=None, help="seed da sessao 1 (as seguintes somam 1)")
+    parser.add_argument("--map-size", help="mapa grande, ex.: 2000x2000")
+    parser.add_argument("--report", type=float, default=REPORT_EVERY, help="segundos entre relatorios (0 desliga)")
+    parser.add_argument("--bots", type=int, default=0, help="clientes de carga no mesmo processo")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duracao da carga")
+    options = parser.parse_args()
+    options.game_options = {}
+    if options.map_size:
+        try:
+            width, height = (int(v) for v in options.map_size.lower().split("x"))
+        except ValueError:
+            parser.error(f"--map-size invalido: {options.map_size}")
+        options.game_options = {"map_size": (width, height), "wall_density": 0.08}
+    try:
+        asyncio.run(serve(options))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
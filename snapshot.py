@@ -0,0 +1,87 @@
+from engine import GameState
+from spatial import build_index
+
+# Snapshot em memoria do estado de regra de um GameState, para bots de busca
+# e previas "e se". Diferente do deepcopy, quase nada e copiado:
+#   - itens sao flyweights e o inventario e copy-on-write (Inventory.snapshot)
+#   - baus: guarda os dicts e as flags "opened"; o restore monta dicts novos
+#     que compartilham as listas de itens
+#   - inimigos: so as colunas vivas do EnemyStore (arrays pequenos)
+# O mapa, as zonas de cura e os observadores nao entram: restaurar vale para
+# a mesma partida ou para uma copia criada com branch_game().
+#
+# O flow field e derivado da posicao do heroi e se recalcula sozinho; em
+# mapas grandes a janela dele pode estar em outro lugar depois do restore.
+
+
+class Snapshot:
+    __slots__ = ("scalars", "rng", "np_rng", "hero", "equipment", "inventory", "enemies", "boss", "combat",
+                 "chests", "opened", "turns", "combat_log")
+
+
+def _store_index(store, enemy):
+    if enemy is None or not enemy.alive:
+        return None
+    return store.slots[enemy.id]
+
+
+def capture(game):
+    hero = game.hero
+    store = game.enemies
+    snap = Snapshot()
+    snap.scalars = (game.tick, game.current_state, game.current_level, game.selected_difficulty, game.money,
+                    game.inventory_visible, game.item_selected, game.start_visible)
+    snap.rng = game.rng.getstate()
+    snap.np_rng = game.np_rng.bit_generator.state
+    snap.hero = (hero.grid_x, hero.grid_y, hero.hp, hero.exp)
+    snap.equipment = tuple(hero.equipment.values())
+    snap.inventory = hero.inventory.snapshot()
+    snap.enemies = store.snapshot()
+    snap.boss = _store_index(store, game.boss_enemy)
+    snap.combat = _store_index(store, game.combat_enemy)
+    snap.chests = tuple(game.legendary_chests)
+    snap.opened = tuple(chest["opened"] for chest in game.legendary_chests)
+    snap.turns = tuple(game.turns.items())
+    snap.combat_log = tuple(game.combat_log)
+    return snap
+
+
+def restore(game, snap):
+    (game.tick, game.current_state, game.current_level, difficulty, game.money,
+     game.inventory_visible, game.item_selected, game.start_visible) = snap.scalars
+    if difficulty != game.selected_difficulty:
+        game.select_difficulty(difficulty)
+    game.rng.setstate(snap.rng)
+    game.np_rng.bit_generator.state = snap.np_rng
+
+    hero = game.hero
+    hero.grid_x, hero.grid_y, hero.hp, hero.exp = snap.hero
+    stats = hero.stats
+    if tuple(stats.equipment.values()) != snap.equipment:
+        stats.clear()
+        for item in snap.equipment:
+            stats.equip(item)
+        hero.apply_stats()
+    hero.inventory.restore(snap.inventory)
+
+    store = game.enemies
+    store.restore(snap.enemies)
+    game.boss_enemy = store[snap.boss] if snap.boss is not None else None
+    game.combat_enemy = store[snap.combat] if snap.combat is not None else None
+
+    # Dicts novos (abrir um bau nao pode vazar para o snapshot nem para a
+    # partida de onde ele veio); os itens continuam compartilhados
+    game.legendary_chests = [dict(chest, opened=opened) for chest, opened in zip(snap.chests, snap.opened)]
+    game.chest_index = build_index(game.legendary_chests, "pos_x", "pos_y")
+
+    game.turns.clear()
+    for when, actor in snap.turns:
+        game.turns.schedule(actor, when)
+    game.combat_log.clear()
+    game.combat_log.extend(snap.combat_log)
+
+
+def branch_game(game):
+    # GameState sem observadores sobre o mesmo mapa, para simular a partir
+    # de snapshots de `game` sem tocar nela (som, render, gravacao)
+    return GameState(game.selected_difficulty, seed=0, world=game.world, pursuit=game.flow_field is not None)
@@ -0,0 +1,55 @@
+# Indice de ocupacao por tile: (x, y) -> entidades naquele tile.
+# Substitui as varreduras lineares de inimigos/baus/zonas de cura por uma
+# busca O(1) no tile do heroi. Personagens atualizam o indice em move().
+
+EMPTY = ()
+
+
+class OccupancyGrid:
+    def __init__(self, key=id):
+        # Cada celula e um dict chave(entidade) -> entidade: remocao O(1)
+        # mesmo com muitas entidades no mesmo tile, mantendo a ordem de
+        # insercao. A chave padrao e id() porque baus/zonas sao dicts.
+        self.key = key
+        self.cells = {}
+        self.count = 0
+
+    def add(self, entity, x, y):
+        cell = self.cells.get((x, y))
+        if cell is None:
+            cell = self.cells[(x, y)] = {}
+        cell[self.key(entity)] = entity
+        self.count += 1
+
+    def remove(self, entity, x, y):
+        cell = self.cells.get((x, y))
+        if not cell or cell.pop(self.key(entity), None) is None:
+            return False
+        if not cell:
+            del self.cells[(x, y)]
+        self.count -= 1
+        return True
+
+    def move(self, entity, old_x, old_y, new_x, new_y):
+        if self.remove(entity, old_x, old_y):
+            self.add(entity, new_x, new_y)
+
+    def at(self, x, y):
+        cell = self.cells.get((x, y))
+        return cell.values() if cell else EMPTY
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+
+def build_index(objects, x_key, y_key):
+    # Indice estatico para objetos em dict (baus usam pos_x/pos_y, zonas
+    # de cura grid_x/grid_y)
+    index = OccupancyGrid()
+    for obj in objects:
+        index.add(obj, obj[x_key], obj[y_key])
+    return index
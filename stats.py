@@ -0,0 +1,74 @@
+from items import STATS
+
+# Caminho unico de atributos do heroi: os totais sao mantidos por delta a
+# cada equip/unequip, e o preview "com este item equipado" fica em cache
+# ate o equipamento mudar.
+
+BASE_STATS = {"strength": 10, "defense": 5, "speed": 5}
+
+
+class StatEngine:
+    def __init__(self, base=None):
+        base = base or BASE_STATS
+        self.base = tuple(base[stat] for stat in STATS)
+        self.equipment = {}  # slot (tipo do item) -> item
+        self.totals = list(self.base)
+        self.version = 0
+        self._previews = {}
+        self.preview_hits = 0
+        self.preview_misses = 0
+
+    def _changed(self):
+        self.version += 1
+        self._previews.clear()
+
+    def _apply(self, stats, sign):
+        totals = self.totals
+        for i, value in enumerate(stats):
+            totals[i] += sign * value
+
+    def equip(self, item):
+        old = self.equipment.get(item.type)
+        if old is item:
+            return
+        if old is not None:
+            self._apply(old.stats, -1)
+        self._apply(item.stats, 1)
+        self.equipment[item.type] = item
+        self._changed()
+
+    def unequip(self, slot):
+        old = self.equipment.pop(slot, None)
+        if old is not None:
+            self._apply(old.stats, -1)
+            self._changed()
+
+    def clear(self):
+        self.equipment.clear()
+        self.totals = list(self.base)
+        self._changed()
+
+    def recompute(self):
+        # Soma completa, para conferir os totais incrementais
+        totals = list(self.base)
+        for item in self.equipment.values():
+            for i, value in enumerate(item.stats):
+                totals[i] += value
+        self.totals = totals
+        return tuple(totals)
+
+    def with_item(self, item):
+        # Atributos se o item substituir o que estiver no mesmo slot
+        old = self.equipment.get(item.type)
+        old_stats = old.stats if old is not None else (0,) * len(STATS)
+        return tuple(t - o + n for t, o, n in zip(self.totals, old_stats, item.stats))
+
+    def preview(self, item):
+        # Diferenca (forca, defesa, velocidade) em relacao aos totais atuais
+        diff = self._previews.get(item)
+        if diff is None:
+            self.preview_misses += 1
+            diff = self._previews[item] = tuple(n - t for n, t in zip(self.with_item(item), self.totals))
+        else:
+            self.preview_hits += 1
+        return diff
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os modulos do jogo ficam soltos na raiz, ao lado do main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
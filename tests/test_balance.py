@@ -0,0 +1,32 @@
+from balance import play_run, summarize
+from engine import GameState, calculate_sale_price
+from events import SALE
+from items import RARITIES, SALE_PRICES, TEMPLATE_TABLE
+
+
+def test_sale_price_uses_item_rarity():
+    prices = [calculate_sale_price(TEMPLATE_TABLE[("Ring", rarity, 3)]) for rarity, _ in RARITIES]
+    assert prices == [SALE_PRICES[rarity] * 3 for rarity, _ in RARITIES]
+    assert prices == sorted(set(prices))
+
+
+def test_sales_pay_the_table_price():
+    game = GameState(seed=2)
+    game.new_game()
+    sales = []
+    game.add_observer(lambda event, data: sales.append(data) if event == SALE else None)
+    item = TEMPLATE_TABLE[("Sword", "Excellent", 4)]
+    game.hero.inventory.append(item)
+    game.item_selected = len(game.hero.inventory) - 1
+    money = game.money
+    game.sell_selected()
+    assert sales[-1]["price"] == SALE_PRICES["Excellent"] * 4
+    assert game.money == money + sales[-1]["price"]
+
+
+def test_runner_gold_comes_from_sales():
+    records = [play_run("Normal", seed, max_ticks=3000) for seed in range(3)]
+    assert any(r["sales"] for r in records)
+    summary = summarize(records)
+    assert summary["gold_per_sale"] >= min(SALE_PRICES.values())
+    assert summary["gold_mean"] == sum(r["gold"] for r in records) / len(records)
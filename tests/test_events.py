@@ -0,0 +1,32 @@
+import pytest
+
+from balance import scripted_policy
+from engine import GameState
+from events import DAMAGE, EVENT_FIELDS, KILL, LEVEL
+
+
+def test_game_events_carry_declared_fields():
+    game = GameState("Normal", seed=4)
+    seen = []
+    game.add_observer(lambda event, data: seen.append((event, data)))
+    game.new_game()
+    for _ in range(600):
+        game.step(scripted_policy(game))
+    kinds = {event for event, _ in seen}
+    assert {DAMAGE, KILL, LEVEL} <= kinds
+    for event, data in seen:
+        if event in EVENT_FIELDS:
+            assert tuple(data) == EVENT_FIELDS[event]
+
+
+@pytest.mark.skipif(not __debug__, reason="emit so confere os campos sob __debug__")
+def test_emit_rejects_wrong_fields():
+    game = GameState(seed=1)
+    with pytest.raises(ValueError, match="needs fields"):
+        game.emit(KILL, target="enemy")
+    with pytest.raises(ValueError, match="needs fields"):
+        game.emit(LEVEL, level=2, extra=1)
+    with pytest.raises(ValueError, match="JSON scalar"):
+        game.emit(LEVEL, level=[2])
+    # Eventos fora da tabela passam como antes
+    game.emit("game_loaded", level=2)
@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from inventory import COMPACT_MIN_DEAD, Inventory
+from items import TEMPLATES, TYPES
+
+# O Inventory contra uma lista comum: cada entrada do modelo e (id, item) e
+# os equipados sao tipo -> id, como no inventario de verdade.
+
+
+class ListModel:
+    def __init__(self):
+        self.entries = []
+        self.equipped = {}
+        self.next_id = 0
+
+    def append(self, item):
+        self.entries.append((self.next_id, item))
+        self.next_id += 1
+
+    def pop(self, position):
+        entry, item = self.entries.pop(position)
+        if self.equipped.get(item.type) == entry:
+            del self.equipped[item.type]
+        return item
+
+    def mark(self, position):
+        entry, item = self.entries[position]
+        self.equipped[item.type] = entry
+
+    def equipped_position(self, item_type):
+        entry = self.equipped.get(item_type)
+        for position, (other, _) in enumerate(self.entries):
+            if other == entry:
+                return position
+        return None
+
+    def window(self, start, count):
+        return [(position, item, self.equipped.get(item.type) == entry)
+                for position, (entry, item) in enumerate(self.entries[max(0, start):start + count], max(0, start))]
+
+
+def check(inventory, model, rng):
+    items = [item for _, item in model.entries]
+    assert len(inventory) == len(items)
+    assert bool(inventory) == bool(items)
+    assert list(inventory) == items
+    for position in rng.sample(range(len(items)), min(len(items), 20)):
+        assert inventory[position] is items[position]
+        assert inventory[position - len(items)] is items[position]
+        assert inventory.entry_id(position) == model.entries[position][0]
+    for item_type in TYPES:
+        assert inventory.equipped_position(item_type) == model.equipped_position(item_type)
+    start = rng.randrange(-3, len(items) + 3)
+    assert inventory.window(start, 12) == model.window(start, 12)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_list_model(seed):
+    rng = random.Random(seed)
+    inventory = Inventory(rng.choices(TEMPLATES, k=rng.randrange(50)))
+    model = ListModel()
+    for item in inventory:
+        model.append(item)
+    for _ in range(3000):
+        roll = rng.random()
+        if roll < 0.45 or not model.entries:
+            item = rng.choice(TEMPLATES)
+            inventory.append(item)
+            model.append(item)
+        elif roll < 0.9:
+            position = rng.randrange(-len(model.entries), len(model.entries))
+            assert inventory.pop(position) is model.pop(position)
+        else:
+            position = rng.randrange(len(model.entries))
+            inventory.mark_equipped(position)
+            model.mark(position)
+            assert inventory.is_equipped(position)
+        check(inventory, model, rng)
+
+
+def test_pops_trigger_compaction():
+    rng = random.Random(7)
+    count = COMPACT_MIN_DEAD * 8
+    inventory = Inventory()
+    model = ListModel()
+    for item in rng.choices(TEMPLATES, k=count):
+        inventory.append(item)
+        model.append(item)
+    inventory.mark_equipped(count - 1)
+    model.mark(count - 1)
+
+    compactions = 0
+    while len(model.entries) > 1:
+        slots = len(inventory._items)
+        position = rng.randrange(len(model.entries) - 1)  # o equipado fica
+        assert inventory.pop(position) is model.pop(position)
+        if len(inventory._items) < slots - 1:
+            compactions += 1
+            # Depois de compactar nao sobra lapide
+            assert len(inventory._items) == len(inventory)
+        check(inventory, model, rng)
+    assert compactions > 0
+    assert inventory.equipped_position(model.entries[0][1].type) == 0
+
+
+def test_pop_default_and_errors():
+    inventory = Inventory(TEMPLATES[:3])
+    assert inventory.pop() is TEMPLATES[2]
+    assert list(inventory) == list(TEMPLATES[:2])
+    with pytest.raises(IndexError):
+        inventory[2]
+    with pytest.raises(IndexError):
+        inventory.pop(-3)
+    inventory.clear()
+    assert not inventory
+    with pytest.raises(IndexError):
+        inventory.pop()
+
+
+def test_popping_equipped_entry_unequips_only_that_entry():
+    # Flyweights: o mesmo item duas vezes, so a entrada marcada e equipada
+    item = TEMPLATES[0]
+    inventory = Inventory([item, item, item])
+    inventory.mark_equipped(1)
+    assert [inventory.is_equipped(i) for i in range(3)] == [False, True, False]
+    inventory.pop(0)
+    assert inventory.equipped_position(item.type) == 0
+    inventory.pop(0)
+    assert inventory.equipped_position(item.type) is None
+    assert not inventory.is_equipped(0)
@@ -0,0 +1,108 @@
+import random
+
+import numpy as np
+import pytest
+
+from items import LEVELS, RARITIES, TEMPLATE_COUNT, TEMPLATES, TYPES
+from loot import (
+    DIFFICULTY_SKEW, ITEM_LEVEL_WEIGHTS, LOOT, RARITY_WEIGHTS, TYPE_WEIGHTS, AliasTable, LootTable,
+)
+
+DIFFICULTIES = (1.0, 1.5, 3.0, 9.0)
+LAST_LEVEL = max(RARITY_WEIGHTS)
+
+
+def normalized(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    return weights / weights.sum()
+
+
+@pytest.mark.parametrize("level", sorted(RARITY_WEIGHTS))
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_odds_match_normalized_weights(level, difficulty):
+    odds = LOOT.odds(level, difficulty)
+    skew = difficulty ** (np.arange(len(RARITIES)) * DIFFICULTY_SKEW)
+    rarity = normalized(np.asarray(RARITY_WEIGHTS[level]) * skew)
+    assert list(odds["rarity"]) == [name for name, _ in RARITIES]
+    np.testing.assert_allclose(list(odds["rarity"].values()), rarity)
+    np.testing.assert_allclose(list(odds["level"].values()), normalized(ITEM_LEVEL_WEIGHTS[level]))
+    np.testing.assert_allclose(list(odds["type"].values()), normalized(TYPE_WEIGHTS))
+    assert odds["mean_level"] == pytest.approx(np.dot(LEVELS, normalized(ITEM_LEVEL_WEIGHTS[level])))
+
+    # A distribuicao por template e o produto das marginais
+    distribution = LOOT.distribution(level, difficulty)
+    assert distribution.sum() == pytest.approx(1.0)
+    for item, p in zip(TEMPLATES, distribution):
+        expected = (odds["type"][item.type] * odds["rarity"][item.rarity] * odds["level"][item.level])
+        assert p == pytest.approx(expected)
+
+
+def test_difficulty_favours_rare_items():
+    easy = LOOT.odds(2, 1.0)
+    legendary = LOOT.odds(2, 9.0)
+    assert legendary["rarity"]["Legendary"] > easy["rarity"]["Legendary"]
+    assert legendary["rarity"]["Normal"] < easy["rarity"]["Normal"]
+    assert legendary["mean_multiplier"] > easy["mean_multiplier"]
+
+
+@pytest.mark.parametrize("level, difficulty", [(1, 1.0), (2, 3.0), (3, 9.0)])
+def test_vectorized_rolls_follow_distribution(level, difficulty):
+    n = 400_000
+    ids = LOOT.roll_ids(n, level, difficulty, np.random.default_rng(level))
+    observed = np.bincount(ids, minlength=TEMPLATE_COUNT) / n
+    expected = LOOT.distribution(level, difficulty)
+    # 5 desvios padrao de uma binomial por template
+    tolerance = 5 * np.sqrt(expected * (1 - expected) / n)
+    assert (np.abs(observed - expected) <= tolerance).all()
+
+
+def test_single_rolls_follow_distribution():
+    rng = random.Random(5)
+    n = 60_000
+    counts = np.zeros(TEMPLATE_COUNT)
+    for _ in range(n):
+        counts[LOOT.roll(1, 1.5, rng).template_id] += 1
+    expected = LOOT.distribution(1, 1.5)
+    tolerance = 5 * np.sqrt(expected * (1 - expected) / n)
+    assert (np.abs(counts / n - expected) <= tolerance).all()
+
+
+def test_levels_clamp_past_the_table():
+    for level in (LAST_LEVEL + 1, LAST_LEVEL + 10, 100):
+        np.testing.assert_array_equal(LOOT.distribution(level, 3.0), LOOT.distribution(LAST_LEVEL, 3.0))
+        assert LOOT.odds(level) == LOOT.odds(LAST_LEVEL)
+    for level in (0, -4):
+        np.testing.assert_array_equal(LOOT.distribution(level), LOOT.distribution(1))
+
+
+def test_chests_hold_legendary_variants():
+    chests = LOOT.roll_chests(50, LAST_LEVEL + 2, 1.0, np.random.default_rng(2))
+    assert len(chests) == 50
+    sizes = [len(chest) for chest in chests]
+    assert min(sizes) >= 1 and max(sizes) <= len(LOOT.quantity)
+    for chest in chests:
+        for item in chest:
+            assert item.rarity == "Legendary" and item.level >= LAST_LEVEL + 2
+            assert item.type in TYPES
+    # O mesmo seed repete os baus; random.Random tambem serve
+    assert LOOT.roll_chests(50, LAST_LEVEL + 2, 1.0, np.random.default_rng(2)) == chests
+    assert len(LOOT.roll_chests(5, 1, 1.0, random.Random(2))) == 5
+
+
+def test_alias_table():
+    weights = [0, 3, 1, 0, 6]
+    table = AliasTable(weights)
+    np.testing.assert_allclose(table.probabilities, normalized(weights))
+    samples = table.sample(np.random.default_rng(0), 200_000)
+    assert set(np.unique(samples).tolist()) == {1, 2, 4}
+    np.testing.assert_allclose(np.bincount(samples, minlength=5) / samples.size, normalized(weights), atol=0.005)
+    for bad in ([], [0, 0], [1, -1], [[1, 2]]):
+        with pytest.raises(ValueError):
+            AliasTable(bad)
+
+
+def test_table_validates_weights():
+    with pytest.raises(ValueError):
+        LootTable(rarity_weights={1: (1, 2, 3)})
+    with pytest.raises(ValueError):
+        LootTable(type_weights=(1, 1))
@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pytest
+
+from engine import GameState
+from items import TYPES, generate_items
+from replay import state_digest
+from savegame import FORMAT_VERSION, HEADER, ITEM_DTYPE, SaveFile, SaveSlot, list_slots, slot_path
+
+
+def new_game(items=200, seed=3):
+    game = GameState(seed=seed)
+    game.new_game()
+    game.hero.inventory.extend(generate_items(items, np.random.default_rng(seed)))
+    game.hero.equip_from_inventory(5)
+    return game
+
+
+def loaded(path, seed=3):
+    target = GameState(seed=seed)
+    SaveSlot(path).load(target)
+    return target
+
+
+def template_ids(game):
+    return [item.template_id for item in game.hero.inventory]
+
+
+def test_round_trip_keeps_state(tmp_path):
+    game = new_game()
+    path = slot_path(1, tmp_path)
+    assert SaveSlot(path).save(game) == "full"
+    target = loaded(path)
+    assert state_digest(target) == state_digest(game)
+    for item_type in TYPES:
+        assert target.hero.inventory.equipped_position(item_type) == game.hero.inventory.equipped_position(item_type)
+
+
+def test_gained_items_append(tmp_path):
+    game = new_game()
+    path = slot_path(1, tmp_path)
+    slot = SaveSlot(path)
+    assert slot.save(game) == "full"
+    size = os.path.getsize(path)
+
+    game.hero.inventory.extend(generate_items(25, np.random.default_rng(9)))
+    game.money += 40
+    assert slot.save(game) == "append"
+    # So os ids novos no fim; o bloco foi reescrito no lugar
+    assert os.path.getsize(path) == size + 25 * ITEM_DTYPE.itemsize
+    target = loaded(path)
+    assert template_ids(target) == template_ids(game)
+    assert state_digest(target) == state_digest(game)
+
+
+def test_save_after_sale_rewrites(tmp_path):
+    game = new_game()
+    path = slot_path(1, tmp_path)
+    slot = SaveSlot(path)
+    slot.save(game)
+
+    game.hero.inventory.pop(10)
+    game.hero.inventory.append(game.hero.inventory[0])  # mesmo tamanho, prefixo diferente
+    assert slot.save(game) == "full"
+    assert template_ids(loaded(path)) == template_ids(game)
+
+    # Vender o ultimo tambem invalida o prefixo gravado
+    game.hero.inventory.pop()
+    assert slot.save(game) == "full"
+    assert template_ids(loaded(path)) == template_ids(game)
+
+
+def test_loaded_slot_appends(tmp_path):
+    game = new_game()
+    path = slot_path(1, tmp_path)
+    SaveSlot(path).save(game)
+    target = GameState(seed=3)
+    slot = SaveSlot(path)
+    slot.load(target)
+    target.hero.inventory.append(target.hero.inventory[0])
+    assert slot.save(target) == "append"
+    assert template_ids(loaded(path)) == template_ids(target)
+
+
+def test_listing_does_not_read_inventory(tmp_path, monkeypatch):
+    game = new_game(items=5000)
+    path = slot_path(2, tmp_path)
+    SaveSlot(path).save(game)
+    save = SaveFile(path)
+    # Sem o inventario no disco a listagem continua igual
+    with open(path, "r+b") as f:
+        f.truncate(HEADER.size + save.capacity)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("listing read the inventory")
+    monkeypatch.setattr(SaveFile, "inventory_ids", fail)
+    monkeypatch.setattr(np, "fromfile", fail)
+
+    slots = dict(list_slots(tmp_path))
+    assert slots[1] is None and slots[3] is None
+    assert slots[2]["inventory"] == 5000
+    assert slots[2]["level"] == game.current_level
+
+
+def test_rejects_other_versions(tmp_path):
+    game = new_game()
+    path = slot_path(1, tmp_path)
+    SaveSlot(path).save(game)
+    with open(path, "r+b") as f:
+        header = HEADER.unpack(f.read(HEADER.size))
+        f.seek(0)
+        f.write(HEADER.pack(header[0], FORMAT_VERSION + 1, *header[2:]))
+    with pytest.raises(ValueError, match="version"):
+        SaveFile(path)
+    with pytest.raises(ValueError):
+        SaveSlot(path).load(GameState(seed=3))
+    assert dict(list_slots(tmp_path))[1] is None
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "slot1.sav"
+    path.write_bytes(b"not a save")
+    with pytest.raises(ValueError, match="truncated"):
+        SaveFile(path)
+    path.write_bytes(HEADER.pack(b"JUNK", FORMAT_VERSION, 0, 0, 0, 0))
+    with pytest.raises(ValueError, match="not a save"):
+        SaveFile(path)
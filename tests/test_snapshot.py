@@ -0,0 +1,86 @@
+import pytest
+
+from balance import scripted_policy
+from engine import STATE_GAME, GameState
+from items import TEMPLATES
+from replay import state_digest
+from snapshot import branch_game, capture, restore
+
+
+def played(seed, ticks=12):
+    # Partida no comeco: inimigos andando, baus fechados, itens no
+    # inventario e algo equipado
+    game = GameState("Normal", seed=seed)
+    game.new_game()
+    for _ in range(ticks):
+        game.step(scripted_policy(game))
+    game.hero.inventory.extend(TEMPLATES[:20])
+    game.hero.equip_from_inventory(len(game.hero.inventory) - 3)
+    game.current_state = STATE_GAME
+    return game
+
+
+def mess_up(game):
+    # Tudo o que um ramo de busca pode mexer
+    hero = game.hero
+    chest = next(chest for chest in game.legendary_chests if not chest["opened"])
+    hero.grid_x, hero.grid_y = chest["pos_x"], chest["pos_y"]
+    game.check_legendary_chest_interaction()
+    hero.inventory.pop(0)
+    hero.inventory.pop()
+    hero.equip_from_inventory(0)
+    hero.hp -= 7
+    game.money += 100
+    if game.enemies:
+        game.enemies.hp[0] -= 5
+    game.rng.random()
+    game.np_rng.random()
+    game.combat_log.append("ramo")
+    for _ in range(30):
+        game.step(scripted_policy(game))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_restore_capture_keeps_digest(seed):
+    game = played(seed)
+    before = state_digest(game)
+    restore(game, capture(game))
+    assert state_digest(game) == before
+    # E continua igual a uma partida que nunca passou pelo snapshot
+    twin = played(seed)
+    for _ in range(40):
+        game.step(scripted_policy(game))
+        twin.step(scripted_policy(twin))
+    assert state_digest(game) == state_digest(twin)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_branch_changes_never_reach_snapshot(seed):
+    game = played(seed)
+    before = state_digest(game)
+    snap = capture(game)
+    opened = snap.opened
+    chest_items = [list(chest["items"]) for chest in snap.chests]
+
+    sim = branch_game(game)
+    for _ in range(3):
+        restore(sim, snap)
+        assert state_digest(sim) == before
+        mess_up(sim)
+        assert state_digest(sim) != before
+
+    # Nem a partida real nem o snapshot viram o que o ramo fez
+    assert state_digest(game) == before
+    assert snap.opened == opened
+    assert [list(chest["items"]) for chest in snap.chests] == chest_items
+    restore(game, snap)
+    assert state_digest(game) == before
+
+
+def test_changes_in_the_game_do_not_reach_snapshot():
+    game = played(1)
+    snap = capture(game)
+    before = state_digest(game)
+    mess_up(game)
+    restore(game, snap)
+    assert state_digest(game) == before
@@ -0,0 +1,144 @@
+import random
+
+import numpy as np
+
+# Mapa em chunks de tamanho fixo, criados sob demanda: a memoria cresce com
+# os chunks tocados, nao com o tamanho do mapa. O mapa classico (uma tela)
+# e so um ChunkedMap pequeno, sem paredes.
+
+CHUNK_SIZE = 32
+FLOOR = 0
+WALL = 1
+
+
+class ChunkedMap:
+    def __init__(self, width, height, chunk_size=CHUNK_SIZE, wall_density=0.0, seed=0, keep_clear=()):
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.wall_density = wall_density
+        self.seed = seed
+        # Tiles que nunca viram parede (inicio do heroi, zonas de cura...)
+        self.keep_clear = set(keep_clear)
+        self.chunks = {}
+
+    @property
+    def has_walls(self):
+        return self.wall_density > 0
+
+    @property
+    def chunks_x(self):
+        return (self.width + self.chunk_size - 1) // self.chunk_size
+
+    @property
+    def chunks_y(self):
+        return (self.height + self.chunk_size - 1) // self.chunk_size
+
+    def chunk_of(self, x, y):
+        return x // self.chunk_size, y // self.chunk_size
+
+    def chunk(self, cx, cy):
+        tiles = self.chunks.get((cx, cy))
+        if tiles is None:
+            tiles = self.chunks[(cx, cy)] = self._generate(cx, cy)
+        return tiles
+
+    def _generate(self, cx, cy):
+        size = self.chunk_size
+        if not self.has_walls:
+            return bytearray(size * size)
+        # Paredes esparsas deterministicas por (seed, chunk)
+        rng = random.Random(f"{self.seed}:{cx}:{cy}")
+        density = self.wall_density
+        tiles = bytearray(WALL if rng.random() < density else FLOOR for _ in range(size * size))
+        x0 = cx * size
+        y0 = cy * size
+        for x, y in self.keep_clear:
+            if x0 <= x < x0 + size and y0 <= y < y0 + size:
+                tiles[(y - y0) * size + (x - x0)] = FLOOR
+        return tiles
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def tile(self, x, y):
+        size = self.chunk_size
+        return self.chunk(x // size, y // size)[(y % size) * size + x % size]
+
+    def is_walkable(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        if not self.has_walls:
+            return True
+        return self.tile(x, y) == FLOOR
+
+    def walkable_window(self, x0, y0, width, height):
+        # Mascara bool [y, x] da janela; fora do mapa conta como parede
+        mask = np.zeros((height, width), dtype=bool)
+        bx0 = max(x0, 0)
+        by0 = max(y0, 0)
+        bx1 = min(x0 + width, self.width)
+        by1 = min(y0 + height, self.height)
+        if bx0 >= bx1 or by0 >= by1:
+            return mask
+        if not self.has_walls:
+            mask[by0 - y0:by1 - y0, bx0 - x0:bx1 - x0] = True
+            return mask
+        size = self.chunk_size
+        for cx, cy in self.chunks_in_rect(bx0, by0, bx1, by1):
+            tiles = np.frombuffer(self.chunk(cx, cy), dtype=np.uint8).reshape(size, size)
+            sx0 = max(bx0, cx * size)
+            sy0 = max(by0, cy * size)
+            sx1 = min(bx1, (cx + 1) * size)
+            sy1 = min(by1, (cy + 1) * size)
+            mask[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = (
+                tiles[sy0 - cy * size:sy1 - cy * size, sx0 - cx * size:sx1 - cx * size] == FLOOR
+            )
+        return mask
+
+    def random_floor(self, rng, margin=1, tries=64):
+        # Posicao aleatoria andavel; mesmas faixas de randint(1, COLS - 2)
+        for _ in range(tries):
+            x = rng.randint(margin, self.width - 1 - margin)
+            y = rng.randint(margin, self.height - 1 - margin)
+            if self.is_walkable(x, y):
+                return x, y
+        return x, y
+
+    def chunks_in_rect(self, x0, y0, x1, y1):
+        # Chunks que cruzam o retangulo de tiles [x0, x1) x [y0, y1)
+        size = self.chunk_size
+        cx0 = max(0, x0 // size)
+        cy0 = max(0, y0 // size)
+        cx1 = min(self.chunks_x - 1, (x1 - 1) // size)
+        cy1 = min(self.chunks_y - 1, (y1 - 1) // size)
+        return [(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]
+
+    def chunk_bounds(self, cx, cy):
+        # (x0, y0, largura, altura) do chunk recortado ao mapa
+        size = self.chunk_size
+        x0 = cx * size
+        y0 = cy * size
+        return x0, y0, min(size, self.width - x0), min(size, self.height - y0)
+
+
+class Camera:
+    def __init__(self, view_cols, view_rows, world):
+        self.view_cols = view_cols
+        self.view_rows = view_rows
+        self.world = world
+        self.x = 0
+        self.y = 0
+
+    def follow(self, grid_x, grid_y):
+        # Centraliza no alvo sem mostrar fora do mapa
+        max_x = max(0, self.world.width - self.view_cols)
+        max_y = max(0, self.world.height - self.view_rows)
+        self.x = min(max(grid_x - self.view_cols // 2, 0), max_x)
+        self.y = min(max(grid_y - self.view_rows // 2, 0), max_y)
+
+    def visible_rect(self):
+        return self.x, self.y, self.x + self.view_cols, self.y + self.view_rows
+
+    def to_screen(self, grid_x, grid_y, tile_size):
+        return (grid_x - self.x) * tile_size, (grid_y - self.y) * tile_size